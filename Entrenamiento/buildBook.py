@@ -0,0 +1,62 @@
+# Arma el libro de aperturas de la IA híbrida (ver tttCore.decisionCache): la jugada de la
+# búsqueda para todas las posiciones canónicas de las primeras fichas en las que mueve la IA.
+# Se corre una vez fuera de línea con más tiempo por posición del que tiene una partida en vivo;
+# MarkovAI (IntegracionMinimaxMarkov/sesoIA.py) lo carga al arrancar si encuentra el archivo.
+#
+# Uso: python Entrenamiento/buildBook.py --size 4 --plies 4 --time 3
+#      python Entrenamiento/buildBook.py --size 5 --k 4 --engine mcts --playouts 20000
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from tttCore import solver
+from tttCore.bitboard import AI, DEFAULT
+from tttCore.decisionCache import book_path, build_book
+from tttCore.mcts import MCTSEngine
+from tttCore.search import SearchEngine
+
+DATA_FILE = os.path.join(ROOT, 'IntegracionMinimaxMarkov', 'markov_learning.json')
+
+
+def make_search(engine='minimax', time_limit=3.0, playouts=None):
+    # función (tablero, jugador) -> jugada; en 3x3 con minimax alcanza con la tabla del solver
+    if engine == 'mcts':
+        mcts = MCTSEngine(playouts, None if playouts else time_limit, reuse=False)
+        return lambda board, player: mcts.search(board, player)[1]
+    search = SearchEngine()
+
+    def play(board, player):
+        if board.geometry is DEFAULT:
+            return solver.best_move(board, player)
+        return search.search(board, player, time_limit=time_limit)[1]
+    return play
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Libro de aperturas para la IA híbrida")
+    parser.add_argument('--size', type=int, default=3)
+    parser.add_argument('--k', type=int, help="fichas en línea para ganar (por defecto el tamaño)")
+    parser.add_argument('--plies', type=int, default=4, help="se incluyen las posiciones con menos fichas que esto")
+    parser.add_argument('--engine', choices=('minimax', 'mcts'), default='minimax')
+    parser.add_argument('--time', type=float, default=3.0, help="segundos de búsqueda por posición")
+    parser.add_argument('--playouts', type=int, help="simulaciones por posición con --engine mcts")
+    parser.add_argument('--out', help="archivo del libro (por defecto el que busca MarkovAI)")
+    args = parser.parse_args(argv)
+
+    def progress(done, total):
+        print(f"\r{done}/{total} posiciones", end='', flush=True)
+
+    book = build_book(make_search(args.engine, args.time, args.playouts), args.size, args.k, args.plies, AI, progress)
+    print()
+    path = args.out or book_path(DATA_FILE, args.size, args.k)
+    book.save(path)
+    print(f"{path}: {len(book)} posiciones hasta {args.plies} fichas")
+    return book
+
+
+if __name__ == '__main__':
+    main()
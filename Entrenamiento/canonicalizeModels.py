@@ -0,0 +1,79 @@
+# Migración única: pliega los modelos de Markov guardados antes de usar simetrías
+# (un estado por cada rotación/reflexión del tablero) a su forma canónica, sumando los
+# conteos de las variantes. El archivo se reescribe completo con el mismo formato; si ya
+# estaba canonizado no se toca. MarkovAI también pliega al cargar, así que correr esto
+# solo compacta el archivo.
+#
+# Uso: python Entrenamiento/canonicalizeModels.py                       # los modelos de cada carpeta
+#      python Entrenamiento/canonicalizeModels.py Markov/markov_data.db --size 3
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from tttCore.storage import BACKENDS, flatten, storage_for_path
+from tttCore.symmetry import Symmetry, is_canonical
+
+MODEL_FILES = [
+    os.path.join(ROOT, 'Markov', 'markov_data.json'),
+    os.path.join(ROOT, 'IntegracionMinimaxMarkov', 'markov_learning.json'),
+]
+
+
+def default_paths():
+    # el JSON original y los archivos .db / .bin derivados que existan
+    paths = []
+    for data_file in MODEL_FILES:
+        base, _ = os.path.splitext(data_file)
+        for extension, _ in BACKENDS.values():
+            if extension and os.path.exists(base + extension):
+                paths.append(base + extension)
+    return paths
+
+
+def canonicalize_file(path, size=3):
+    # devuelve (estados antes, estados después); escribe a un temporal y lo renombra al final
+    storage = storage_for_path(path, size)
+    try:
+        counts = storage.load()
+    finally:
+        storage.close()
+    if is_canonical(counts, size):
+        return len(counts), len(counts)
+
+    folded = Symmetry.get(size).fold(counts)
+    base, extension = os.path.splitext(path)
+    tmp = f'{base}.canonical-tmp{extension}'
+    if os.path.exists(tmp):
+        os.unlink(tmp)
+    target = storage_for_path(tmp, size)
+    try:
+        target.add(flatten(folded))
+    finally:
+        target.close()
+    os.replace(tmp, path)
+    return len(counts), len(folded)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pliega los modelos de Markov a estados canónicos por simetría")
+    parser.add_argument('paths', nargs='*', help="archivos .json, .db o .bin (por defecto los de cada carpeta)")
+    parser.add_argument('--size', type=int, default=3, help="lado del tablero de los modelos")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or default_paths()
+    if not paths:
+        print("No hay modelos para migrar.")
+    for path in paths:
+        before, after = canonicalize_file(path, args.size)
+        if before == after:
+            print(f"{path}: ya está en forma canónica ({after} estados)")
+        else:
+            print(f"{path}: {before} -> {after} estados")
+
+
+if __name__ == '__main__':
+    main()
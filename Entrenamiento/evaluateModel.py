@@ -0,0 +1,314 @@
+# Evalúa un modelo de Markov sin interfaz gráfica, para aceptar o rechazar un cambio de modelo:
+#
+# - precisión de predicción: reproduce registros de partidas reservados (ver tttCore.gameLog) y,
+#   para cada jugada del lado que aprende el modelo, mira si estaba entre las k más frecuentes
+#   del estado (top-1, top-3...), por cantidad de fichas en el tablero
+# - torneos: partidas entre las políticas de O (solo Markov, solo minimax, híbrida) y los
+#   rivales de X de selfPlay, repartidas en procesos, con tasas de victoria/empate/derrota e
+#   intervalos de confianza de Wilson al 95 %
+#
+# Los modelos se leen de sus archivos sin modificarlos (se evalúa una copia en memoria). Con
+# --against se evalúa también el modelo actual con las mismas partidas y semillas, y el informe
+# JSON dice si el candidato se acepta: que no pierda más de --max-drop de precisión top-1 y que
+# su puntaje en ningún torneo sea peor que el del actual fuera del margen de error. Sale con
+# código 1 si se rechaza.
+#
+# Uso: python Entrenamiento/evaluateModel.py --model hybrid --data candidato.db \
+#          --against IntegracionMinimaxMarkov/markov_learning.db --logs reservadas.glog --games 20000 --workers 0
+#      python Entrenamiento/evaluateModel.py --model markov --logs partidas.jsonl --top-k 1,2,3 --games 0 --dense
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([ROOT, os.path.join(ROOT, 'Markov'), os.path.join(ROOT, 'IntegracionMinimaxMarkov')])
+
+from ingestLogs import MODEL_FILES, SIDES
+from markovModel import MarkovAI
+from selfPlay import make_policy, simulate, simulate_parallel
+from sesoIA import MarkovAI as HybridAI
+from tttCore.bitboard import AI, PLAYER
+from tttCore.denseModel import DenseMarkovModel
+from tttCore.gameLog import read_games, replay
+from tttCore.storage import storage_for_path
+from tttCore.symmetry import Symmetry
+
+Z = 1.96  # intervalos al 95 %
+O_POLICIES = ('markov', 'minimax', 'hybrid')
+X_POLICIES = ('human', 'random', 'minimax')
+
+
+def model_file(kind):
+    # archivo que usa el modelo en vivo: el .db o .bin si ya se migró, si no el JSON original (o None)
+    base, _ = os.path.splitext(MODEL_FILES[kind])
+    for extension in ('.db', '.bin', '.json'):
+        if os.path.exists(base + extension):
+            return base + extension
+    return None
+
+
+def load_model(kind, path, size=3, search=None):
+    # copia en memoria del modelo guardado en `path` (.db, .bin o .json); el archivo no se toca
+    if kind == 'markov':
+        model = MarkovAI(None, backend='memory', size=size)
+    else:
+        model = HybridAI(None, backend='memory', verbose=False, size=size, book=False, **(search or {}))
+    if path is not None:
+        storage = storage_for_path(path, size)
+        try:
+            model.merge(storage.load())
+        finally:
+            storage.close()
+    return model
+
+
+def ranked_moves(move_counts):
+    # jugadas del estado de la más a la menos frecuente; en un empate se ordenan por casilla
+    return [move for move, _ in sorted(move_counts.items(), key=lambda item: (-item[1], item[0]))]
+
+
+def table_ranks(table, samples):
+    # posición de la jugada real entre las del estado (-1 si nunca se jugó) y si el estado tiene datos
+    ranks, known = [], []
+    for state, move in samples:
+        move_counts = table.get(state)
+        known.append(bool(move_counts))
+        ranks.append(ranked_moves(move_counts).index(move) if move_counts and move in move_counts else -1)
+    return ranks, known
+
+
+def dense_ranks(dense, samples):
+    # lo mismo que table_ranks, en un solo cálculo vectorizado sobre la tabla densa (solo 3x3)
+    ranks, known = dense.ranks([state for state, _ in samples], [i * 3 + j for _, (i, j) in samples])
+    return ranks.tolist(), known.tolist()
+
+
+def prediction_accuracy(table, paths, side=PLAYER, size=3, top_k=(1, 3), dense=False, batch=100000, k=None):
+    # por cantidad de fichas: jugadas evaluadas, cuántas eran de un estado conocido y en cuántas la
+    # jugada real estaba entre las k primeras del modelo. Un estado desconocido cuenta como fallo.
+    # Con dense=True las posiciones se puntúan de a `batch` con la tabla densa de NumPy.
+    if dense and size != 3:
+        raise ValueError("la tabla densa solo existe para 3x3")
+    scorer = table_ranks
+    if dense:
+        table = DenseMarkovModel.from_transition_counts(table)
+        scorer = dense_ranks
+    symmetry = Symmetry.get(size)
+    cells = size * size
+    plies = {}
+    stats = {}
+
+    def score(samples, ply_of):
+        for ply, rank, known in zip(ply_of, *scorer(table, samples)):
+            row = plies.get(ply)
+            if row is None:
+                row = plies[ply] = {'positions': 0, 'known': 0, 'hits': [0] * len(top_k)}
+            row['positions'] += 1
+            if not known:
+                continue
+            row['known'] += 1
+            if rank < 0:
+                continue
+            for i, k in enumerate(top_k):
+                if rank < k:
+                    row['hits'][i] += 1
+
+    samples, ply_of = [], []
+    for path in paths:
+        for state, move in replay(read_games(path), side, size, stats, k):
+            ply_of.append((state | state >> cells).bit_count())
+            canonical, t = symmetry.canonical(state)
+            samples.append((canonical, symmetry.to_canonical(move, t)))
+            if len(samples) >= batch:
+                score(samples, ply_of)
+                samples, ply_of = [], []
+    if samples:
+        score(samples, ply_of)
+
+    def rates(row):
+        positions = row['positions']
+        result = {'positions': positions, 'coverage': row['known'] / positions if positions else 0.0}
+        for k, hits in zip(top_k, row['hits']):
+            result[f'top{k}'] = hits / positions if positions else 0.0
+        return result
+
+    total = {'positions': 0, 'known': 0, 'hits': [0] * len(top_k)}
+    for row in plies.values():
+        total['positions'] += row['positions']
+        total['known'] += row['known']
+        total['hits'] = [a + b for a, b in zip(total['hits'], row['hits'])]
+    return {
+        'overall': rates(total),
+        'per_ply': {str(ply): rates(plies[ply]) for ply in sorted(plies)},
+        'games': stats.get('games', 0),
+        'invalid': stats.get('invalid', 0),
+        'skipped': stats.get('skipped', 0),
+    }
+
+
+def wilson(successes, n, z=Z):
+    # intervalo de Wilson para una proporción (se porta bien con tasas cerca de 0 o 1)
+    if not n:
+        return [0.0, 0.0]
+    p = successes / n
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return [max(0.0, centre - half), min(1.0, centre + half)]
+
+
+def match_report(wins, draws, losses):
+    # tasas desde el punto de vista de O y puntaje (victoria 1, empate 1/2) con su intervalo normal
+    n = wins + draws + losses
+    score = (wins + draws / 2) / n if n else 0.0
+    variance = (wins + draws / 4) / n - score * score if n else 0.0
+    half = Z * math.sqrt(max(variance, 0.0) / n) if n else 0.0
+    return {
+        'games': n,
+        'win_rate': wins / n if n else 0.0, 'win_ci': wilson(wins, n),
+        'draw_rate': draws / n if n else 0.0, 'draw_ci': wilson(draws, n),
+        'loss_rate': losses / n if n else 0.0, 'loss_ci': wilson(losses, n),
+        'score': score, 'score_ci': [max(0.0, score - half), min(1.0, score + half)],
+    }
+
+
+def run_match(games, x, o, models, workers=1, seed=0, search=None, dense=False):
+    # con un solo proceso se juega acá mismo; si no, se reparte como en selfPlay (sin aprender nada)
+    if workers == 1:
+        rng = random.Random(seed)
+        random.seed(seed)  # MarkovAI usa el módulo random directamente
+        stats = simulate(games, make_policy(x, PLAYER, rng, models, dense), make_policy(o, AI, rng, models, dense),
+                         report_every=0)
+    else:
+        stats = simulate_parallel(games, x, o, models, None, workers=workers or None, seed=seed, search=search,
+                                  dense=dense)
+    return match_report(stats['o_wins'], stats['draws'], stats['x_wins'])
+
+
+def tournament(models, policies, opponents, games, workers=1, seed=0, search=None, dense=False):
+    # cada política de O contra cada rival de X, con las mismas semillas para cualquier modelo
+    results = {}
+    for o in policies:
+        results[o] = {}
+        for i, x in enumerate(opponents):
+            results[o][x] = run_match(games, x, o, models, workers, seed + 1000 * i, search, dense)
+    return results
+
+
+def checks(report, max_drop=0.01):
+    # criterios de aceptación frente al modelo actual (solo se revisa lo que se haya medido)
+    found = []
+    accuracy = report.get('accuracy', {})
+    if 'baseline' in accuracy:
+        candidate = accuracy['candidate']['overall']['top1']
+        baseline = accuracy['baseline']['overall']['top1']
+        found.append({'check': 'accuracy.top1', 'candidate': candidate, 'baseline': baseline,
+                      'passed': candidate >= baseline - max_drop})
+    games = report.get('tournament', {})
+    for o, matches in games.get('baseline', {}).items():
+        for x, baseline in matches.items():
+            candidate = games['candidate'][o][x]
+            # peor solo si los intervalos de puntaje no se tocan
+            found.append({'check': f'tournament.{o}_vs_{x}.score', 'candidate': candidate['score'],
+                          'baseline': baseline['score'],
+                          'passed': candidate['score_ci'][1] >= baseline['score_ci'][0]})
+    return found
+
+
+def evaluate(kind='hybrid', data=None, against=None, logs=(), side=None, size=3, top_k=(1, 3),
+             games=10000, policies=O_POLICIES, opponents=('human', 'random'), workers=1, seed=0,
+             max_drop=0.01, search=None, dense=False, k=None):
+    search = search or {}
+    side = side or SIDES[kind]
+    data = data or model_file(kind)
+    report = {'model': kind, 'data': data, 'against': against, 'seed': seed}
+    start = time.perf_counter()
+    candidate = load_model(kind, data, size, search)
+    baseline = load_model(kind, against, size, search) if against else None
+
+    if logs:
+        report['accuracy'] = {'side': side, 'candidate': prediction_accuracy(candidate.transition_counts, logs, side,
+                                                                             size, top_k, dense, k=k)}
+        if baseline is not None:
+            report['accuracy']['baseline'] = prediction_accuracy(baseline.transition_counts, logs, side, size, top_k,
+                                                                 dense, k=k)
+
+    models = {kind: candidate}
+    if games:
+        if size != 3:
+            raise ValueError("los torneos usan las políticas de selfPlay, que son de 3x3")
+        # la política que no es la del modelo evaluado usa su modelo de siempre
+        other_kind = 'markov' if kind == 'hybrid' else 'hybrid'
+        if other_kind in policies:
+            models[other_kind] = load_model(other_kind, model_file(other_kind), size, search)
+        report['tournament'] = {'candidate': tournament(models, policies, opponents, games, workers, seed, search,
+                                                        dense)}
+        if baseline is not None and kind in policies:
+            report['tournament']['baseline'] = tournament({kind: baseline}, [kind], opponents, games, workers,
+                                                          seed, search, dense)
+
+    report['checks'] = checks(report, max_drop)
+    report['accept'] = all(check['passed'] for check in report['checks'])
+    report['seconds'] = time.perf_counter() - start
+    for model in list(models.values()) + ([baseline] if baseline is not None else []):
+        model.writer.close()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precisión de predicción y torneos de un modelo de Markov")
+    parser.add_argument('--model', choices=('markov', 'hybrid'), default='hybrid')
+    parser.add_argument('--data', help="modelo candidato (.db, .bin o .json; por defecto el de la carpeta del modelo)")
+    parser.add_argument('--against', help="modelo actual con el que se compara para aceptar o rechazar")
+    parser.add_argument('--logs', nargs='*', default=[], help="registros de partidas reservadas (.glog o .jsonl)")
+    parser.add_argument('--side', choices=(PLAYER, AI), help="jugadas que se predicen (por defecto las que aprende el modelo)")
+    parser.add_argument('--size', type=int, default=3)
+    parser.add_argument('--k', type=int, help="solo las partidas con este k en los registros (por defecto cualquiera)")
+    parser.add_argument('--top-k', default='1,3', help="valores de k separados por coma")
+    parser.add_argument('--games', type=int, default=10000, help="partidas por enfrentamiento (0 = sin torneo)")
+    parser.add_argument('--policies', default=','.join(O_POLICIES), help="políticas de O: " + ','.join(O_POLICIES))
+    parser.add_argument('--opponents', default='human,random', help="rivales de X: " + ','.join(X_POLICIES))
+    parser.add_argument('--workers', type=int, default=1, help="procesos en paralelo (0 = todos los núcleos)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-drop', type=float, default=0.01, help="caída de precisión top-1 tolerada")
+    parser.add_argument('--fallback', choices=('minimax', 'mcts'), default='minimax')
+    parser.add_argument('--playouts', type=int, default=500)
+    parser.add_argument('--dense', action='store_true',
+                        help="precisión por lotes con la tabla densa de NumPy; la política markov también la usa")
+    parser.add_argument('--out', help="archivo JSON del informe (por defecto se imprime)")
+    args = parser.parse_args(argv)
+
+    top_k = sorted({int(k) for k in args.top_k.split(',')})
+    if top_k[0] != 1:
+        top_k.insert(0, 1)  # top-1 siempre, es el criterio de aceptación
+    policies = args.policies.split(',')
+    opponents = args.opponents.split(',')
+    for name in policies:
+        if name not in O_POLICIES:
+            parser.error(f"política de O desconocida: {name}")
+    for name in opponents:
+        if name not in X_POLICIES:
+            parser.error(f"rival de X desconocido: {name}")
+
+    report = evaluate(args.model, args.data, args.against, args.logs, args.side, args.size, top_k, args.games,
+                      policies, opponents, args.workers, args.seed, args.max_drop,
+                      dict(fallback=args.fallback, playouts=args.playouts), args.dense, args.k)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    for check in report['checks']:
+        if not check['passed']:
+            print(f"RECHAZO {check['check']}: {check['baseline']:.3g} -> {check['candidate']:.3g}", file=sys.stderr)
+    return 0 if report['accept'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
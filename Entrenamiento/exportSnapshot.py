@@ -0,0 +1,47 @@
+# Exporta un modelo de Markov a una instantánea de solo lectura (.snap) para servir con varios
+# procesos: índice ordenado de estados canónicos más una fila de conteos por estado, que cada
+# proceso mapea en memoria sin deserializar (ver tttCore.snapshot). Se puede correr con el
+# servidor funcionando: el archivo se reemplaza de forma atómica y los procesos lo toman al
+# llamar a refresh_snapshot / merge_snapshot.
+#
+# Uso: python Entrenamiento/exportSnapshot.py IntegracionMinimaxMarkov/markov_learning.db
+#      python Entrenamiento/exportSnapshot.py Markov/markov_data_4x4.db --size 4 --out markov_4x4.snap
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from tttCore.snapshot import Snapshot, build_snapshot
+from tttCore.storage import storage_for_path
+from tttCore.symmetry import Symmetry
+
+
+def export_file(path, output=None, size=3):
+    # por defecto, junto al modelo con la extensión .snap (el nombre que busca MarkovAI con snapshot=True)
+    output = output or os.path.splitext(path)[0] + '.snap'
+    storage = storage_for_path(path, size)
+    try:
+        states = build_snapshot(storage, output, size, Symmetry.get(size))
+    finally:
+        storage.close()
+    return output, states
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta un modelo de Markov a una instantánea mapeable")
+    parser.add_argument('model', help="archivo del modelo (.db, .bin o .json)")
+    parser.add_argument('--out', help="instantánea de destino (por defecto <modelo>.snap)")
+    parser.add_argument('--size', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    output, states = export_file(args.model, args.out, args.size)
+    snapshot = Snapshot(output)
+    print(f"{output}: {states} estados, {len(snapshot.map)} bytes")
+    snapshot.close()
+
+
+if __name__ == '__main__':
+    main()
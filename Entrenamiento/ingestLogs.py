@@ -0,0 +1,74 @@
+# Reentrena un modelo de Markov a partir de registros de partidas (ver tttCore.gameLog): cada
+# partida se reproduce sobre el tablero, se extraen los pares (estado, jugada) del lado que se
+# aprende y se suman al modelo por lotes. Los registros se leen como flujo, así que millones
+# de partidas no ocupan más memoria que los conteos.
+#
+# El destino (--out) es obligatorio y no puede ser el modelo que escribió el registro: ese modelo
+# ya aprendió cada partida en end_game y volver a sumarlas duplicaría sus conteos.
+#
+# Uso: python Entrenamiento/ingestLogs.py IntegracionMinimaxMarkov/markov_learning.glog --model hybrid \
+#          --out reconstruido.json
+#      python Entrenamiento/ingestLogs.py partidas/*.jsonl --out reconstruido.json --side X
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([ROOT, os.path.join(ROOT, 'Markov'), os.path.join(ROOT, 'IntegracionMinimaxMarkov')])
+
+from markovModel import MarkovAI
+from sesoIA import MarkovAI as HybridAI
+from tttCore.bitboard import AI, PLAYER
+from tttCore.gameLog import ingest, log_path
+
+MODEL_FILES = {
+    'markov': os.path.join(ROOT, 'Markov', 'markov_data.json'),
+    'hybrid': os.path.join(ROOT, 'IntegracionMinimaxMarkov', 'markov_learning.json'),
+}
+# lado que aprende cada modelo en vivo: Markov las jugadas del humano, el híbrido las de la IA
+SIDES = {'markov': PLAYER, 'hybrid': AI}
+
+
+def ingest_files(paths, output, model='markov', side=None, backend='sqlite', size=3, batch=100000, k=None):
+    # los conteos se suman a lo que ya tenga el modelo de destino (para reconstruir, usar uno nuevo)
+    k = k or size
+    own_log = os.path.abspath(log_path(output, size, k))
+    for path in paths:
+        if os.path.abspath(path) == own_log:
+            raise ValueError(f"{path} es el registro de {output}: ese modelo ya aprendió esas partidas")
+    model_class = MarkovAI if model == 'markov' else HybridAI
+    options = {} if model == 'markov' else {'verbose': False}
+    ai = model_class(output, backend=backend, size=size, k=k, **options)
+    stats = ingest(ai, paths, side or SIDES[model], batch, k)
+    ai.close()
+    return ai, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suma a un modelo de Markov las partidas de uno o más registros")
+    parser.add_argument('logs', nargs='+', help="registros de partidas (.glog binario o .jsonl)")
+    parser.add_argument('--model', choices=('markov', 'hybrid'), default='markov')
+    parser.add_argument('--out', required=True,
+                        help="modelo de destino (.json, .db o .bin); no el que escribió los registros")
+    parser.add_argument('--side', choices=(PLAYER, AI), help="jugadas que se aprenden (por defecto las del modelo en vivo)")
+    parser.add_argument('--backend', choices=('sqlite', 'binary', 'json'), default='sqlite')
+    parser.add_argument('--size', type=int, default=3)
+    parser.add_argument('--k', type=int, help="fichas en línea para ganar (por defecto el tamaño)")
+    parser.add_argument('--batch', type=int, default=100000, help="pares distintos acumulados antes de sumar al modelo")
+    args = parser.parse_args(argv)
+
+    try:
+        ai, stats = ingest_files(args.logs, args.out, args.model, args.side, args.backend, args.size, args.batch,
+                                 args.k)
+    except ValueError as e:
+        parser.error(str(e))
+    rate = stats['games'] / stats['seconds'] if stats['seconds'] else 0.0
+    print(f"{stats['games']} partidas ({stats['pairs']} jugadas) en {stats['seconds']:.2f} s ({rate:.0f} partidas/s); "
+          f"{stats['invalid']} inválidas, {stats['skipped']} de otro tablero")
+    print(f"{len(ai.transition_counts)} estados en el modelo")
+    return stats
+
+
+if __name__ == '__main__':
+    main()
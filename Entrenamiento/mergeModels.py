@@ -0,0 +1,44 @@
+# Combina fuera de línea modelos de Markov entrenados por separado (por ejemplo
+# Markov/markov_data.json e IntegracionMinimaxMarkov/markov_learning.json) sumando sus conteos.
+#
+# Uso: python Entrenamiento/mergeModels.py Markov/markov_data.json IntegracionMinimaxMarkov/markov_learning.json \
+#          --out combinado.json --backend sqlite
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([ROOT, os.path.join(ROOT, 'Markov')])
+
+from markovModel import MarkovAI
+from tttCore.storage import storage_for_path
+
+
+def merge_files(inputs, output, backend='sqlite'):
+    # cada entrada se abre según su extensión (.json, .db o .bin) sin crear archivos nuevos
+    model = MarkovAI(output, backend=backend)
+    for path in inputs:
+        storage = storage_for_path(path)
+        try:
+            model.merge(storage.load())
+        finally:
+            storage.close()
+    model.close()
+    return model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suma los conteos de varios modelos de Markov")
+    parser.add_argument('inputs', nargs='+')
+    parser.add_argument('--out', required=True, help="modelo de destino (se suma a lo que ya tenga)")
+    parser.add_argument('--backend', choices=('sqlite', 'binary', 'json'), default='sqlite')
+    args = parser.parse_args(argv)
+
+    model = merge_files(args.inputs, args.out, args.backend)
+    total = sum(sum(moves.values()) for moves in model.transition_counts.values())
+    print(f"{len(model.transition_counts)} estados, {total} jugadas registradas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,323 @@
+# Simulador de partidas sin interfaz gráfica para entrenar los modelos de Markov en masa.
+# Juega partidas entre políticas configurables (aleatoria, minimax, markov, híbrida y un
+# "humano" scripteado), acumula los pares (estado, movimiento) del lado que se aprende y
+# los entrega al modelo por lotes con update_model_bulk. No importa tkinter.
+#
+# Con --workers N las partidas se reparten en un pool de procesos: cada trabajador acumula su
+# propio fragmento de conteos y el proceso principal los suma al modelo a medida que llegan.
+#
+# Uso: python Entrenamiento/selfPlay.py --games 1000000 --x human --o markov --workers 8
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([ROOT, os.path.join(ROOT, 'Markov'), os.path.join(ROOT, 'IntegracionMinimaxMarkov')])
+
+from game import TicTacToe
+from markovModel import MarkovAI
+from sesoIA import MarkovAI as HybridAI
+from tttCore import solver
+from tttCore.bitboard import AI, PLAYER, other
+from tttCore.denseModel import DenseMarkovModel
+from tttCore.gameLog import GameLog
+from tttCore.metrics import metrics
+from tttCore.symmetry import Symmetry
+
+POLICIES = ('random', 'minimax', 'markov', 'hybrid', 'human')
+MODEL_FILES = {
+    'markov': os.path.join(ROOT, 'Markov', 'markov_data.json'),
+    'hybrid': os.path.join(ROOT, 'IntegracionMinimaxMarkov', 'markov_learning.json'),
+}
+CENTER = 4
+CORNERS = (0, 2, 6, 8)
+
+
+def random_policy(rng):
+    def play(game, player):
+        return rng.choice(game.get_empty_cells())
+    return play
+
+
+def minimax_policy(rng):
+    def play(game, player):
+        return solver.best_move(game.board, player)
+    return play
+
+
+def markov_policy(ai):
+    # MarkovAI.get_best_move siempre juega con 'O' (gana, bloquea o predice al jugador)
+    def play(game, player):
+        return ai.get_best_move(game)
+    return play
+
+
+def dense_policy(ai, rng):
+    # como markov_policy, pero la predicción sale de la tabla densa de NumPy (tttCore.denseModel),
+    # armada con una foto de los conteos del modelo: no ve lo que el modelo aprenda después
+    dense = DenseMarkovModel.from_transition_counts(ai.transition_counts, seed=rng.randrange(2 ** 32))
+    symmetry = Symmetry.get(3)
+
+    def play(game, player):
+        move = ai.check_win_block(game, 'O') or ai.check_win_block(game, 'X')
+        if move:
+            return move
+        state, t = symmetry.canonical(game.get_board_state())  # la tabla guarda estados canónicos
+        available = [symmetry.to_canonical(move, t) for move in game.get_empty_cells()]
+        return symmetry.from_canonical(dense.predict_next_move(state, available), t)
+    return play
+
+
+def hybrid_policy(ai):
+    def play(game, player):
+        board = game.board
+        move = ai.predict_next_move(board.encode(), board.empty_cells(), board=board)
+        ai.history.clear()  # el simulador decide qué se aprende, no la historia interna
+        return move
+    return play
+
+
+def human_policy(rng, win=0.9, block=0.7, noise=0.1):
+    # jugador "humano": casi siempre gana si puede, a veces se olvida de bloquear,
+    # prefiere el centro y las esquinas y de vez en cuando juega al azar
+    def play(game, player):
+        board = game.board
+        empties = board.empty_indices()
+        if rng.random() >= noise:
+            for target, chance in ((player, win), (other(player), block)):
+                if rng.random() < chance:
+                    for cell in empties:
+                        board.make_move(cell, target)
+                        found = board.wins_through(cell, target)
+                        board.undo_move(cell)
+                        if found:
+                            return divmod(cell, 3)
+            if CENTER in empties and rng.random() < 0.6:
+                return divmod(CENTER, 3)
+            corners = [cell for cell in CORNERS if cell in empties]
+            if corners and rng.random() < 0.5:
+                return divmod(rng.choice(corners), 3)
+        return divmod(rng.choice(empties), 3)
+    return play
+
+
+def make_policy(name, side, rng, models, dense=False):
+    if name == 'random':
+        return random_policy(rng)
+    if name == 'minimax':
+        return minimax_policy(rng)
+    if name == 'human':
+        return human_policy(rng)
+    if name in ('markov', 'hybrid'):
+        if side != AI:
+            raise ValueError(f"la política '{name}' solo puede jugar con {AI}")
+        if name == 'hybrid':
+            return hybrid_policy(models['hybrid'])
+        return dense_policy(models['markov'], rng) if dense else markov_policy(models['markov'])
+    raise ValueError(f"política desconocida: {name}")
+
+
+def play_game(game, x_policy, o_policy, counts=None, learn_side=PLAYER):
+    # juega una partida completa; si se pasa `counts`, acumula ahí los pares del lado que se aprende
+    game.reset()
+    board = game.board
+    player = PLAYER
+    while True:
+        policy = x_policy if player == PLAYER else o_policy
+        state = board.encode()
+        move = policy(game, player)
+        game.make_move(move[0], move[1], player)
+        if counts is not None and player == learn_side:
+            key = (state, move)
+            counts[key] = counts.get(key, 0) + 1
+        winner = game.check_winner()
+        if winner is not None:
+            return winner
+        if board.is_full():
+            return None
+        player = other(player)
+
+
+def simulate(games, x_policy, o_policy, learner=None, learn_side=PLAYER, batch=10000, report_every=5.0, log=None):
+    # devuelve las estadísticas de la simulación; los conteos se entregan al modelo cada `batch` partidas.
+    # Con `log` (un tttCore.gameLog.GameLog) también se registra cada partida completa.
+    game = TicTacToe()
+    results = {PLAYER: 0, AI: 0, None: 0}
+    counts = {} if learner is not None else None
+    start = last_report = time.perf_counter()
+    for n in range(1, games + 1):
+        results[play_game(game, x_policy, o_policy, counts, learn_side)] += 1
+        if log is not None:
+            log.append([cell for cell, _ in game.moves])
+        if counts is not None and n % batch == 0:
+            learner.update_model_bulk(counts)
+            counts = {}
+        if report_every:
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                print(f"{n} partidas, {n / (now - start):.0f} partidas/s")
+                last_report = now
+    if counts:
+        learner.update_model_bulk(counts)
+    elapsed = time.perf_counter() - start
+    if metrics.enabled:
+        metrics.inc('games', games)
+    return {
+        'games': games,
+        'x_wins': results[PLAYER],
+        'o_wins': results[AI],
+        'draws': results[None],
+        'seconds': elapsed,
+        'games_per_second': games / elapsed if elapsed else 0.0,
+    }
+
+
+def _run_shard(task):
+    # se ejecuta en un proceso trabajador: modelos en memoria a partir de la copia recibida,
+    # y devuelve solo su fragmento de conteos y el resultado de sus partidas
+    rng = random.Random(task['seed'])
+    random.seed(task['seed'])
+    models = {}
+    for name, counts in task['snapshots'].items():
+        if name == 'markov':
+            models[name] = MarkovAI(None, backend='memory')
+        else:
+            models[name] = HybridAI(None, backend='memory', verbose=False, **task['search'])
+        models[name].merge(counts)
+    x_policy = make_policy(task['x'], PLAYER, rng, models, task['dense'])
+    o_policy = make_policy(task['o'], AI, rng, models, task['dense'])
+
+    shard = {}
+    learner = models.get(task['model'])
+    game = TicTacToe()
+    results = {PLAYER: 0, AI: 0, None: 0}
+    batch = {} if learner is not None else None
+    for n in range(1, task['games'] + 1):
+        results[play_game(game, x_policy, o_policy, batch, task['learn'])] += 1
+        if batch is not None and (n % task['batch'] == 0 or n == task['games']):
+            # el modelo local del trabajador también aprende, igual que en la versión de un proceso
+            learner.update_model_bulk(batch)
+            for key, count in batch.items():
+                shard[key] = shard.get(key, 0) + count
+            batch = {}
+    for model in models.values():
+        model.writer.close()
+    return shard, results
+
+
+def simulate_parallel(games, x, o, models, model_name=None, learn_side=PLAYER, workers=None,
+                      batch=10000, seed=None, chunks_per_worker=4, search=None, dense=False):
+    # reparte las partidas en tareas para un pool de procesos y reduce los fragmentos sumando conteos
+    workers = workers or os.cpu_count() or 1
+    tasks_count = max(1, min(games, workers * chunks_per_worker))
+    base_seed = seed if seed is not None else random.randrange(2 ** 32)
+    snapshots = {name: model.transition_counts for name, model in models.items() if name in (x, o, model_name)}
+    tasks = []
+    for i in range(tasks_count):
+        size = games // tasks_count + (1 if i < games % tasks_count else 0)
+        tasks.append({
+            'games': size, 'x': x, 'o': o, 'model': model_name, 'learn': learn_side,
+            'batch': batch, 'seed': base_seed + i, 'snapshots': snapshots, 'search': search or {},
+            'dense': dense,
+        })
+
+    learner = models.get(model_name)
+    results = {PLAYER: 0, AI: 0, None: 0}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_shard, task) for task in tasks]
+        for future in as_completed(futures):
+            shard, shard_results = future.result()
+            if learner is not None:
+                learner.update_model_bulk(shard)
+            for key, count in shard_results.items():
+                results[key] += count
+    elapsed = time.perf_counter() - start
+    return {
+        'games': games,
+        'x_wins': results[PLAYER],
+        'o_wins': results[AI],
+        'draws': results[None],
+        'seconds': elapsed,
+        'games_per_second': games / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Entrenamiento de Markov por autojuego, sin interfaz gráfica")
+    parser.add_argument('--games', type=int, default=100000)
+    parser.add_argument('--x', choices=POLICIES, default='human', help="política de X (el jugador)")
+    parser.add_argument('--o', choices=POLICIES, default='markov', help="política de O (la IA)")
+    parser.add_argument('--model', choices=('markov', 'hybrid', 'none'), default='markov',
+                        help="modelo que aprende de las jugadas del lado --learn")
+    parser.add_argument('--learn', choices=(PLAYER, AI), default=PLAYER)
+    parser.add_argument('--data', help="archivo del modelo (por defecto el de cada carpeta)")
+    parser.add_argument('--backend', choices=('sqlite', 'binary', 'json'), default='sqlite')
+    parser.add_argument('--batch', type=int, default=10000)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--workers', type=int, default=1, help="procesos en paralelo (0 = todos los núcleos)")
+    parser.add_argument('--max-states', type=int, help="límite de estados en memoria de los modelos")
+    parser.add_argument('--eviction', choices=('lru', 'lfu'), default='lru')
+    parser.add_argument('--half-life', type=float, help="jugadas aprendidas para que un conteo valga la mitad")
+    parser.add_argument('--fallback', choices=('minimax', 'mcts'), default='minimax',
+                        help="búsqueda de la política híbrida cuando Markov no conoce el estado")
+    parser.add_argument('--playouts', type=int, default=500, help="simulaciones por jugada con --fallback mcts")
+    parser.add_argument('--dense', action='store_true',
+                        help="la política markov predice con la tabla densa de NumPy (foto del modelo al empezar)")
+    parser.add_argument('--log', help="agrega las partidas a este registro (.glog o .jsonl; solo con --workers 1)")
+    parser.add_argument('--metrics', help="guarda las métricas (aciertos de Markov, tiempos de guardado...) en este JSON")
+    parser.add_argument('--profile-slow', type=float, help="perfila con cProfile las búsquedas de al menos estos segundos")
+    args = parser.parse_args(argv)
+    if args.log and args.workers != 1:
+        parser.error("--log necesita --workers 1")
+
+    if args.metrics or args.profile_slow:
+        metrics.enable()
+        if args.profile_slow:
+            metrics.capture_slow(args.profile_slow)
+    rng = random.Random(args.seed)
+    if args.seed is not None:
+        random.seed(args.seed)  # MarkovAI usa el módulo random directamente
+
+    # solo se crean los modelos que de verdad se usan (cada uno abre su almacenamiento)
+    needed = {name for name in (args.x, args.o, args.model) if name in MODEL_FILES}
+    models = {}
+    budget = dict(max_states=args.max_states, eviction=args.eviction, half_life=args.half_life)
+    search = dict(fallback=args.fallback, playouts=args.playouts)
+    for name in needed:
+        data_file = args.data if args.data and name == args.model else MODEL_FILES[name]
+        if name == 'markov':
+            models[name] = MarkovAI(data_file, backend=args.backend, **budget)
+        else:
+            models[name] = HybridAI(data_file, backend=args.backend, verbose=False, **budget, **search)
+
+    x_policy = make_policy(args.x, PLAYER, rng, models, args.dense)
+    o_policy = make_policy(args.o, AI, rng, models, args.dense)
+    learner = models.get(args.model)
+    if args.workers == 1:
+        log = GameLog(args.log) if args.log else None
+        stats = simulate(args.games, x_policy, o_policy, learner, args.learn, args.batch, log=log)
+        if log is not None:
+            log.close()
+    else:
+        stats = simulate_parallel(args.games, args.x, args.o, models, args.model, args.learn,
+                                  args.workers or None, args.batch, args.seed, search=search, dense=args.dense)
+
+    for name, model in models.items():
+        model.close()
+        memory = model.memory_stats()
+        print(f"{name}: {memory['states']} estados en memoria (~{memory['approx_bytes'] // 1024} KiB)"
+              + (f", {memory['evictions']} desalojados" if model.budget else ""))
+    print(f"{stats['games']} partidas en {stats['seconds']:.2f} s ({stats['games_per_second']:.0f} partidas/s): "
+          f"X {stats['x_wins']}, O {stats['o_wins']}, empates {stats['draws']}")
+    if args.metrics:
+        metrics.write_json(args.metrics)
+    return stats
+
+
+if __name__ == '__main__':
+    main()
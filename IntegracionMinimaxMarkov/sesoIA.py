@@ -1,10 +1,25 @@
-import json
 import random
-import copy
 import os
-import tkinter as tk
-from tkinter import messagebox
-from utils import check_winner, is_full, PLAYER, AI
+import sys
+import threading
+import time
+from utils import PLAYER, AI
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tttCore import solver
+from tttCore.bitboard import DEFAULT
+from tttCore.search import SearchEngine
+from tttCore.countBudget import CountBudget, table_stats
+from tttCore.decisionCache import DecisionCache, book_path, open_book
+from tttCore.gameLog import GameLog, log_path
+from tttCore.locking import StripedLock
+from tttCore.mcts import MCTSEngine
+from tttCore.metrics import file_bytes, metrics
+from tttCore.ngramModel import ngram_path, open_ngram
+from tttCore.persistence import WriteBehindWriter
+from tttCore.snapshot import Snapshot, SnapshotTable, build_snapshot, snapshot_path
+from tttCore.storage import add_counts, flatten, open_storage
+from tttCore.symmetry import Symmetry
 
 
 PLAYER = 'X'
@@ -12,181 +27,517 @@ AI = 'O'
 
 
 class MarkovAI:
-    def __init__(self, data_file='markov_learning.json'):
-        # Establece el nombre del archivo JSON donde se guardará y cargará el conocimiento de la IA.
+    def __init__(self, data_file='markov_learning.json', backend='sqlite', flush_games=10, flush_interval=5.0,
+                 verbose=True, size=3, k=None, time_budget=1.0, max_states=None, eviction='lru', half_life=None,
+                 order=0, min_count=2, load='eager', snapshot=False, fallback='minimax', playouts=None,
+                 search_workers=1, game_log=None, decision_cache=4096, book=True):
+        # Establece el nombre del archivo de aprendizaje. Con los backends 'sqlite' o 'binary'
+        # se usa markov_learning.db / markov_learning.bin y el JSON anterior se migra la primera vez;
+        # 'memory' no usa archivo (modelos temporales). Los tableros de otro tamaño (size) o con
+        # otra cantidad en línea (k) usan su propio archivo, por ejemplo markov_learning_4x4.db o
+        # markov_learning_4x4k3.db; lo mismo la instantánea, el n-grama, el libro y el registro.
         self.data_file = data_file
+        self.storage = open_storage(data_file, backend, size, k)
+
+        # Hilo escritor en segundo plano: junta los cambios de varias partidas y los guarda
+        # cada `flush_games` partidas o cada `flush_interval` segundos (y al cerrar el programa).
+        self.writer = WriteBehindWriter(self.storage, flush_games, flush_interval)
+
+        # Las 8 rotaciones y reflexiones de un tablero son la misma posición: el modelo guarda
+        # solo la forma canónica (ver tttCore.symmetry) y traduce las jugadas al consultar.
+        self.symmetry = Symmetry.get(size)
+
+        # Presupuesto de memoria opcional (ver tttCore.countBudget): como mucho `max_states` estados
+        # en memoria, desalojando el menos usado según `eviction` ('lru' o 'lfu'), y conteos que
+        # pierden la mitad de su peso cada `half_life` jugadas aprendidas. None = sin límite.
+        self.budget = CountBudget(max_states, eviction, half_life) if max_states or half_life else None
+
+        # Instantánea compartida opcional (ver tttCore.snapshot): con snapshot=True la tabla no se
+        # carga como dict sino que se mapea de markov_learning.snap, así varios procesos comparten
+        # una sola copia en la caché del sistema. Lo aprendido en vivo queda en un overlay propio
+        # del proceso (y en el almacenamiento de siempre) hasta que merge_snapshot arma una nueva.
+        if snapshot and (self.budget or backend == 'memory'):
+            raise ValueError("la instantánea necesita un archivo de datos y no admite presupuesto de memoria")
+        self.snapshot_file = snapshot_path(data_file, size, k) if snapshot else None
 
         # Inicializa el diccionario donde se almacenarán los conteos de transiciones aprendidas.
-        # Estructura: {estado_del_tablero (tuple): {movimiento (i, j): cantidad_usos}}
+        # Estructura: {estado_canónico (int, ver tttCore.bitboard): {movimiento (i, j) en el marco canónico: cantidad_usos}}
         self.transition_counts = {}
 
+        # Incrementos pendientes de guardar: {(estado, movimiento): incremento}.
+        # Solo estos contadores se escriben al almacenamiento en save_data.
+        self.pending = {}
+
         # Lista para registrar los movimientos realizados durante una partida.
         # Al finalizar el juego, estos se usarán para actualizar transition_counts.
         self.history = []
 
-        # Carga los datos previos desde el archivo JSON (si existe y es válido).
-        self.load_data()
+        # Si es True se imprime en consola quién eligió cada jugada (Markov o Minimax).
+        # El simulador lo desactiva para no llenar la salida con millones de líneas.
+        self.verbose = verbose
+
+        # Segundos que puede pensar Minimax por jugada en tableros más grandes que el 3x3
+        # (en el 3x3 la jugada sale de la tabla del solver y no hace falta límite).
+        self.time_budget = time_budget
+        self.engine = SearchEngine()
+
+        # Búsqueda de respaldo cuando Markov no conoce el estado: 'minimax' (el solver en 3x3 y
+        # alfa-beta con tiempo en NxN) o 'mcts' (ver tttCore.mcts), que juega `playouts` partidas
+        # simuladas por jugada (o las que entren en time_budget si es None) repartidas en
+        # `search_workers` procesos. transition_counts guarda las jugadas de la propia IA (estados
+        # con O por mover), así que en las simulaciones guía las jugadas de O: el árbol supone que
+        # la IA sigue jugando como aprendió. Menos playouts = respuesta más rápida pero más floja.
+        if fallback not in ('minimax', 'mcts'):
+            raise ValueError(f"búsqueda de respaldo desconocida: {fallback} (usa minimax o mcts)")
+        self.mcts = None
+        if fallback == 'mcts':
+            self.mcts = MCTSEngine(playouts, None if playouts else time_budget, prior_player=AI,
+                                   workers=search_workers)
+
+        # Respuestas de Minimax calculadas por adelantado con ponder() mientras el humano piensa:
+        # {código del tablero: jugada}. Se vacía al terminar cada partida.
+        self.pondered = {}
+
+        # Predictor opcional de orden variable (ver tttCore.ngramModel): con order > 0 la predicción
+        # también usa las últimas `order` jugadas de la partida y retrocede a contextos más cortos
+        # (hasta el modelo de solo tablero) cuando un contexto tiene menos de `min_count` datos.
+        # Se guarda en markov_learning_ngram<order>.bin al cerrar.
+        self.ngram_file = ngram_path(None if backend == 'memory' else data_file, order, size, k) if order else None
+        self.ngram = open_ngram(self.ngram_file, order, size, min_count) if order else None
+
+        # Caché acotada de decisiones y libro de aperturas (ver tttCore.decisionCache): con
+        # decision_cache = N se recuerdan las decisiones de hasta N estados (0 = sin caché; no se usa
+        # con presupuesto de memoria, que cambia los conteos sin pasar por update_model). Con book=True
+        # se carga markov_learning_book.json (o el de ese tamaño) si existe; también acepta una ruta.
+        # Se arma con Entrenamiento/buildBook.py.
+        self.decisions = DecisionCache(decision_cache) if decision_cache and not self.budget else None
+        if book is True:
+            book = book_path(data_file, size, k) if backend != 'memory' else None
+        self.book = open_book(book) if book else None
+
+        # Registro de partidas opcional (ver tttCore.gameLog): con game_log=True (markov_learning.glog)
+        # o una ruta, cada partida terminada se agrega al registro con una sola escritura, para
+        # reconstruir o reentrenar el modelo fuera de línea con Entrenamiento/ingestLogs.py.
+        self.game_log = None
+        if game_log:
+            self.game_log = GameLog(log_path(data_file, size, k) if game_log is True else game_log)
+
+        # Candados por franja de estados (ver tttCore.locking): varios hilos (el servidor, el hilo de
+        # la IA y el de la ventana) pueden aprender y consultar a la vez; cada escritura bloquea solo
+        # la franja de su estado y cada lectura copia los conteos del estado bajo ese candado. Con
+        # presupuesto de memoria hay una sola franja, porque el desalojo toca toda la tabla.
+        self.locks = StripedLock(1 if self.budget else 64)
+        self.load_lock = threading.Lock()
+
+        # Carga los datos previos desde el almacenamiento (si existe y es válido).
+        # load='eager' carga aquí mismo; 'lazy' recién en el primer uso del modelo; 'background'
+        # en un hilo aparte, para que la interfaz aparezca sin esperar a que se lea el archivo
+        # (la primera jugada espera a que termine si todavía no terminó).
+        self.loader = None
+        if load == 'background':
+            self.loader = threading.Thread(target=self.load_data, name='markov-loader', daemon=True)
+            self.loader.start()
+        elif load == 'lazy':
+            self.loader = True
+        elif load == 'eager':
+            self.load_data()
+        else:
+            raise ValueError(f"modo de carga desconocido: {load} (usa eager, lazy o background)")
+
+    def ensure_loaded(self):
+        # Con carga diferida, termina de cargar antes de tocar la tabla. Una vez cargado,
+        # los métodos solo revisan que self.loader sea None. Si dos hilos llegan a la vez, el
+        # segundo espera a que el primero termine de cargar.
+        if self.loader is None:
+            return
+        with self.load_lock:
+            if self.loader is True:
+                self.load_data()
+            elif self.loader is not None:
+                self.loader.join()
+            self.loader = None
 
     def load_data(self):
-        # Verifica si el archivo JSON existe y no está vacío.
-        if os.path.exists(self.data_file) and os.path.getsize(self.data_file) > 0:
-            try:
-                # Abre el archivo JSON en modo lectura.
-                with open(self.data_file, 'r') as f:
-                    # Carga el contenido del archivo como un diccionario.
-                    data = json.load(f)
-
-                    # Convierte el contenido a la estructura interna esperada:
-                    # - La clave principal (estado del tablero) se evalúa como tupla.
-                    # - Las claves internas (movimientos) se convierten de string "i,j" a tupla (i, j).
-                    # - Los valores representan la cantidad de veces que se ha usado ese movimiento en ese estado.
-                    self.transition_counts = {
-                        tuple(eval(state)): {tuple(map(int, k.split(','))): v for k, v in moves.items()}
-                        for state, moves in data.items()
-                    }
-            except (json.JSONDecodeError, SyntaxError):
-                # Si el archivo tiene un error de formato o sintaxis, se muestra un mensaje y se reinicia la memoria.
-                print("Archivo JSON corrupto o mal formado, iniciando con datos vacíos.")
-                self.transition_counts = {}
+        # El backend devuelve directamente la estructura interna:
+        # {estado (int): {movimiento (i, j): cantidad de veces que se usó}}
+        # Si el archivo aún tiene estados sin canonizar (datos anteriores a las simetrías), se pliegan
+        # aquí en memoria; Entrenamiento/canonicalizeModels.py los pliega en el archivo de una vez.
+        start = time.perf_counter() if metrics.enabled else 0.0
+        if self.snapshot_file:
+            # Con instantánea solo se mapea el archivo (se arma desde el almacenamiento si no existe).
+            if not os.path.exists(self.snapshot_file):
+                build_snapshot(self.storage, self.snapshot_file, self.storage.size, self.symmetry)
+            table = SnapshotTable(Snapshot(self.snapshot_file))
         else:
-            # Si el archivo no existe o está vacío, se inicializa con un diccionario vacío.
-            self.transition_counts = {}
+            table = self.symmetry.fold(self.storage.load())
+        # Con métricas activas se registra cuánto tardó la carga y cuánto pesa el archivo.
+        if metrics.enabled:
+            metrics.observe('storage.load', time.perf_counter() - start)
+            metrics.set('storage.bytes', file_bytes(self.storage.path))
+            metrics.set('markov.states', len(table))
+        # La tabla nueva se publica entera, sin ningún hilo leyendo o aprendiendo a la vez. Con
+        # presupuesto de memoria solo se conservan los estados con más jugadas registradas.
+        with self.locks.all():
+            if self.budget:
+                self.budget.fit(table)
+            self.transition_counts = table
+        # La tabla cambió entera: nada de lo que haya en la caché de decisiones sigue valiendo.
+        if self.decisions is not None:
+            self.decisions.clear()
+
+
+    def submit_pending(self):
+        # Solo se escriben los contadores tocados desde el último guardado (upsert incremental),
+        # en lugar de reescribir la tabla completa.
+        # Lo pendiente se cambia por un dict vacío con todas las franjas tomadas, para que ningún
+        # hilo sume a la copia que ya se entregó.
+        self.ensure_loaded()
+        with self.locks.all():
+            pending, self.pending = self.pending, {}
+        self.writer.submit(pending)
 
 
     def save_data(self):
-        # Convierte la estructura interna `transition_counts` en un formato serializable por JSON:
-        # - Cada `state` (una tupla con el estado del tablero) se convierte a string.
-        # - Cada `move` (tupla (i, j)) se convierte a string "i,j".
-        # - `v` es la cantidad de veces que se ha hecho ese movimiento en ese estado.
-        data = {
-            str(state): {f"{k[0]},{k[1]}": v for k, v in moves.items()}
-            for state, moves in self.transition_counts.items()
-        }
-
-        # Abre el archivo en modo escritura y guarda el contenido del diccionario como JSON,
-        # con una indentación de 2 espacios para hacerlo legible.
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Espera a que el hilo escritor termine; si el almacenamiento falló, levanta su error.
+        self.submit_pending()
+        self.writer.flush()
+
+
+    def close(self):
+        # Entrega lo pendiente y detiene el hilo escritor, que lo escribe (con reintentos) antes
+        # de terminar. Si no pudo, el error se levanta después de cerrar lo demás.
+        self.submit_pending()
+        try:
+            self.writer.close()
+        finally:
+            if self.mcts is not None:
+                self.mcts.close()
+            if self.game_log is not None:
+                self.game_log.close()
+            if self.ngram_file:
+                self.ngram.save(self.ngram_file)
+            if self.snapshot_file:
+                self.transition_counts.close()
+
+
+    def merge_snapshot(self):
+        # Guarda lo pendiente de este proceso, arma una instantánea nueva con todo lo que hay en el
+        # almacenamiento (que también recibe lo de los demás procesos) y la vuelve a mapear,
+        # descartando el overlay. Reemplazar el archivo es atómico: quien la tenga mapeada sigue
+        # leyendo la anterior hasta llamar a refresh_snapshot.
+        self.save_data()
+        build_snapshot(self.storage, self.snapshot_file, self.storage.size, self.symmetry)
+        with self.locks.all():
+            refreshed = self.transition_counts.refresh()
+        if refreshed and self.decisions is not None:
+            self.decisions.clear()
+
+
+    def refresh_snapshot(self):
+        # Para los procesos que solo leen: si otro escribió una instantánea nueva, se mapea esa.
+        self.ensure_loaded()
+        with self.locks.all():
+            refreshed = self.transition_counts.refresh()
+        if refreshed and self.decisions is not None:
+            self.decisions.clear()
+        return refreshed
 
 
     def update_model(self, prev_state, move):
-        # Si el estado anterior (prev_state) no está registrado en el modelo,
-        # se inicializa como un nuevo diccionario vacío.
-        if prev_state not in self.transition_counts:
-            self.transition_counts[prev_state] = {}
+        # El estado y la jugada se llevan a la forma canónica: lo aprendido en una rotación
+        # del tablero sirve también para las otras siete.
+        if self.loader is not None:
+            self.ensure_loaded()
+        prev_state, move = self.symmetry.canonical_pair(prev_state, move)
+
+        # Todo lo que sigue toca solo este estado: basta con el candado de su franja.
+        with self.locks.for_state(prev_state):
+            # Lo que la caché de decisiones tenga de este estado ya no vale (cambian sus conteos).
+            if self.decisions is not None:
+                self.decisions.invalidate(prev_state)
+
+            # Con presupuesto de memoria, CountBudget aplica el decaimiento pendiente del estado,
+            # suma la jugada y desaloja el estado menos usado si se superó el límite.
+            if self.budget:
+                self.budget.learn(self.transition_counts, prev_state, move)
+            else:
+                # Si el estado anterior (prev_state) no está registrado en el modelo,
+                # se inicializa como un nuevo diccionario vacío.
+                if prev_state not in self.transition_counts:
+                    self.transition_counts[prev_state] = {}
+
+                # Si el movimiento dado (move) no está registrado en ese estado,
+                # se inicializa con un contador en cero.
+                if move not in self.transition_counts[prev_state]:
+                    self.transition_counts[prev_state][move] = 0
+
+                # Se incrementa el contador del movimiento para ese estado específico.
+                # Esto representa cuántas veces se ha realizado ese movimiento en ese estado.
+                self.transition_counts[prev_state][move] += 1
+
+            # Se anota el incremento para guardarlo en el próximo save_data.
+            key = (prev_state, move)
+            self.pending[key] = self.pending.get(key, 0) + 1
+
+
+    def update_model_bulk(self, counts):
+        # Versión por lotes de update_model: recibe {(estado, movimiento): cantidad}
+        # (por ejemplo, lo acumulado por el simulador en miles de partidas) y lo suma de una vez.
+        self.ensure_loaded()
+        counts = self.symmetry.fold_deltas(counts)
+        # Un lote toca estados de todas las franjas: se toman todas.
+        with self.locks.all():
+            if self.decisions is not None:
+                self.decisions.invalidate_many({state for state, _ in counts})
+            if self.budget:
+                self.budget.learn_bulk(self.transition_counts, counts)
+            else:
+                add_counts(self.transition_counts, counts)
+            for key, n in counts.items():
+                self.pending[key] = self.pending.get(key, 0) + n
+
 
-        # Si el movimiento dado (move) no está registrado en ese estado,
-        # se inicializa con un contador en cero.
-        if move not in self.transition_counts[prev_state]:
-            self.transition_counts[prev_state][move] = 0
+    def merge(self, other):
+        # Combina un modelo entrenado por separado: otro MarkovAI (de cualquiera de las dos carpetas)
+        # o directamente una tabla {estado: {movimiento: conteo}}. Los contadores se suman.
+        counts = other.transition_counts if hasattr(other, 'transition_counts') else other
+        self.update_model_bulk(flatten(counts))
 
-        # Se incrementa el contador del movimiento para ese estado específico.
-        # Esto representa cuántas veces se ha realizado ese movimiento en ese estado.
-        self.transition_counts[prev_state][move] += 1
 
+    def predict_next_move(self, state, available_moves, board=None, history=None):
+        # `history` permite que varias partidas compartan el mismo modelo (por ejemplo en el
+        # servidor) cada una con su propia lista de jugadas; por defecto se usa self.history.
+        if self.loader is not None:
+            self.ensure_loaded()
 
-    def predict_next_move(self, state, available_moves, board=None):
         # Inicializa la variable del movimiento que se retornará y el origen de la decisión (para debug).
         move = None
         source = ""
 
-        # Verifica si el estado actual existe en el modelo de transición y tiene movimientos registrados.
-        if state in self.transition_counts and self.transition_counts[state]:
-            move_counts = self.transition_counts[state]
+        # El modelo está indexado por la forma canónica del tablero; t es la transformación usada.
+        canonical_state, t = self.symmetry.canonical(state)
+
+        # Con n-gramas se intenta primero el contexto con las jugadas previas de esta partida.
+        if self.ngram:
+            previous = [m for _, m in (self.history if history is None else history)]
+            move = self.ngram.predict(state, previous, available_moves, random)
+            if move is not None:
+                source = "n-grama "
+
+        # Caché de decisiones (ver tttCore.decisionCache): si esta posición ya se resolvió y el modelo no
+        # aprendió nada de ella desde entonces, se reutiliza la distribución de Markov ya filtrada o la
+        # jugada de la búsqueda. Solo cuando se ofrecen todas las casillas vacías (lo normal), porque
+        # la decisión guardada supone eso.
+        cached = generation = None
+        cacheable = (move is None and self.decisions is not None
+                     and len(available_moves) == self.symmetry.cells - state.bit_count())
+        if cacheable:
+            generation = self.decisions.generation
+            cached = self.decisions.get(canonical_state, t)
+            if metrics.enabled:
+                metrics.inc('cache.hits' if cached is not None else 'cache.misses')
+        decision = cached
+
+        # Verifica si el estado actual existe en el modelo de transición y tiene movimientos registrados
+        # (una copia tomada bajo el candado del estado; ver read_counts). Con presupuesto la lectura
+        # se hace siempre, porque cuenta como uso del estado aunque ya haya respondido el n-grama.
+        lookup = move is None and decision is None
+        move_counts = self.read_counts(canonical_state) if lookup or self.budget else None
+        if lookup and move_counts:
 
             # Filtra los movimientos posibles según los disponibles en el tablero actual.
+            # Las jugadas guardadas están en el marco canónico: se comparan con las disponibles
+            # transformadas y se devuelven en coordenadas del tablero real.
+            available = {self.symmetry.to_canonical(move, t): move for move in available_moves}
             filtered_moves = {
-                move: count for move, count in move_counts.items() if move in available_moves
+                available[move]: count for move, count in move_counts.items() if move in available
             }
 
-            # Si hay movimientos filtrados válidos, se selecciona uno de forma probabilística.
+            # Si hay movimientos filtrados válidos, se guardan con sus probabilidades normalizadas.
             if filtered_moves:
                 total = sum(filtered_moves.values())  # Suma total de ocurrencias para normalizar.
                 moves = list(filtered_moves.keys())  # Lista de movimientos válidos.
                 probabilities = [count / total for count in filtered_moves.values()]  # Probabilidades normalizadas.
-
-                # Escoge aleatoriamente un movimiento basado en las probabilidades aprendidas.
-                move = random.choices(moves, weights=probabilities, k=1)[0]
-                source = "Markov "  # Marca que la elección fue hecha por la IA Markov.
-
-        # Si no se encontró ningún movimiento con Markov y se proporcionó el tablero,
-        # se utiliza el algoritmo Minimax para calcular el mejor movimiento.
+                decision = ('markov', moves, probabilities)
+
+        # Escoge aleatoriamente un movimiento basado en las probabilidades aprendidas (también si
+        # la distribución vino de la caché: la elección sigue siendo al azar).
+        if decision is not None and decision[0] == 'markov':
+            move = random.choices(decision[1], weights=decision[2], k=1)[0]
+            source = "Markov "  # Marca que la elección fue hecha por la IA Markov.
+
+        # Acierto = el modelo aprendido (n-grama o diccionario) conocía el estado; fallo = hay que buscar.
+        if metrics.enabled:
+            metrics.inc('markov.hits' if move is not None else 'markov.misses')
+
+        # Si no se encontró ningún movimiento con Markov y se proporcionó el tablero, se usa la
+        # jugada guardada en la caché, la del libro de aperturas si la posición está ahí o, si no,
+        # la búsqueda de respaldo (Minimax o MCTS) para calcular el mejor movimiento.
+        # Con métricas se mide el tiempo de cada búsqueda (y, en modo captura, se perfilan las lentas).
         if move is None and board:
-            move = self.get_minimax_move(board)
-            if move:
-                source = "Minimax "  # Marca que la elección fue hecha por Minimax.
+            if decision is not None:
+                move, source = decision[1], decision[2]
+            else:
+                if self.book is not None and getattr(board, 'geometry', DEFAULT).k == self.book.k:
+                    move = self.book.get(canonical_state, t)
+                    source = "Libro "
+                if move is None:
+                    if metrics.enabled:
+                        move = metrics.call('mcts.move' if self.mcts else 'minimax.move', self.get_minimax_move, board)
+                    else:
+                        move = self.get_minimax_move(board)
+                    source = "MCTS " if self.mcts else "Minimax "  # Marca qué búsqueda eligió la jugada.
+                if move:
+                    decision = ('search', move, source)
+
+        # Lo recién calculado queda en la caché hasta que el modelo aprenda algo de este estado.
+        # (si otro hilo aprendió algo mientras tanto, put la descarta).
+        if cacheable and cached is None and decision is not None:
+            self.decisions.put(canonical_state, t, decision, generation)
 
         # Si se ha seleccionado un movimiento, se imprime el origen y se guarda en la historia para aprendizaje futuro.
         if move:
-            print(f"Respuesta encontrada por {source}")
-            self.record_player_move(state, move)
+            if self.verbose:
+                print(f"Respuesta encontrada por {source}")
+            if metrics.enabled:
+                metrics.inc('moves.' + source.strip().lower().replace('-', ''))
+            self.record_player_move(state, move, history)
 
         # Retorna el movimiento elegido.
         return move
 
 
-    def get_minimax_move(self, board):
-        # Define la función recursiva interna minimax, que evalúa el valor del tablero.
-        def minimax(b, is_maximizing):
-            # Si gana la IA, retorna +1.
-            if check_winner(b, AI): return 1
-            # Si gana el jugador, retorna -1.
-            if check_winner(b, PLAYER): return -1
-            # Si el tablero está lleno (empate), retorna 0.
-            if is_full(b): return 0
-
-            # Si es el turno de maximizar (la IA):
-            if is_maximizing:
-                best = -float('inf')  # Inicializa el mejor puntaje como el menor posible.
-                for i in range(3):
-                    for j in range(3):
-                        if b[i][j] == ' ':  # Si la celda está vacía:
-                            b[i][j] = AI  # Simula el movimiento de la IA.
-                            score = minimax(b, False)  # Evalúa recursivamente como minimizador.
-                            b[i][j] = ' '  # Deshace el movimiento (backtracking).
-                            best = max(score, best)  # Guarda el mejor puntaje posible.
-                return best
-
-            # Si es el turno de minimizar (el jugador):
-            else:
-                best = float('inf')  # Inicializa el mejor puntaje como el mayor posible.
-                for i in range(3):
-                    for j in range(3):
-                        if b[i][j] == ' ':  # Si la celda está vacía:
-                            b[i][j] = PLAYER  # Simula el movimiento del jugador.
-                            score = minimax(b, True)  # Evalúa recursivamente como maximizador.
-                            b[i][j] = ' '  # Deshace el movimiento.
-                            best = min(score, best)  # Guarda el peor puntaje posible (para el jugador).
-                return best
-
-        # Inicializa las variables para encontrar el mejor movimiento.
-        best_score = -float('inf')
-        move = None
+    def read_counts(self, canonical_state):
+        # Copia de los conteos del estado tomada bajo el candado de su franja: una foto consistente
+        # aunque otros hilos estén aprendiendo en ese momento (None si el estado no tiene datos).
+        # Con presupuesto, la lectura aplica el decaimiento pendiente del estado y cuenta como uso
+        # (para LRU/LFU y para las estadísticas de aciertos). get no copia nada al overlay cuando
+        # la tabla es una instantánea.
+        with self.locks.for_state(canonical_state):
+            if self.budget:
+                self.budget.read(self.transition_counts, canonical_state)
+            move_counts = self.transition_counts.get(canonical_state)
+            return dict(move_counts) if move_counts else None
+
+
+    def cache_stats(self):
+        # Aciertos, fallos, invalidaciones y tamaño de la caché de decisiones y del libro de aperturas.
+        return {
+            'decisions': self.decisions.stats() if self.decisions is not None else None,
+            'book': self.book.stats() if self.book is not None else None,
+        }
+
+
+    def memory_stats(self):
+        # Estados, transiciones y bytes aproximados de la tabla en memoria; con presupuesto
+        # también el reloj, aciertos/fallos de consulta y cantidad de estados desalojados.
+        # Se recorre la tabla con todas las franjas tomadas, para que ningún hilo agregue estados mientras tanto.
+        self.ensure_loaded()
+        with self.locks.all():
+            if self.budget:
+                return self.budget.stats(self.transition_counts)
+            # Con instantánea, la memoria propia del proceso es el overlay (el archivo se comparte).
+            if self.snapshot_file:
+                return self.transition_counts.stats()
+            return table_stats(self.transition_counts)
+
 
-        # Recorre todas las posiciones posibles del tablero.
-        for i in range(3):
-            for j in range(3):
-                if board[i][j] == ' ':
-                    board[i][j] = AI  # Simula movimiento de la IA en esa posición.
-                    score = minimax(board, False)  # Evalúa la jugada usando minimax.
-                    board[i][j] = ' '  # Deshace el movimiento (backtracking).
+    def get_minimax_move(self, board):
+        # El 3x3 ya está resuelto en tttCore.solver (una tabla con las ~765 posiciones canónicas),
+        # así que la jugada óptima para la IA es una consulta directa en lugar de recorrer el árbol.
+        # Devuelve una jugada con el mismo valor que el minimax exhaustivo, prefiriendo ganar
+        # en menos jugadas (o perder en más); si hay empate, la primera por filas y columnas.
+        # Con fallback='mcts' no se usa el solver: la fuerza la decide el presupuesto de playouts.
+        if self.mcts is None and getattr(board, 'geometry', DEFAULT) is DEFAULT:
+            return solver.best_move(board, AI)
+        # Si ya se pensó este tablero por adelantado, la respuesta sale sin buscar.
+        if self.pondered:
+            move = self.pondered.pop(board.encode(), None)
+            if move is not None:
+                if metrics.enabled:
+                    metrics.inc('minimax.pondered')
+                return move
+        # MCTS continúa el árbol de la jugada anterior si el tablero sigue esa partida; lo aprendido
+        # por Markov guía las jugadas de la IA en las simulaciones (con varios procesos, la copia
+        # que se les manda se toma con todas las franjas bloqueadas).
+        if self.mcts is not None:
+            if self.loader is not None:
+                self.ensure_loaded()
+            move = self.mcts.search(board, AI, prior=self.transition_counts, prior_locks=self.locks)[1]
+            if metrics.enabled:
+                metrics.inc('mcts.playouts', self.mcts.playouts)
+            return move
+        # En tableros NxN se busca con profundización iterativa hasta agotar time_budget
+        # y se usa la mejor jugada de la última profundidad completa.
+        move = self.engine.search(board, AI, time_limit=self.time_budget)[1]
+        if metrics.enabled:
+            metrics.inc('minimax.nodes', self.engine.nodes)
+        return move
 
-                    # Si esta jugada da mejor puntaje que las anteriores, guárdala.
-                    if score > best_score:
-                        best_score = score
-                        move = (i, j)
 
-        # Retorna la mejor jugada encontrada.
+    def ponder(self, board):
+        # Pensar por adelantado (ver tttCore.aiWorker): `board` es un tablero al que se llega con una
+        # posible jugada del humano. Se calcula la respuesta de la búsqueda de respaldo y se guarda para
+        # que get_minimax_move la devuelva al instante si el humano juega eso. No hace falta en el 3x3
+        # con Minimax (el solver es una consulta) ni si Markov ya conoce el estado (esa respuesta es
+        # inmediata). Si abort() corta la búsqueda porque llegó una jugada real, no se guarda nada.
+        if self.mcts is None and getattr(board, 'geometry', DEFAULT) is DEFAULT:
+            return None
+        if board.winner() is not None or board.is_full():
+            return None
+        if self.loader is not None:
+            self.ensure_loaded()
+        code = board.encode()
+        if code in self.pondered or self.transition_counts.get(self.symmetry.canonical(code)[0]):
+            return None
+        if self.mcts is not None:
+            engine = self.mcts
+            move = engine.search(board, AI, prior=self.transition_counts, prior_locks=self.locks)[1]
+        else:
+            engine = self.engine
+            move = engine.search(board, AI, time_limit=self.time_budget)[1]
+        if not engine.aborted:
+            self.pondered[code] = move
         return move
 
 
-    def record_player_move(self, state, move):
-        self.history.append((state, move))
+    def abort(self):
+        # Desde otro hilo (por ejemplo AIWorker): corta la búsqueda en curso, sea Minimax o MCTS.
+        self.engine.abort()
+        if self.mcts is not None:
+            self.mcts.abort()
+
 
-    def end_game(self):
-        if self.history:
-            for state, move in self.history:
+    def record_player_move(self, state, move, history=None):
+        (self.history if history is None else history).append((state, move))
+
+    def end_game(self, history=None, board=None):
+        # Con `history` se aprende de la lista de una sesión concreta y se vacía esa lista.
+        # `board` (el tablero final) solo hace falta para registrar la última jugada del humano.
+        moves = self.history if history is None else history
+        if self.game_log is not None and moves:
+            geometry = getattr(board, 'geometry', None)
+            self.game_log.append_pairs(moves, board.encode() if board is not None else None, self.symmetry.size,
+                                       geometry.k if geometry is not None else None)
+        if moves:
+            for state, move in moves:
                 self.update_model(state, move)
-            self.save_data()
-        self.history = []
+            # El n-grama necesita la secuencia completa para armar los contextos.
+            if self.ngram:
+                self.ngram.learn_game(moves)
+            # Solo se encolan los cambios; el hilo escritor los guarda sin bloquear la interfaz.
+            # Como en save_data, lo pendiente se cambia por un dict vacío con todas las franjas
+            # tomadas: otro hilo que termine a la vez no encola el mismo lote ni suma al entregado.
+            with self.locks.all():
+                pending, self.pending = self.pending, {}
+            self.writer.submit(pending)
+        if metrics.enabled:
+            metrics.inc('games')
+        self.pondered.clear()
+        if self.mcts is not None:
+            self.mcts.clear()  # el árbol de esta partida ya no sirve
+        if history is None:
+            self.history = []
+        else:
+            history.clear()
 
@@ -1,33 +1,43 @@
 from sesoIA import MarkovAI
-import json
-import random
-import copy
-import os
+import sys
 import tkinter as tk
 from tkinter import messagebox
 
-from utils import check_winner, is_full, PLAYER, AI
+from utils import Board, check_winner, is_full, PLAYER, AI
+from tttCore.aiWorker import AIWorker
+from tttCore.search import move_order
+
+
+PONDER_MOVES = 6  # respuestas que se piensan por adelantado mientras juega el humano
 
 
 class TicTacToe:
-    def __init__(self, root):
-        self.board = [[' ' for _ in range(3)] for _ in range(3)]
-        self.buttons = [[None for _ in range(3)] for _ in range(3)]
+    def __init__(self, root, size=3, k=None):
+        # tablero NxN con K en línea (por defecto el 3x3 clásico)
+        self.size = size
+        self.k = k
+        self.board = Board.empty(size, k)
+        self.buttons = [[None for _ in range(size)] for _ in range(size)]
         self.root = root
-        self.ai = MarkovAI()
+        self.ai = MarkovAI(size=size, k=k, load='background', game_log=True)  # el modelo se lee mientras aparece la ventana
+        # la IA piensa y guarda en otro hilo; la ventana recibe la jugada por una cola (ver tttCore.aiWorker)
+        self.worker = AIWorker(root.after, interrupt=self.ai.abort)
+        self.thinking = False  # mientras la IA calcula se ignoran los clics
         self.create_widgets()
+        self.start_pondering()
 
     def create_widgets(self):
-        for i in range(3):
-            for j in range(3):
+        for i in range(self.size):
+            for j in range(self.size):
                 btn = tk.Button(self.root, text=' ', font=('Arial', 40), width=5, height=2,
                                 command=lambda i=i, j=j: self.player_move(i, j))
                 btn.grid(row=i, column=j)
                 self.buttons[i][j] = btn
 
     def player_move(self, i, j):
-        if self.board[i][j] == ' ':
-            self.board[i][j] = PLAYER
+        if self.thinking:
+            return
+        if self.board.place(i, j, PLAYER):
             self.buttons[i][j].config(text=PLAYER, state='disabled')
             if check_winner(self.board, PLAYER):
                 messagebox.showinfo("Ganaste")
@@ -40,32 +50,60 @@ class TicTacToe:
             self.ai_turn()
 
     def ai_turn(self):
-        board_state = tuple(cell if cell != ' ' else '_' for row in self.board for cell in row)
-        available = [(i, j) for i in range(3) for j in range(3) if self.board[i][j] == ' ']
-        move = self.ai.predict_next_move(board_state, available, board=copy.deepcopy(self.board))
+        board_state = self.board.encode()
+        available = self.board.empty_cells()
+        self.thinking = True
+        self.worker.submit(self.ai.predict_next_move, board_state, available, self.board.copy(),
+                           callback=self.apply_ai_move, errback=self.ai_failed)
 
+    def apply_ai_move(self, move):
+        # de vuelta en el hilo de Tk con la jugada calculada
+        self.thinking = False
         if move:
             i, j = move
-            self.board[i][j] = AI
+            self.board.place(i, j, AI)
             self.buttons[i][j].config(text=AI, state='disabled')
 
             if check_winner(self.board, AI):
                 messagebox.showinfo("Perdiste")
-                self.ai.end_game()
                 self.reset()
+                return
             elif is_full(self.board):
                 messagebox.showinfo("Empate", "¡Nadie ganó! 💤")
-                self.ai.end_game()
                 self.reset()
+                return
+        self.start_pondering()
+
+    def ai_failed(self, error):
+        # la IA no pudo elegir jugada: se avisa y empieza otra partida en vez de quedar esperando
+        self.thinking = False
+        messagebox.showerror("Error", f"La IA no pudo elegir su jugada: {error}")
+        self.reset()
+
+    def start_pondering(self):
+        # turno del humano: se piensan las respuestas a sus jugadas más probables (las mejor ubicadas primero)
+        empty = self.board.empty_mask()
+        likely = [cell for cell in move_order(self.board.geometry) if empty >> cell & 1][:PONDER_MOVES]
+        for cell in likely:
+            board = self.board.copy()
+            board.make_move(cell, PLAYER)
+            self.worker.ponder(self.ai.ponder, board)
 
     def reset(self):
-        self.ai.end_game()
-        self.board = [[' ' for _ in range(3)] for _ in range(3)]
-        for i in range(3):
-            for j in range(3):
+        self.worker.cancel()
+        self.thinking = False
+        self.worker.submit(self.ai.end_game, None, self.board)  # una sola vez por partida: aprende en el hilo de la IA
+        self.board = Board.empty(self.size, self.k)
+        for i in range(self.size):
+            for j in range(self.size):
                 self.buttons[i][j].config(text=' ', state='normal')
+        self.start_pondering()
 
-root = tk.Tk()
-root.title("Tic Tac Toe con IA ")
-app = TicTacToe(root)
-root.mainloop()
+# Lanzar la app solo al ejecutar el archivo: importarlo no abre ninguna ventana
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("Tic Tac Toe con IA ")
+    app = TicTacToe(root, *[int(arg) for arg in sys.argv[1:3]])  # python ticTacToeIa.py [N [K]]
+    root.mainloop()
+    app.worker.close()  # termina lo que haya pendiente (por ejemplo el último end_game)
+    app.ai.close()  # escribe lo que quede en la cola antes de salir
@@ -1,15 +1,14 @@
 # utils.py
 
-PLAYER = 'X'
-AI = 'O'
+import os
+import sys
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tttCore.bitboard import Board, PLAYER, AI
+
+# el tablero es un tttCore.bitboard.Board: las victorias se revisan con máscaras precalculadas
 def check_winner(board, player):
-    for i in range(3):
-        if all(cell == player for cell in board[i]): return True
-        if all(board[j][i] == player for j in range(3)): return True
-    if all(board[i][i] == player for i in range(3)): return True
-    if all(board[i][2 - i] == player for i in range(3)): return True
-    return False
+    return board.is_winner(player)
 
 def is_full(board):
-    return all(cell != ' ' for row in board for cell in row)
+    return board.is_full()
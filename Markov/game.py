@@ -1,35 +1,43 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tttCore.bitboard import Board
+
 class TicTacToe:
     
-    def __init__(self):
-        self.board = [['' for _ in range(3)] for _ in range(3)]
+    def __init__(self, size=3, k=None):
+        self.board = Board.empty(size, k) # dos enteros de N*N bits, uno por jugador (3x3 y 3 en línea por defecto)
+        self.moves = [] # pila de jugadas (casilla, jugador) para poder deshacerlas
 
     def reset(self):
-        self.board = [['' for _ in range(3)] for _ in range(3)]
+        self.board.reset()
+        self.moves = []
 
     def make_move(self, row, col, player):
-        if self.board[row][col] == '':
-            self.board[row][col] = player
+        if self.board.is_empty(row, col):
+            cell = row * self.board.size + col
+            self.board.make_move(cell, player)
+            self.moves.append((cell, player))
             return True
         return False
 
+    def undo_move(self):
+        cell, _ = self.moves.pop()
+        self.board.undo_move(cell)
+
     def check_winner(self):
-        for i in range(3):
-            if self.board[i][0] != '' and all(self.board[i][j] == self.board[i][0] for j in range(3)):
-                return self.board[i][0]
-            if self.board[0][i] != '' and all(self.board[j][i] == self.board[0][i] for j in range(3)):
-                return self.board[0][i]
-    
-        if self.board[0][0] != '' and all(self.board[i][i] == self.board[0][0] for i in range(3)):
-            return self.board[0][0]
-        if self.board[0][2] != '' and all(self.board[i][2 - i] == self.board[0][2] for i in range(3)):
-            return self.board[0][2]
-        return None
+        # solo puede haber ganado quien hizo la última jugada, y solo por las líneas que pasan por ella
+        if not self.moves:
+            return None
+        cell, player = self.moves[-1]
+        return player if self.board.wins_through(cell, player) else None
 
     def is_draw(self):
-        return all(self.board[i][j] != '' for i in range(3) for j in range(3)) and self.check_winner() is None
+        return self.board.is_full() and self.check_winner() is None
 
     def get_empty_cells(self):
-        return [(i, j) for i in range(3) for j in range(3) if self.board[i][j] == '']
+        return self.board.empty_cells()
 
     def get_board_state(self):
-        return tuple(cell if cell != '' else '_' for row in self.board for cell in row)
+        return self.board.encode() # el estado completo es un solo entero
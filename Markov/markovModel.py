@@ -1,59 +1,222 @@
-import json
 import random
-import copy
 import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tttCore.countBudget import CountBudget, table_stats
+from tttCore.decisionCache import DecisionCache
+from tttCore.gameLog import GameLog, log_path
+from tttCore.locking import StripedLock
+from tttCore.metrics import file_bytes, metrics
+from tttCore.ngramModel import ngram_path, open_ngram
+from tttCore.persistence import WriteBehindWriter
+from tttCore.snapshot import Snapshot, SnapshotTable, build_snapshot, snapshot_path
+from tttCore.storage import add_counts, flatten, open_storage
+from tttCore.symmetry import Symmetry
 
 class MarkovAI:
-    def __init__(self, data_file='markov_data.json'):
+    def __init__(self, data_file='markov_data.json', backend='sqlite', flush_games=10, flush_interval=5.0, size=3, k=None,
+                 max_states=None, eviction='lru', half_life=None, order=0, min_count=2, load='eager',
+                 snapshot=False, game_log=None, decision_cache=4096):
         self.data_file = data_file
+        self.storage = open_storage(data_file, backend, size, k) # sqlite, binary, json o memory (ver tttCore.storage); cada tamaño y k con su archivo
+        self.writer = WriteBehindWriter(self.storage, flush_games, flush_interval) # escribe en segundo plano
+        self.symmetry = Symmetry.get(size) # las 8 rotaciones/reflexiones de un estado comparten contadores
+        # límite de estados en memoria (desalojo 'lru' o 'lfu') y vida media de los conteos en jugadas aprendidas
+        self.budget = CountBudget(max_states, eviction, half_life) if max_states or half_life else None
+        # snapshot=True: la tabla se lee de una instantánea mapeada en memoria (compartida entre procesos)
+        # y lo aprendido va a un overlay propio; merge_snapshot la regenera (ver tttCore.snapshot)
+        if snapshot and (self.budget or backend == 'memory'):
+            raise ValueError("la instantánea necesita un archivo de datos y no admite presupuesto de memoria")
+        self.snapshot_file = snapshot_path(data_file, size, k) if snapshot else None
+        # caché acotada de decisiones por estado (táctica y distribución de Markov ya filtrada; ver
+        # tttCore.decisionCache); se invalida al aprender del estado. Sin caché con presupuesto de memoria
+        self.decisions = DecisionCache(decision_cache) if decision_cache and not self.budget else None
         self.transition_counts = {}
+        self.pending = {} # contadores (estado, movimiento) tocados desde el último guardado
+        # candados por franja de estados: varios hilos pueden aprender y consultar a la vez (ver
+        # tttCore.locking). Con presupuesto una sola franja, porque el desalojo toca toda la tabla
+        self.locks = StripedLock(1 if self.budget else 64)
+        self.load_lock = threading.Lock()
         self.history = [] # lista para guardar movimientos en la partida
-        self.load_data() # cargar datos previos
+        # con order > 0 también se predice por n-gramas: el tablero más las últimas `order` jugadas del jugador
+        self.ngram_file = ngram_path(None if backend == 'memory' else data_file, order, size, k) if order else None
+        self.ngram = open_ngram(self.ngram_file, order, size, min_count) if order else None
+        self.sequence = [] # jugadas del jugador en la partida actual (contexto del n-grama y registro; solo si hay alguno)
+        # game_log=True (markov_data.glog) o una ruta: cada partida se agrega a un registro de solo
+        # agregado para reentrenar fuera de línea (ver tttCore.gameLog y Entrenamiento/ingestLogs.py)
+        self.game_log = GameLog(log_path(data_file, size, k) if game_log is True else game_log) if game_log else None
+        # cargar datos previos: 'eager' ya, 'lazy' en el primer uso, 'background' en otro hilo
+        # (así la ventana aparece sin esperar; el primer uso espera a que termine)
+        self.loader = None
+        if load == 'background':
+            self.loader = threading.Thread(target=self.load_data, name='markov-loader', daemon=True)
+            self.loader.start()
+        elif load == 'lazy':
+            self.loader = True
+        elif load == 'eager':
+            self.load_data()
+        else:
+            raise ValueError(f"modo de carga desconocido: {load} (usa eager, lazy o background)")
+
+    # con carga diferida, termina de cargar antes de tocar la tabla (sin costo una vez cargada)
+    def ensure_loaded(self):
+        if self.loader is None:
+            return
+        with self.load_lock: # otro hilo puede estar cargando: se espera a que termine
+            if self.loader is True:
+                self.load_data()
+            elif self.loader is not None:
+                self.loader.join()
+            self.loader = None
 
-    # funcion para cargar los datos previos desde el archivo .json
+    # funcion para cargar los datos previos desde el almacenamiento
+    # (si el archivo todavía tiene estados sin canonizar se pliegan al cargar; ver Entrenamiento/canonicalizeModels.py)
     def load_data(self):
-        if os.path.exists(self.data_file) and os.path.getsize(self.data_file) > 0:
-            try:
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    self.transition_counts = {
-                        tuple(eval(state)): {tuple(map(int, k.split(','))): v for k, v in moves.items()}
-                        for state, moves in data.items()
-                    }
-            except (json.JSONDecodeError, SyntaxError):
-                print("Archivo JSON corrupto o mal formado, iniciando con datos vacíos.")
-                self.transition_counts = {}
+        start = time.perf_counter() if metrics.enabled else 0.0
+        if self.snapshot_file:
+            if not os.path.exists(self.snapshot_file): # la primera vez se arma desde el almacenamiento
+                build_snapshot(self.storage, self.snapshot_file, self.storage.size, self.symmetry)
+            table = SnapshotTable(Snapshot(self.snapshot_file))
         else:
-            self.transition_counts = {}
+            table = self.symmetry.fold(self.storage.load())
+        if metrics.enabled: # duración de la carga y tamaño del archivo
+            metrics.observe('storage.load', time.perf_counter() - start)
+            metrics.set('storage.bytes', file_bytes(self.storage.path))
+            metrics.set('markov.states', len(table))
+        with self.locks.all(): # la tabla nueva se publica entera, con ningún hilo leyendo o aprendiendo
+            if self.budget:
+                self.budget.fit(table) # con presupuesto solo se cargan los estados más usados
+            self.transition_counts = table
+        if self.decisions is not None:
+            self.decisions.clear() # la tabla cambió entera
 
-    # funcion para guardar nuevos datos al archivo .json
+    # entrega al hilo escritor los contadores que cambiaron
+    def submit_pending(self):
+        self.ensure_loaded() # que el hilo cargador no quede leyendo mientras se escribe
+        with self.locks.all(): # ningún hilo está sumando a lo pendiente mientras se cambia
+            pending, self.pending = self.pending, {}
+        self.writer.submit(pending)
+
+    # funcion para guardar ya los contadores que cambiaron (bloquea hasta que estén escritos)
     def save_data(self):
-        data = {
-            str(state): {f"{k[0]},{k[1]}": v for k, v in moves.items()}
-            for state, moves in self.transition_counts.items()
-        }
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        self.submit_pending()
+        self.writer.flush() # levanta el error del almacenamiento si no se pudo escribir
+
+    def close(self):
+        self.submit_pending()
+        try:
+            self.writer.close() # escribe lo encolado; si el backend sigue fallando, levanta el error
+        finally:
+            if self.game_log is not None:
+                self.game_log.close()
+            if self.ngram_file:
+                self.ngram.save(self.ngram_file) # el trie se guarda completo al cerrar
+            if self.snapshot_file:
+                self.transition_counts.close()
+
+    # guarda lo pendiente, arma una instantánea nueva con todo lo del almacenamiento y la vuelve a mapear
+    def merge_snapshot(self):
+        self.save_data()
+        build_snapshot(self.storage, self.snapshot_file, self.storage.size, self.symmetry)
+        with self.locks.all():
+            refreshed = self.transition_counts.refresh()
+        if refreshed and self.decisions is not None:
+            self.decisions.clear()
+
+    # en los procesos que solo leen: vuelve a mapear si otro proceso escribió una instantánea nueva
+    def refresh_snapshot(self):
+        self.ensure_loaded()
+        with self.locks.all():
+            refreshed = self.transition_counts.refresh()
+        if refreshed and self.decisions is not None:
+            self.decisions.clear()
+        return refreshed
 
 
     def update_model(self, prev_state, move):
-        if prev_state not in self.transition_counts: # si el estado anterior no está registrado en el diccionario, se inicializa
-            self.transition_counts[prev_state] = {}
-        if move not in self.transition_counts[prev_state]: # si el movimiento desde ese estado no está registrado, se inicializa su contador
-            self.transition_counts[prev_state][move] = 0
-        self.transition_counts[prev_state][move] += 1 # actualiza el contador con las veces que se ha realizado ese movimiento desde ese estado
+        if self.loader is not None:
+            self.ensure_loaded()
+        if self.ngram:
+            self.ngram.learn(prev_state, [m for _, m in self.sequence], move)
+        if self.ngram or self.game_log is not None: # sin n-grama ni registro nadie la lee (y end_game no siempre llega)
+            self.sequence.append((prev_state, move))
+        prev_state, move = self.symmetry.canonical_pair(prev_state, move) # se aprende sobre la forma canónica del tablero
+        with self.locks.for_state(prev_state): # solo se bloquea la franja de este estado
+            if self.decisions is not None:
+                self.decisions.invalidate(prev_state) # lo guardado para este estado ya no vale
+            if self.budget:
+                self.budget.learn(self.transition_counts, prev_state, move) # decae, suma y desaloja si hace falta
+            else:
+                if prev_state not in self.transition_counts: # si el estado anterior no está registrado en el diccionario, se inicializa
+                    self.transition_counts[prev_state] = {}
+                if move not in self.transition_counts[prev_state]: # si el movimiento desde ese estado no está registrado, se inicializa su contador
+                    self.transition_counts[prev_state][move] = 0
+                self.transition_counts[prev_state][move] += 1 # actualiza el contador con las veces que se ha realizado ese movimiento desde ese estado
+            key = (prev_state, move)
+            self.pending[key] = self.pending.get(key, 0) + 1
+
+    # suma de una vez los conteos {(estado, movimiento): cantidad} acumulados por el simulador
+    def update_model_bulk(self, counts):
+        self.ensure_loaded()
+        counts = self.symmetry.fold_deltas(counts)
+        with self.locks.all(): # un lote toca estados de todas las franjas
+            if self.decisions is not None:
+                self.decisions.invalidate_many({state for state, _ in counts})
+            if self.budget:
+                self.budget.learn_bulk(self.transition_counts, counts)
+            else:
+                add_counts(self.transition_counts, counts)
+            for key, n in counts.items():
+                self.pending[key] = self.pending.get(key, 0) + n
+
+    # combina otro modelo entrenado por separado (otro MarkovAI o una tabla {estado: {movimiento: conteo}})
+    def merge(self, other):
+        counts = other.transition_counts if hasattr(other, 'transition_counts') else other
+        self.update_model_bulk(flatten(counts))
 
     def predict_next_move(self, state, available_moves):
-        
-        if state not in self.transition_counts:
+        if self.loader is not None:
+            self.ensure_loaded()
+        if self.ngram: # primero el contexto más largo con datos; si no sabe nada, el modelo de siempre
+            move = self.ngram.predict(state, [m for _, m in self.sequence], available_moves, random)
+            if move is not None:
+                if metrics.enabled:
+                    metrics.inc('markov.hits')
+                return move
+        state, t = self.symmetry.canonical(state) # se consulta la forma canónica del tablero
+        distribution = self.distribution(state, t, available_moves)
+        if distribution is None:
+            if metrics.enabled:
+                metrics.inc('markov.misses') # estado nunca visto (o sin jugadas posibles): jugada al azar
             return random.choice(available_moves)
+        if metrics.enabled:
+            metrics.inc('markov.hits')
+        moves, probabilities = distribution
+        return random.choices(moves, weights=probabilities, k=1)[0] # se selecciona un movimiento aleatorio ponderado por su probabilidad
 
-        move_counts = self.transition_counts[state] # obtener los movimientos posibles desde el estado actual
+    # copia de los conteos del estado canónico tomada bajo el candado de su franja: una foto
+    # consistente aunque otros hilos estén aprendiendo en ese momento (None si no hay datos)
+    def read_counts(self, state):
+        with self.locks.for_state(state):
+            if self.budget:
+                self.budget.read(self.transition_counts, state) # aplica el decaimiento pendiente y marca el uso
+            move_counts = self.transition_counts.get(state)
+            return dict(move_counts) if move_counts else None
 
-        filtered_moves = {move: count for move, count in move_counts.items() if move in available_moves} # movimientos posibles
+    # jugadas posibles del estado canónico con sus probabilidades aprendidas, o None si no hay datos
+    def distribution(self, state, t, available_moves):
+        move_counts = self.read_counts(state) # obtener los movimientos posibles desde el estado actual
+        if move_counts is None:
+            return None
 
+        # jugadas disponibles pasadas al marco canónico (y de vuelta al tablero real al elegir)
+        available = {self.symmetry.to_canonical(move, t): move for move in available_moves}
+        filtered_moves = {available[move]: count for move, count in move_counts.items() if move in available} # movimientos posibles
         if not filtered_moves:
-            return random.choice(available_moves)
+            return None
 
         # Se suman las frecuencias de movimientos válidos desde el estado
         total = sum(filtered_moves.values())
@@ -61,39 +224,106 @@ class MarkovAI:
         moves = list(filtered_moves.keys())
         # Se calcula la probabilidad de cada movimiento dividiendo su frecuencia entre el total de frecuencias.
         probabilities = [count / total for count in filtered_moves.values()]
+        return moves, probabilities
 
-        chosen_move = random.choices(moves, weights=probabilities, k=1)[0] # se selecciona un movimiento aleatorio ponderado por su probabilidad
-        return chosen_move
+    # estados, transiciones y bytes aproximados en memoria; con presupuesto, también aciertos y desalojos
+    def memory_stats(self):
+        self.ensure_loaded()
+        with self.locks.all(): # se recorre la tabla: que nadie agregue estados mientras tanto
+            if self.budget:
+                return self.budget.stats(self.transition_counts)
+            if self.snapshot_file: # lo propio del proceso es el overlay; el archivo mapeado se comparte
+                return self.transition_counts.stats()
+            return table_stats(self.transition_counts)
 
     def get_best_move(self, game):
+        # si la posición ya se resolvió (y no se aprendió nada de ella desde entonces) se usa la
+        # decisión guardada: ganar, bloquear o la distribución de Markov ya filtrada
+        state = game.get_board_state()
+        canonical, t = self.symmetry.canonical(state)
+        decision = generation = None
+        if self.decisions is not None:
+            generation = self.decisions.generation
+            decision = self.decisions.get(canonical, t)
+            if metrics.enabled:
+                metrics.inc('cache.hits' if decision is not None else 'cache.misses')
+        if decision is None:
+            decision = self.decide(game, canonical, t)
+            if self.decisions is not None:
+                self.decisions.put(canonical, t, decision, generation)
+
+        kind = decision[0]
+        if kind in ('win', 'block'):
+            if metrics.enabled:
+                metrics.inc('moves.' + kind)
+            return decision[1]
+        if kind == 'markov':
+            if metrics.enabled:
+                metrics.inc('markov.hits')
+            return random.choices(decision[1], weights=decision[2], k=1)[0]
+        return self.predict_next_move(state, game.get_empty_cells()) # n-grama o estado sin datos
+
+    # decisión para la posición: ('win', jugada), ('block', jugada), ('markov', jugadas, probabilidades)
+    # o ('predict',) cuando hay que preguntarle a predict_next_move en cada jugada
+    def decide(self, game, canonical, t):
         # la IA revisa si puede ganar en el siguiente movimiento para colocar el O si la encuentra
         winning_move = self.check_win_block(game, 'O') 
         if winning_move:
-            return winning_move
+            return ('win', winning_move)
 
         # si no puede ganar, la IA revisa si el jugador puede ganar en el siguiente, para bloquearlo
         blocking_move = self.check_win_block(game, 'X')
         if blocking_move:
-            return blocking_move
+            return ('block', blocking_move)
 
-        state = game.get_board_state() # sin necesidad de bloquear o ganar, predice el sgte movimietno del jugador con markov
-        return self.predict_next_move(state, game.get_empty_cells())
+        # sin necesidad de bloquear o ganar, predice el sgte movimietno del jugador con markov
+        # (el n-grama depende de las jugadas previas de la partida: no se guarda)
+        if self.ngram or self.budget:
+            return ('predict',)
+        if self.loader is not None:
+            self.ensure_loaded()
+        distribution = self.distribution(canonical, t, game.get_empty_cells())
+        if distribution is None:
+            return ('predict',)
+        return ('markov',) + distribution
+
+    # aciertos, fallos, invalidaciones y tamaño de la caché de decisiones
+    def cache_stats(self):
+        return self.decisions.stats() if self.decisions is not None else None
 
     # checar si puede ganar en el siguiente movimiento
     def check_win_block(self, game, player):
         for move in game.get_empty_cells():
-            temp_game = copy.deepcopy(game)
-            temp_game.make_move(*move, player)
-            if temp_game.check_winner() == player:
+            game.make_move(*move, player) # se prueba la jugada sobre el mismo tablero y luego se deshace
+            won = game.check_winner() == player
+            game.undo_move()
+            if won:
                 return move
         return None
 
+    # partida abandonada sin end_game: lo ya aprendido queda, pero la próxima empieza sin contexto
+    def reset_game(self):
+        self.history = []
+        self.sequence = []
+
     def record_player_move(self, state, move):
         self.history.append((state, move))
 
-    def end_game(self):
+    # `board` (el tablero final) solo se usa para registrar la última jugada de la IA en el game_log
+    def end_game(self, board=None):
+        played = self.sequence # lo aprendido en vivo con update_model
+        self.sequence = [] # las jugadas registradas forman su propia secuencia
         for state, move in self.history:
             self.update_model(state, move)
+        if self.game_log is not None:
+            geometry = getattr(board, 'geometry', None)
+            self.game_log.append_pairs(played + self.sequence, board.encode() if board is not None else None,
+                                       self.symmetry.size, geometry.k if geometry is not None else None)
         self.history = []
-        self.save_data()
+        self.sequence = []
+        if metrics.enabled:
+            metrics.inc('games')
+        with self.locks.all(): # como en save_data: ningún hilo suma al lote ya entregado ni lo encola dos veces
+            pending, self.pending = self.pending, {}
+        self.writer.submit(pending) # solo se encola; el hilo escritor lo guarda por lotes
 
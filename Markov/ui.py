@@ -1,33 +1,41 @@
+import sys
 import tkinter as tk
 from game import TicTacToe
 from markovModel import MarkovAI
+from tttCore.aiWorker import AIWorker
 
 class TicTacToeGUI:
-    def __init__(self):
-        # inicializar IA y ui
-        self.game = TicTacToe() 
-        self.ai = MarkovAI() 
+    def __init__(self, size=3, k=None):
+        # inicializar IA y ui (tablero NxN con K en línea; por defecto el 3x3 clásico)
+        self.size = size
+        self.k = k
+        self.game = TicTacToe(size, k) 
+        self.ai = MarkovAI(size=size, k=k, load='background', game_log=True) # la ventana no espera a que se lea el modelo
         self.window = tk.Tk()
         self.window.title("Tic Tac Toe con IA")
-        self.buttons = [[None for _ in range(3)] for _ in range(3)]
+        self.worker = AIWorker(self.window.after) # la IA aprende y elige en otro hilo (ver tttCore.aiWorker)
+        self.thinking = False # mientras la IA elige se ignoran los clics
+        self.buttons = [[None for _ in range(size)] for _ in range(size)]
         self.create_board()
         self.result_label = None
 
     def create_board(self):
-        for i in range(3):
-            for j in range(3):
+        for i in range(self.size):
+            for j in range(self.size):
                 btn = tk.Button(self.window, text='', width=10, height=3,
                                 command=lambda row=i, col=j: self.player_move(row, col))
                 btn.grid(row=i, column=j)
                 self.buttons[i][j] = btn
         self.reset_button = tk.Button(self.window, text="Reiniciar", font=('Arial', 12), command=self.reset_game)
-        self.reset_button.grid(row=4, column=0, columnspan=3, pady=10)
+        self.reset_button.grid(row=self.size + 1, column=0, columnspan=self.size, pady=10)
 
 
     def player_move(self, row, col):
+        if self.thinking:
+            return
         prev_state = self.game.get_board_state()  # guardar el estado antes de hacer el movimiento
         if self.game.make_move(row, col, 'X'):
-            self.ai.update_model(prev_state, (row, col))  
+            self.worker.submit(self.ai.update_model, prev_state, (row, col))
             self.update_buttons()
             winner = self.game.check_winner()
             if winner:
@@ -36,12 +44,19 @@ class TicTacToeGUI:
             if self.game.is_draw():
                 self.end_game("¡Empate!")
                 return
-            self.window.after(500, self.ai_move)
+            self.ai_move()
 
 
     def ai_move(self):
-        prev_state = self.game.get_board_state()  
-        move = self.ai.get_best_move(self.game)
+        # la IA prueba jugadas sobre su propia copia del tablero, así el botón de reinicio no la interrumpe
+        game = TicTacToe(self.size, self.k)
+        game.board = self.game.board.copy()
+        self.thinking = True
+        self.worker.submit(self.ai.get_best_move, game, callback=self.apply_ai_move, errback=self.ai_failed)
+
+    def apply_ai_move(self, move):
+        # de vuelta en el hilo de Tk con la jugada elegida
+        self.thinking = False
         self.game.make_move(*move, 'O')
 
         self.update_buttons()
@@ -51,27 +66,36 @@ class TicTacToeGUI:
         elif self.game.is_draw():
             self.end_game("¡Empate!")
 
+    def ai_failed(self, error):
+        # la IA no pudo elegir jugada: se termina la partida con el error en vez de quedar esperando
+        self.thinking = False
+        self.end_game(f"La IA falló: {error}")
+
 
     def update_buttons(self):
-        for i in range(3):
-            for j in range(3):
-                self.buttons[i][j]['text'] = self.game.board[i][j]
+        for i in range(self.size):
+            for j in range(self.size):
+                self.buttons[i][j]['text'] = self.game.board.get(i, j)
 
     def end_game(self, message):
-        for i in range(3):
-            for j in range(3):
+        for i in range(self.size):
+            for j in range(self.size):
                 self.buttons[i][j]['state'] = 'disabled'
         if self.result_label:
             self.result_label.destroy()
         self.result_label = tk.Label(self.window, text=message, font=('Arial', 14))
-        self.result_label.grid(row=3, column=0, columnspan=3)
+        self.result_label.grid(row=self.size, column=0, columnspan=self.size)
         
-        self.ai.end_game()
+        self.worker.submit(self.ai.end_game, self.game.board.copy())
 
     def reset_game(self):
+        self.worker.cancel() # si la IA estaba eligiendo, su jugada ya no se aplica
+        self.thinking = False
+        if self.result_label is None: # partida abandonada: sin end_game, su contexto no pasa a la próxima
+            self.worker.submit(self.ai.reset_game)
         self.game.reset()
-        for i in range(3):
-            for j in range(3):
+        for i in range(self.size):
+            for j in range(self.size):
                 self.buttons[i][j]['text'] = ''
                 self.buttons[i][j]['state'] = 'normal'
         if self.result_label:
@@ -80,9 +104,13 @@ class TicTacToeGUI:
 
     def run(self):
         self.window.mainloop()
+        self.worker.close() # termina lo pendiente en el hilo de la IA
+        self.ai.close() # escribe lo que quede en la cola antes de salir
 
 if __name__ == "__main__":
-    gui = TicTacToeGUI()
+    # python ui.py [N [K]]  ->  tablero NxN con K en línea
+    args = [int(arg) for arg in sys.argv[1:3]]
+    gui = TicTacToeGUI(*args)
     gui.run()
 
 
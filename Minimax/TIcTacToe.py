@@ -1,87 +1,50 @@
 import tkinter as tk
 from tkinter import messagebox
-import copy
-from tttMarkov.markovModel import MarkovAI
-
-
-
-
-PLAYER = 'X'
-AI = 'O'
-
-def check_winner(board, player):
-    # filas, columnas y diagonales
-    for i in range(3):
-        if all([cell == player for cell in board[i]]): return True
-        if all([board[j][i] == player for j in range(3)]): return True
-    if all([board[i][i] == player for i in range(3)]): return True
-    if all([board[i][2 - i] == player for i in range(3)]): return True
-    return False
-
-def is_full(board):
-    return all(cell != ' ' for row in board for cell in row)
-
-def minimax(board, is_maximizing):
-    if check_winner(board, AI):
-        return 1
-    if check_winner(board, PLAYER):
-        return -1
-    if is_full(board):
-        return 0
-
-    if is_maximizing:
-        best = -float('inf')
-        for i in range(3):
-            for j in range(3):
-                if board[i][j] == ' ':
-                    board[i][j] = AI
-                    score = minimax(board, False)
-                    board[i][j] = ' '
-                    best = max(score, best)
-        return best
-    else:
-        best = float('inf')
-        for i in range(3):
-            for j in range(3):
-                if board[i][j] == ' ':
-                    board[i][j] = PLAYER
-                    score = minimax(board, True)
-                    board[i][j] = ' '
-                    best = min(score, best)
-        return best
-
-def best_move(board):
-    best_score = -float('inf')
-    move = None
-    for i in range(3):
-        for j in range(3):
-            if board[i][j] == ' ':
-                board[i][j] = AI
-                score = minimax(board, False)
-                board[i][j] = ' '
-                if score > best_score:
-                    best_score = score
-                    move = (i, j)
-    return move
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([ROOT, os.path.join(ROOT, 'Markov')])
+from markovModel import MarkovAI
+from minimaxEngine import AI, PLAYER, best_move, check_winner, engine, is_full
+from tttCore.bitboard import Board
+from tttCore.metrics import metrics
+from tttCore.aiWorker import AIWorker
+from tttCore.search import move_order
+
+
+
+
+PONDER_MOVES = 6 # respuestas que se calculan por adelantado mientras juega el humano
 
 class TicTacToe:
-    def __init__(self, root):
-        self.board = [[' ' for _ in range(3)] for _ in range(3)]
-        self.buttons = [[None for _ in range(3)] for _ in range(3)]
+    def __init__(self, root, size=3, k=None):
+        # tablero NxN con K en línea (por defecto el 3x3 clásico)
+        self.size = size
+        self.k = k
+        self.board = Board.empty(size, k)
+        self.buttons = [[None for _ in range(size)] for _ in range(size)]
         self.root = root
+        self.ai = MarkovAI(size=size, k=k, load='background', game_log=True)  # el modelo se lee mientras aparece la ventana
+        # la jugada se calcula en otro hilo y vuelve por una cola (ver tttCore.aiWorker)
+        self.worker = AIWorker(root.after, interrupt=engine.abort)
+        self.thinking = False  # mientras la IA calcula se ignoran los clics
+        self.pondered = {}  # código del tablero -> respuesta calculada por adelantado (solo la usa el hilo de la IA)
         self.create_widgets()
+        self.start_pondering()
 
     def create_widgets(self):
-        for i in range(3):
-            for j in range(3):
+        for i in range(self.size):
+            for j in range(self.size):
                 btn = tk.Button(self.root, text=' ', font=('Arial', 40), width=5, height=2,
                                 command=lambda i=i, j=j: self.player_move(i, j))
                 btn.grid(row=i, column=j)
                 self.buttons[i][j] = btn
 
     def player_move(self, i, j):
-        if self.board[i][j] == ' ':
-            self.board[i][j] = PLAYER
+        if self.thinking:
+            return
+        if self.board.place(i, j, PLAYER):
             self.buttons[i][j].config(text=PLAYER, state='disabled')
             if check_winner(self.board, PLAYER):
                 messagebox.showinfo("Ganaste!", "¡Eres una pro! 😸")
@@ -93,41 +56,92 @@ class TicTacToe:
                 return
             self.ai_turn()
 
+    def decide(self, board):
+        # en el hilo de la IA: Markov y, si no da una jugada válida, Minimax (no toca la ventana)
+        available = board.empty_cells()
+        move = self.ai.predict_next_move(board.encode(), available)
+        if move in available:
+            return move, "Markov 🧠"
+        # con métricas activas se mide la búsqueda (y se perfila si es lenta, ver tttCore.metrics)
+        move = metrics.call('minimax.move', best_move, board) if metrics.enabled else best_move(board)
+        return move, "Minimax 🤖"
+
+    def think(self, board):
+        # jugada real: la pensada por adelantado si el humano jugó una de las previstas
+        board_state = board.encode()
+        decision = self.pondered.pop(board_state, None) or self.decide(board)
+        self.pondered.clear()
+        move, source = decision
+        print(f"Respuesta encontrada por {source}")
+        if move:
+            self.ai.record_player_move(board_state, move)
+        return move
+
+    def ponder(self, board):
+        # respuesta a una posible jugada del humano; si una jugada real la cortó, no se guarda
+        if board.winner() is not None or board.is_full() or board.encode() in self.pondered:
+            return
+        engine.begin()  # decide puede no llegar a buscar
+        decision = self.decide(board)
+        if not engine.aborted:
+            self.pondered[board.encode()] = decision
+
     def ai_turn(self):
-        board_state = tuple(cell if cell != ' ' else '_' for row in self.board for cell in row)
-        available = [(i, j) for i in range(3) for j in range(3) if self.board[i][j] == ' ']
+        self.thinking = True
+        self.worker.submit(self.think, self.board.copy(), callback=self.apply_ai_move, errback=self.ai_failed)
 
-        move = self.ai.predict_next_move(board_state, available)
-        if move in available:
-            print("Respuesta encontrada por Markov 🧠")
-        else:
-            move = best_move(copy.deepcopy(self.board))
-            print("Respuesta encontrada por Minimax 🤖")
-        
+    def apply_ai_move(self, move):
+        # de vuelta en el hilo de Tk con la jugada calculada
+        self.thinking = False
         if move:
             i, j = move
-            self.board[i][j] = AI
+            self.board.place(i, j, AI)
             self.buttons[i][j].config(text=AI, state='disabled')
-            self.ai.record_player_move(board_state, move)
 
             if check_winner(self.board, AI):
                 messagebox.showinfo("Perdiste", "La IA usó su SESO 😈")
-                self.ai.end_game()
                 self.reset()
+                return
             elif is_full(self.board):
                 messagebox.showinfo("Empate", "¡Nadie ganó! 💤")
-                self.ai.end_game()
                 self.reset()
+                return
+        self.start_pondering()
+
+    def ai_failed(self, error):
+        # la IA no pudo elegir jugada: se avisa y empieza otra partida en vez de quedar esperando
+        self.thinking = False
+        messagebox.showerror("Error", f"La IA no pudo elegir su jugada: {error}")
+        self.reset()
+
+    def start_pondering(self):
+        # mientras el humano piensa: respuestas a sus jugadas más probables (las casillas mejor ubicadas)
+        empty = self.board.empty_mask()
+        for cell in [cell for cell in move_order(self.board.geometry) if empty >> cell & 1][:PONDER_MOVES]:
+            board = self.board.copy()
+            board.make_move(cell, PLAYER)
+            self.worker.ponder(self.ponder, board)
+
     def reset(self):
-        self.ai.end_game()  # guarda el aprendizaje
-        self.board = [[' ' for _ in range(3)] for _ in range(3)]
-        for i in range(3):
-            for j in range(3):
+        self.worker.cancel()
+        self.thinking = False
+        self.worker.submit(self.end_game, self.board)  # guarda el aprendizaje en el hilo de la IA
+        self.board = Board.empty(self.size, self.k)
+        for i in range(self.size):
+            for j in range(self.size):
                 self.buttons[i][j].config(text=' ', state='normal')
+        self.start_pondering()
+
+    def end_game(self, board):
+        self.pondered.clear()
+        self.ai.end_game(board=board)
 
 
-# Lanzar la app
-root = tk.Tk()
-root.title("Tic Tac Toe con IA 💖")
-app = TicTacToe(root)
-root.mainloop()
+# Lanzar la app (solo al ejecutar el archivo, así las funciones se pueden importar sin abrir ventana)
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("Tic Tac Toe con IA 💖")
+    app = TicTacToe(root, *[int(arg) for arg in sys.argv[1:3]])  # python TIcTacToe.py [N [K]]
+    root.mainloop()
+    app.worker.close()  # termina lo pendiente (por ejemplo el último end_game)
+    app.ai.close()
@@ -0,0 +1,44 @@
+# minimaxEngine.py
+# La parte del juego de Minimax que no depende de la ventana: reglas y elección de jugada.
+# La usan la interfaz (TIcTacToe.py) y los benchmarks sin tener que importar tkinter.
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tttCore import solver
+from tttCore.bitboard import AI, DEFAULT, PLAYER
+from tttCore.metrics import metrics
+from tttCore.search import SearchEngine
+
+TIME_BUDGET = 1.0 # segundos por jugada en tableros más grandes que el 3x3
+
+engine = SearchEngine()
+
+def check_winner(board, player):
+    # filas, columnas y diagonales con las máscaras precalculadas del bitboard
+    return board.is_winner(player)
+
+def is_full(board):
+    return board.is_full()
+
+def minimax(board, is_maximizing):
+    # el valor sale de la tabla precalculada de tttCore.solver (siempre desde el punto de vista de la IA);
+    # en tableros NxN, de la búsqueda alfa-beta con límite de tiempo
+    if getattr(board, 'geometry', DEFAULT) is not DEFAULT:
+        if is_maximizing:
+            return engine.search(board, AI, time_limit=TIME_BUDGET)[0]
+        return -engine.search(board, PLAYER, time_limit=TIME_BUDGET)[0]
+    if is_maximizing:
+        return solver.position_value(board, AI)
+    return -solver.position_value(board, PLAYER)
+
+def best_move(board):
+    # 3x3: consulta directa a la tabla, jugada óptima prefiriendo la victoria más rápida.
+    # NxN: profundización iterativa hasta agotar TIME_BUDGET
+    if getattr(board, 'geometry', DEFAULT) is not DEFAULT:
+        move = engine.search(board, AI, time_limit=TIME_BUDGET)[1]
+        if metrics.enabled:
+            metrics.inc('minimax.nodes', engine.nodes)
+        return move
+    return solver.best_move(board, AI)
@@ -0,0 +1,322 @@
+# Servidor de partidas para muchos jugadores a la vez (asyncio, JSON por líneas sobre TCP).
+# Todas las sesiones comparten un solo MarkovAI híbrido en memoria por tamaño de tablero
+# (Markov + Minimax, el de IntegracionMinimaxMarkov) y cada una lleva su propia lista de
+# jugadas para aprender al terminar la partida. Si la sesión dice quién juega ("player"),
+# además se usa y se entrena el modelo propio de ese jugador (tttCore.playerModels), que se
+# carga al aparecer y vive en un caché LRU. La consulta a Markov y la tabla del 3x3 son
+# instantáneas y se hacen en el bucle de eventos; la búsqueda alfa-beta de tableros NxN se
+# manda a un pool de procesos para no bloquear a las demás sesiones.
+#
+# Protocolo: un objeto JSON por línea en cada sentido.
+#   -> {"type": "new", "size": 4, "k": 3, "player": "ana"}
+#                                                nueva partida (opcional: al conectar ya hay una de 3x3)
+#   -> {"type": "move", "row": 1, "col": 1}     jugada del jugador (X); responde con la de la IA (O)
+#   <- {"type": "state", "board": "X___O____", "size": 3, "ai_move": [1, 1], "result": null}
+#      result: null mientras se juega, "X", "O" o "draw" al terminar
+#   -> {"type": "stats"}                        contadores del servidor (y las métricas, si están activas)
+#   -> {"type": "quit"}
+#   <- {"type": "error", "message": "..."}
+#
+# Con --snapshot la tabla de cada tamaño se mapea de una instantánea de solo lectura
+# (tttCore.snapshot) en lugar de cargarse como dict: varias instancias del servidor en la misma
+# máquina comparten la misma copia en memoria, cada una con su overlay de lo aprendido, y cada
+# --merge-interval segundos se guarda lo pendiente y se arma una instantánea nueva.
+#
+# Uso: python Servidor/gameServer.py --port 8765 --workers 4
+#      python Servidor/gameServer.py --snapshot --merge-interval 60
+#      python Servidor/gameServer.py --metrics-port 9100    # métricas en http://127.0.0.1:9100/metrics
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([ROOT, os.path.join(ROOT, 'IntegracionMinimaxMarkov')])
+
+from sesoIA import MarkovAI
+from tttCore import solver
+from tttCore.bitboard import AI, DEFAULT, PLAYER, Board, Geometry
+from tttCore.metrics import metrics
+from tttCore.playerModels import PlayerModels, ProfileStore, profile_path
+from tttCore.search import SearchEngine
+
+DATA_FILE = os.path.join(ROOT, 'IntegracionMinimaxMarkov', 'markov_learning.json')
+MAX_SIZE = 5  # el almacenamiento guarda estados de hasta 5x5
+
+_engine = None  # un motor por proceso trabajador (su tabla de transposición se reutiliza)
+
+
+def search_move(code, size, k, time_budget):
+    # se ejecuta en el pool de procesos: recibe solo enteros para que pasarlo sea barato;
+    # devuelve la jugada y los nodos visitados (las métricas viven en el proceso principal)
+    global _engine
+    if _engine is None:
+        _engine = SearchEngine()
+    board = Board.from_code(code, Geometry.get(size, k))
+    return _engine.search(board, AI, time_limit=time_budget)[1], _engine.nodes
+
+
+class GameSession:
+    def __init__(self, session_id, size=3, k=None):
+        self.id = session_id
+        self.player = None  # identificador del jugador, si lo envía
+        self.history = []  # jugadas de la IA en esta partida, para aprender al terminar
+        self.new_game(size, k)
+
+    def new_game(self, size=3, k=None):
+        self.board = Board.empty(size, k)
+        self.history.clear()
+        self.result = None
+
+    def finish(self):
+        winner = self.board.winner()
+        if winner is not None:
+            self.result = winner
+        elif self.board.is_full():
+            self.result = 'draw'
+        return self.result
+
+    def unfinished(self):
+        # la IA ya jugó y la partida no terminó: lo jugado todavía no se aprendió
+        return bool(self.history) and self.result is None
+
+    def to_message(self, ai_move=None):
+        return {
+            'type': 'state',
+            'board': ''.join(self.board.to_state()),
+            'size': self.board.size,
+            'ai_move': list(ai_move) if ai_move else None,
+            'result': self.result,
+        }
+
+
+class GameServer:
+    def __init__(self, data_file=DATA_FILE, backend='sqlite', executor=None, time_budget=1.0,
+                 profile_cache=1000, prior_weight=5.0, snapshot=False, merge_interval=None, game_log=False):
+        self.data_file = data_file
+        self.backend = backend
+        self.use_snapshot = snapshot  # tablas mapeadas de una instantánea compartida (ver --snapshot)
+        self.merge_interval = merge_interval
+        self.game_log = game_log  # registra cada partida (ver tttCore.gameLog) para reentrenar fuera de línea
+        self.models = {}  # (tamaño, k) -> MarkovAI compartido (se abre la primera vez que se usa)
+        self.player_models = {}  # (tamaño, k) -> PlayerModels sobre el MarkovAI de ese tablero
+        self.profile_cache = profile_cache
+        self.prior_weight = prior_weight
+        self.executor = executor
+        self.time_budget = time_budget
+        self.sessions = {}
+        self.ids = itertools.count(1)
+        self.started = time.perf_counter()
+        self.stats = {'connections': 0, 'games': 0, 'moves': 0, 'profile_moves': 0, 'markov_moves': 0,
+                      'search_moves': 0, 'snapshot_merges': 0}
+
+    def model(self, size, k=None):
+        k = k or size
+        ai = self.models.get((size, k))
+        if ai is None:
+            ai = self.models[size, k] = MarkovAI(self.data_file, backend=self.backend, verbose=False, size=size, k=k,
+                                                 snapshot=self.use_snapshot, game_log=self.game_log)
+        return ai
+
+    def profiles(self, size, k=None):
+        k = k or size
+        profiles = self.player_models.get((size, k))
+        if profiles is None:
+            path = profile_path(None if self.backend == 'memory' else self.data_file, size, k)
+            profiles = self.player_models[size, k] = PlayerModels(
+                self.model(size, k), ProfileStore(path, size), self.profile_cache, self.prior_weight)
+        return profiles
+
+    def close(self):
+        for profiles in self.player_models.values():
+            profiles.close()
+        for ai in self.models.values():
+            ai.close()
+
+    async def ai_move(self, session):
+        board = session.board
+        state = board.encode()
+        geometry = board.geometry
+        ai = self.model(geometry.size, geometry.k)
+        if session.player is not None:
+            # modelo del jugador mezclado con el global; si ninguno conoce el estado, sigue igual que sin jugador
+            move = self.profiles(geometry.size, geometry.k).predict_next_move(session.player, state, board.empty_cells())
+            if move is not None:
+                self.stats['profile_moves'] += 1
+                if metrics.enabled:
+                    metrics.inc('moves.profile')
+                ai.record_player_move(state, move, session.history)
+                return move
+        # primero Markov (sin tablero: no cae a Minimax y no bloquea), con la historia de la sesión
+        move = ai.predict_next_move(state, board.empty_cells(), history=session.history)
+        if move is not None:
+            self.stats['markov_moves'] += 1
+            return move
+        start = time.perf_counter()
+        if board.geometry is DEFAULT:
+            move = solver.best_move(board, AI)  # consulta a la tabla: no vale la pena otro proceso
+        else:
+            loop = asyncio.get_running_loop()
+            move, nodes = await loop.run_in_executor(self.executor, search_move, state, geometry.size, geometry.k,
+                                                     self.time_budget)
+            if metrics.enabled:
+                metrics.inc('minimax.nodes', nodes)
+        if metrics.enabled:
+            metrics.observe('minimax.move', time.perf_counter() - start)  # incluye la espera del pool
+        self.stats['search_moves'] += 1
+        ai.record_player_move(state, move, session.history)
+        return move
+
+    def end_game(self, session):
+        geometry = session.board.geometry
+        if session.player is not None:
+            self.profiles(geometry.size, geometry.k).learn(session.player, session.history)
+        # suma al modelo compartido, encola la escritura y (con --game-log) agrega la partida al registro
+        self.model(geometry.size, geometry.k).end_game(session.history, session.board)
+        self.stats['games'] += 1
+
+    async def handle_message(self, session, message):
+        kind = message.get('type')
+        if kind == 'new':
+            if session.unfinished():
+                self.end_game(session)  # partida abandonada: igual que el botón de reinicio de la GUI
+            size = int(message.get('size', 3))
+            k = message.get('k')
+            if not 1 <= size <= MAX_SIZE or (k is not None and not 1 <= int(k) <= size):
+                return {'type': 'error', 'message': f"tamaño no soportado (hasta {MAX_SIZE}x{MAX_SIZE})"}
+            if 'player' in message:
+                session.player = None if message['player'] is None else str(message['player'])
+            session.new_game(size, int(k) if k is not None else None)
+            return session.to_message()
+        if kind == 'move':
+            if session.result is not None:
+                return {'type': 'error', 'message': "la partida terminó; envía {\"type\": \"new\"}"}
+            row, col = int(message['row']), int(message['col'])
+            size = session.board.size
+            if not (0 <= row < size and 0 <= col < size) or not session.board.place(row, col, PLAYER):
+                return {'type': 'error', 'message': "jugada inválida"}
+            self.stats['moves'] += 1
+            ai_move = None
+            if session.finish() is None:
+                ai_move = await self.ai_move(session)
+                session.board.place(*ai_move, AI)
+                session.finish()
+            if session.result is not None:
+                self.end_game(session)
+            return session.to_message(ai_move)
+        if kind == 'stats':
+            return {'type': 'stats', **self.snapshot()}
+        return {'type': 'error', 'message': f"tipo de mensaje desconocido: {kind}"}
+
+    def snapshot(self):
+        elapsed = time.perf_counter() - self.started
+        return {**self.stats, 'sessions': len(self.sessions), 'uptime': elapsed,
+                'moves_per_second': self.stats['moves'] / elapsed if elapsed else 0.0,
+                'profiles': {f'{size}x{size}k{k}': profiles.stats()
+                             for (size, k), profiles in self.player_models.items()},
+                **({'metrics': metrics.snapshot()} if metrics.enabled else {})}
+
+    async def handle(self, reader, writer):
+        session = GameSession(next(self.ids))
+        self.sessions[session.id] = session
+        self.stats['connections'] += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    response = {'type': 'error', 'message': "JSON inválido"}
+                else:
+                    if not isinstance(message, dict):
+                        response = {'type': 'error', 'message': "se esperaba un objeto JSON"}
+                    elif message.get('type') == 'quit':
+                        break
+                    else:
+                        try:
+                            response = await self.handle_message(session, message)
+                        except (KeyError, TypeError, ValueError) as e:
+                            response = {'type': 'error', 'message': f"mensaje mal formado: {e}"}
+                writer.write(json.dumps(response, separators=(',', ':')).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            del self.sessions[session.id]
+            writer.close()
+            if session.unfinished():
+                self.end_game(session)  # desconexión o quit a mitad de partida: se aprende como un abandono
+
+    async def merge_snapshots(self):
+        # cada merge_interval segundos: lo aprendido (de este y de los otros procesos, vía el
+        # almacenamiento) pasa a una instantánea nueva y el overlay vuelve a quedar vacío. Guardar y
+        # escribir el archivo bloquea, así que corre en un hilo y las sesiones siguen jugando
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.merge_interval)
+            for ai in list(self.models.values()):
+                await loop.run_in_executor(None, ai.merge_snapshot)
+            self.stats['snapshot_merges'] += 1
+
+    async def serve(self, host='127.0.0.1', port=8765, ready=None):
+        server = await asyncio.start_server(self.handle, host, port, limit=1 << 16, backlog=4096)
+        if self.use_snapshot and self.merge_interval:
+            asyncio.get_running_loop().create_task(self.merge_snapshots())
+        if ready is not None:
+            ready.set_result(server.sockets[0].getsockname()[1])  # puerto real (útil con --port 0)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de tic-tac-toe con IA compartida (JSON por líneas)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--data', default=DATA_FILE)
+    parser.add_argument('--backend', choices=('sqlite', 'binary', 'json', 'memory'), default='sqlite')
+    parser.add_argument('--workers', type=int, default=0, help="procesos para la búsqueda NxN (0 = todos los núcleos)")
+    parser.add_argument('--time-budget', type=float, default=1.0, help="segundos por jugada en tableros NxN")
+    parser.add_argument('--profile-cache', type=int, default=1000, help="jugadores con su modelo en memoria")
+    parser.add_argument('--prior-weight', type=float, default=5.0,
+                        help="peso del modelo global frente al de cada jugador")
+    parser.add_argument('--snapshot', action='store_true',
+                        help="mapea la tabla de una instantánea compartida en lugar de cargarla en cada proceso")
+    parser.add_argument('--merge-interval', type=float, default=60.0,
+                        help="segundos entre instantáneas nuevas con lo aprendido (con --snapshot)")
+    parser.add_argument('--game-log', action='store_true',
+                        help="agrega cada partida a markov_learning.glog (ver Entrenamiento/ingestLogs.py)")
+    parser.add_argument('--metrics-port', type=int, help="endpoint Prometheus local (GET /metrics)")
+    parser.add_argument('--metrics-file', help="guarda las métricas en este JSON al salir")
+    args = parser.parse_args(argv)
+
+    if args.metrics_port is not None or args.metrics_file:
+        metrics.enable()
+        if args.metrics_port is not None:
+            print(f"Métricas en http://127.0.0.1:{metrics.serve_prometheus(args.metrics_port)}/metrics")
+
+    executor = ProcessPoolExecutor(max_workers=args.workers or None)
+    server = GameServer(args.data, args.backend, executor, args.time_budget, args.profile_cache, args.prior_weight,
+                        args.snapshot, args.merge_interval, args.game_log)
+    server.model(3)  # el modelo del 3x3 se carga antes de aceptar conexiones
+    print(f"Escuchando en {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(cancel_futures=True)
+        server.close()
+        print(json.dumps(server.snapshot()))
+        if args.metrics_file:
+            metrics.write_json(args.metrics_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+# Generador de carga para el servidor de partidas: abre muchas conexiones simultáneas,
+# cada una juega partidas con jugadas al azar, y mide jugadas por segundo y la latencia de
+# cada respuesta (tiempo entre enviar la jugada y recibir la de la IA).
+#
+# Uso: python Servidor/loadClient.py --clients 1000 --games 5              # contra un servidor ya levantado
+#      python Servidor/loadClient.py --spawn --clients 2000 --out carga.json  # levanta uno temporal
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gameServer.py')
+
+
+def percentile(values, p):
+    # percentil por el método del rango más cercano sobre una lista ya ordenada
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+async def play_client(host, port, games, size, k, rng, latencies, counters, player=None):
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 16)
+
+    async def request(message):
+        writer.write(json.dumps(message).encode() + b'\n')
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    try:
+        for _ in range(games):
+            state = await request({'type': 'new', 'size': size, 'k': k, 'player': player})
+            while state.get('type') == 'state' and state['result'] is None:
+                empty = [i for i, cell in enumerate(state['board']) if cell == '_']
+                row, col = divmod(rng.choice(empty), size)
+                start = time.perf_counter()
+                state = await request({'type': 'move', 'row': row, 'col': col})
+                latencies.append(time.perf_counter() - start)
+            if state.get('type') == 'error':
+                counters['errors'] += 1
+            else:
+                counters['games'] += 1
+        writer.write(b'{"type": "quit"}\n')
+        await writer.drain()
+    except (ConnectionError, ValueError):
+        counters['errors'] += 1
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, clients, games, size=3, k=None, seed=None, players=0):
+    # con players > 0 cada conexión se identifica como uno de `players` jugadores distintos
+    rng = random.Random(seed)
+    latencies = []
+    counters = {'games': 0, 'errors': 0}
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        play_client(host, port, games, size, k, random.Random(rng.random()), latencies, counters,
+                    f'jugador-{i % players}' if players else None)
+        for i in range(clients)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'clients': clients,
+        'games': counters['games'],
+        'errors': counters['errors'],
+        'moves': len(latencies),
+        'seconds': elapsed,
+        'moves_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'latency_ms': {
+            'p50': percentile(latencies, 50) * 1000,
+            'p90': percentile(latencies, 90) * 1000,
+            'p99': percentile(latencies, 99) * 1000,
+            'max': (latencies[-1] if latencies else 0.0) * 1000,
+        },
+    }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(port, workers):
+    # servidor temporal con el modelo solo en memoria (no toca los archivos de aprendizaje)
+    process = subprocess.Popen([sys.executable, SERVER, '--port', str(port), '--backend', 'memory',
+                                '--workers', str(workers)], stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("el servidor no arrancó a tiempo")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Carga sintética para Servidor/gameServer.py")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--clients', type=int, default=500, help="conexiones simultáneas")
+    parser.add_argument('--games', type=int, default=5, help="partidas por conexión")
+    parser.add_argument('--size', type=int, default=3)
+    parser.add_argument('--k', type=int)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--players', type=int, default=0, help="jugadores distintos (0 = sesiones anónimas)")
+    parser.add_argument('--spawn', action='store_true', help="levanta un servidor temporal en un puerto libre")
+    parser.add_argument('--workers', type=int, default=0, help="procesos de búsqueda del servidor temporal (0 = todos)")
+    parser.add_argument('--out', help="archivo JSON de resultados (por defecto se imprime)")
+    args = parser.parse_args(argv)
+
+    process = None
+    if args.spawn:
+        args.host, args.port = '127.0.0.1', free_port()
+        process = spawn_server(args.port, args.workers)
+    try:
+        report = asyncio.run(run_load(args.host, args.port, args.clients, args.games, args.size, args.k, args.seed,
+                                       args.players))
+    finally:
+        if process is not None:
+            process.send_signal(signal.SIGINT)  # el servidor cierra el modelo y sale limpio
+            process.wait()
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text)
+    print(text)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,699 @@
+# Suite de benchmarks sin interfaz gráfica para los caminos críticos del proyecto:
+# latencia de la IA (minimax y Markov), revisión de ganador, carga/guardado del modelo,
+# arranque en frío y partidas por segundo. Emite los resultados en JSON y los compara con baseline.json
+# para detectar regresiones (sale con código 1 si alguna métrica empeora más de lo tolerado).
+#
+# Cada tiempo es el mejor de varias mediciones que juntas cubren al menos MIN_SPAN, y cada medición
+# dura al menos MIN_WINDOW (se repite la lista de llamadas hasta llegar): una sola pasada de menos de
+# un milisegundo es puro ruido. Lo que no se puede repetir así (guardar y cargar una tabla entera)
+# guarda en 'window' cuánto duró la mejor medición, y la comparación saltea las que quedan por
+# debajo de --noise-floor. Los modos --quick y --full miden con otros tamaños: cada uno tiene su
+# baseline y no se comparan entre sí.
+#
+# Uso:
+#   python benchmarks/runBenchmarks.py                    # todo, comparando con baseline.json
+#   python benchmarks/runBenchmarks.py --quick --only minimax,winner   # contra baseline_quick.json
+#   python benchmarks/runBenchmarks.py --full             # incluye tablas de 1M de entradas (baseline_full.json)
+#   python benchmarks/runBenchmarks.py --save-baseline    # guarda los resultados como nueva referencia
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([ROOT] + [os.path.join(ROOT, folder) for folder in
+                          ('Markov', 'IntegracionMinimaxMarkov', 'Minimax', 'Entrenamiento')])
+
+import evaluateModel
+import markovModel
+import sesoIA
+import selfPlay
+import utils
+import minimaxEngine
+from game import TicTacToe
+from tttCore.bitboard import AI, PLAYER, Board, other
+from tttCore import solver
+from tttCore.countBudget import table_stats
+from tttCore.decisionCache import build_book
+from tttCore.denseModel import DenseMarkovModel, np
+from tttCore.gameLog import GameLog, ingest
+from tttCore.mcts import MCTSEngine
+from tttCore.ngramModel import NgramPredictor
+from tttCore.snapshot import Snapshot, SnapshotTable, write_snapshot
+from tttCore.search import SearchEngine
+from tttCore.storage import BinaryStorage, JsonStorage, SQLiteStorage, flatten
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MIN_WINDOW = 0.02  # segundos mínimos de cada medición de per_call
+MIN_SPAN = 0.25  # segundos que cubren entre todas las mediciones de una métrica
+MAX_REPEAT = 25
+
+# grupo -> función(config) que devuelve {nombre_métrica: métrica}
+BENCHMARKS = {}
+
+
+def benchmark(group):
+    def register(fn):
+        BENCHMARKS[group] = fn
+        return fn
+    return register
+
+
+def metric(value, unit='s', better='lower', window=None):
+    # `window`: segundos que duró la medición, para las que no pasan por per_call
+    result = {'value': value, 'unit': unit, 'better': better}
+    if window is not None:
+        result['window'] = window
+    return result
+
+
+def per_call(fn, calls, repeat=3):
+    # segundos por llamada: el mejor de al menos `repeat` recorridos sobre la lista de argumentos; si
+    # un recorrido dura menos que MIN_WINDOW se repite la lista las veces necesarias (como timeit)
+    passes = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(passes):
+            for args in calls:
+                fn(*args)
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_WINDOW:
+            break
+        passes *= 2 if elapsed * 10 >= MIN_WINDOW else 10
+    # la máquina tiene rachas lentas de décimas de segundo: se sigue midiendo hasta cubrir MIN_SPAN
+    best = total = elapsed
+    measured = 1
+    while measured < repeat or (total < MIN_SPAN and measured < MAX_REPEAT):
+        start = time.perf_counter()
+        for _ in range(passes):
+            for args in calls:
+                fn(*args)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        measured += 1
+    return best / (passes * len(calls))
+
+
+def best_of(fn, repeat=3):
+    # para lo que no se puede repetir en el mismo estado: el menor de `repeat` tiempos que devuelve fn()
+    return min(fn() for _ in range(repeat))
+
+
+def random_positions(ply, count, rng):
+    # posiciones legales y sin terminar con `ply` fichas (X empieza)
+    positions = []
+    while len(positions) < count:
+        board = Board()
+        player = PLAYER
+        for _ in range(ply):
+            row, col = rng.choice(board.empty_cells())
+            board.place(row, col, player)
+            if board.winner():
+                break
+            player = other(player)
+        else:
+            positions.append(board)
+    return positions
+
+
+def legal_states():
+    # todos los estados legales sin terminar alcanzables desde el tablero vacío
+    seen = {0}
+    frontier = [Board()]
+    while frontier:
+        board = frontier.pop()
+        player = board.to_move()
+        for cell in board.empty_indices():
+            board.make_move(cell, player)
+            code = board.encode()
+            if code not in seen and not board.wins_through(cell, player) and not board.is_full():
+                seen.add(code)
+                frontier.append(Board.from_code(code))
+            board.undo_move(cell)
+    return sorted(seen)
+
+
+def synthetic_table(states, rng, moves_per_state=3):
+    table = {}
+    for state in states:
+        empties = Board.from_code(state).empty_cells()
+        table[state] = {move: rng.randint(1, 50) for move in rng.sample(empties, min(moves_per_state, len(empties)))}
+    return table
+
+
+@benchmark('minimax')
+def bench_minimax(config):
+    rng = random.Random(1)
+    hybrid = sesoIA.MarkovAI(None, backend='memory', verbose=False)
+    results = {}
+    for ply in range(9):
+        positions = [(board,) for board in random_positions(ply, config['positions'], rng)]
+        results[f'minimax.get_minimax_move.ply{ply}'] = metric(per_call(hybrid.get_minimax_move, positions))
+        results[f'minimax.best_move.ply{ply}'] = metric(per_call(minimaxEngine.best_move, positions))
+    hybrid.writer.close()
+    return results
+
+
+@benchmark('search')
+def bench_search(config):
+    # nodos y tiempo del motor de búsqueda: minimax exhaustivo, alfa-beta y alfa-beta con tabla
+    rng = random.Random(6)
+    variants = {
+        'plain': dict(pruning=False, use_table=False, ordering=False),
+        'alphabeta': dict(use_table=False),
+        'alphabeta_tt': dict(),
+    }
+    results = {}
+    for ply in (0, 1, 2, 4, 6):
+        count = 3 if ply < 2 else config['positions'] // 10
+        positions = random_positions(ply, count, rng)
+        for name, options in variants.items():
+            def cold_search(board, options=options):
+                engine = SearchEngine(**options)  # tabla vacía: se mide una búsqueda en frío
+                engine.search(board, board.to_move())
+                return engine.nodes
+
+            results[f'search.{name}.ply{ply}'] = metric(per_call(cold_search, [(board,) for board in positions]))
+            nodes = sum(cold_search(board) for board in positions)  # la cuenta no cambia entre corridas
+            results[f'search.{name}.nodes.ply{ply}'] = metric(nodes / len(positions), 'nodes')
+
+    # tableros NxN con profundización iterativa: profundidad alcanzada en el tiempo por jugada
+    for size, k in ((4, 4), (5, 4)):
+        depth = speed = 0
+        for _ in range(3):  # la mejor de tres búsquedas con tabla vacía
+            engine = SearchEngine()
+            start = time.perf_counter()
+            engine.search(Board.empty(size, k), PLAYER, time_limit=0.2)
+            elapsed = time.perf_counter() - start
+            depth = max(depth, engine.depth_reached)
+            speed = max(speed, engine.nodes / elapsed)
+        results[f'search.iterative.{size}x{size}k{k}.depth'] = metric(depth, 'plies', 'higher')
+        results[f'search.iterative.{size}x{size}k{k}.nodes_per_second'] = metric(speed, 'nodes/s', 'higher')
+    return results
+
+
+@benchmark('mcts')
+def bench_mcts(config):
+    # compromiso latencia/calidad de MCTS: tiempo por jugada y fracción de jugadas que conservan
+    # el valor teórico de la posición (según el solver) para cada presupuesto de playouts
+    rng = random.Random(8)
+    positions = [board for ply in range(1, 6) for board in random_positions(ply, config['positions'] // 20, rng)]
+    results = {}
+    for playouts in (100, 500, 2000):
+        engine = MCTSEngine(playouts, reuse=False, seed=8)
+        moves = []
+        start = time.perf_counter()
+        for board in positions:
+            moves.append(engine.search(board, board.to_move())[1])
+        elapsed = (time.perf_counter() - start) / len(positions)
+        optimal = 0
+        for board, move in zip(positions, moves):
+            player = board.to_move()
+            after = board.copy()
+            after.place(move[0], move[1], player)
+            optimal += -solver.position_value(after, other(player)) == solver.position_value(board, player)
+        results[f'mcts.playouts{playouts}'] = metric(elapsed)
+        results[f'mcts.playouts{playouts}.optimal'] = metric(optimal / len(positions), 'ratio', 'higher')
+
+    # tableros NxN: simulaciones por segundo con presupuesto de tiempo
+    for size, k in ((4, 4), (5, 4)):
+        engine = MCTSEngine(None, 0.2, seed=8)
+        start = time.perf_counter()
+        engine.search(Board.empty(size, k), PLAYER)
+        elapsed = time.perf_counter() - start
+        results[f'mcts.{size}x{size}k{k}.playouts_per_second'] = metric(engine.playouts / elapsed, 'playouts/s', 'higher')
+    return results
+
+
+@benchmark('markov')
+def bench_markov(config):
+    rng = random.Random(2)
+    states = legal_states()
+    results = {}
+    for size in (100, 1000, len(states)):
+        table_states = rng.sample(states, size)
+        table = synthetic_table(table_states, rng)
+        queries = [rng.choice(table_states) for _ in range(config['queries'])]
+
+        markov = markovModel.MarkovAI(None, backend='memory')
+        markov.transition_counts = markov.symmetry.fold(table)  # el modelo guarda estados canónicos
+        hybrid = sesoIA.MarkovAI(None, backend='memory', verbose=False)
+        hybrid.transition_counts = markov.transition_counts
+
+        games = []
+        for state in queries:
+            game = TicTacToe()
+            game.board = Board.from_code(state)
+            games.append((game,))
+        predict_calls = [(state, Board.from_code(state).empty_cells()) for state in queries]
+
+        label = 'all' if size == len(states) else size
+        results[f'markov.get_best_move.{label}'] = metric(per_call(markov.get_best_move, games))
+        results[f'markov.predict_next_move.{label}'] = metric(per_call(markov.predict_next_move, predict_calls))
+        results[f'hybrid.predict_next_move.{label}'] = metric(per_call(hybrid.predict_next_move, predict_calls))
+        markov.writer.close()
+        hybrid.writer.close()
+    return results
+
+
+@benchmark('cache')
+def bench_cache(config):
+    # caché de decisiones: la misma consulta con y sin caché (las posiciones se repiten, como en
+    # partidas reales) y el libro de aperturas en 4x4 frente a la búsqueda a la que reemplaza
+    rng = random.Random(10)
+    states = legal_states()
+    table_states = rng.sample(states, 1000)
+    table = synthetic_table(table_states, rng)
+    queries = [rng.choice(table_states) for _ in range(config['queries'])]
+    games = []
+    for state in queries:
+        game = TicTacToe()
+        game.board = Board.from_code(state)
+        games.append((game,))
+    # posiciones que el modelo híbrido no conoce: responde la búsqueda de respaldo (el solver en 3x3)
+    unseen = random_positions(3, 50, rng)
+    fallback_calls = [(board.encode(), board.empty_cells(), board) for board in unseen for _ in range(4)]
+    rng.shuffle(fallback_calls)
+
+    results = {}
+    for label, entries in (('cached', 4096), ('uncached', 0)):
+        markov = markovModel.MarkovAI(None, backend='memory', decision_cache=entries)
+        markov.transition_counts = markov.symmetry.fold(table)
+        results[f'cache.markov.get_best_move.{label}'] = metric(per_call(markov.get_best_move, games))
+        markov.writer.close()
+        hybrid = sesoIA.MarkovAI(None, backend='memory', verbose=False, decision_cache=entries)
+        results[f'cache.hybrid.fallback.{label}'] = metric(per_call(hybrid.predict_next_move, fallback_calls))
+        hybrid.writer.close()
+
+    # libro 4x4 de las posiciones con 1 y 3 fichas (la jugada da igual para medir la consulta)
+    book = build_book(lambda board, player: board.empty_cells()[0], 4, None, 4)
+    hybrid = sesoIA.MarkovAI(None, backend='memory', verbose=False, size=4, decision_cache=0, book=False)
+    hybrid.book = book
+    openings = []
+    for _ in range(50):
+        board = Board.empty(4)
+        board.make_move(rng.randrange(16), PLAYER)
+        openings.append((board.encode(), board.empty_cells(), board))
+    results['cache.book.4x4.lookup'] = metric(per_call(hybrid.predict_next_move, openings))
+    results['cache.book.4x4.hit_rate'] = metric(book.stats()['hit_rate'], 'ratio', 'higher')
+    search = SearchEngine(geometry=openings[0][2].geometry)
+    results['cache.book.4x4.search_replaced'] = metric(
+        per_call(lambda board: search.search(board, AI, time_limit=1.0), [(openings[0][2],)], repeat=1))
+    hybrid.writer.close()
+    return results
+
+
+@benchmark('dense')
+def bench_dense(config):
+    # tabla densa de NumPy frente al diccionario: predicción de a una, por lotes y puntuación de
+    # precisión como en evaluateModel --dense (sin numpy el grupo no mide nada)
+    if np is None:
+        return {}
+    rng = random.Random(11)
+    states = legal_states()
+    table = markovModel.MarkovAI(None, backend='memory').symmetry.fold(synthetic_table(states, rng))
+    queries = [rng.choice(list(table)) for _ in range(config['queries'])]
+    predict_calls = [(state, Board.from_code(state).empty_cells()) for state in queries]
+    samples = [(state, rng.choice(list(table[state]))) for state in queries]
+
+    markov = markovModel.MarkovAI(None, backend='memory', decision_cache=0)
+    markov.transition_counts = table
+    dense = DenseMarkovModel.from_transition_counts(table, seed=11)
+    results = {
+        'dense.markov.predict_next_move': metric(per_call(markov.predict_next_move, predict_calls)),
+        'dense.predict_next_move': metric(per_call(dense.predict_next_move, predict_calls)),
+        'dense.predict_batch.per_board': metric(per_call(dense.predict_batch, [(queries,)]) / len(queries)),
+        'dense.table_ranks.per_position': metric(
+            per_call(evaluateModel.table_ranks, [(table, samples)]) / len(samples)),
+        'dense.ranks.per_position': metric(per_call(evaluateModel.dense_ranks, [(dense, samples)]) / len(samples)),
+    }
+    markov.writer.close()
+    return results
+
+
+def random_sequences(count, rng):
+    # jugadas [(estado, jugada), ...] de X en partidas al azar (el lado que predicen los modelos)
+    sequences = []
+    for _ in range(count):
+        board = Board()
+        player = PLAYER
+        moves = []
+        while True:
+            row, col = rng.choice(board.empty_cells())
+            if player == PLAYER:
+                moves.append((board.encode(), (row, col)))
+            board.place(row, col, player)
+            if board.winner() or board.is_full():
+                break
+            player = other(player)
+        sequences.append(moves)
+    return sequences
+
+
+@benchmark('ngram')
+def bench_ngram(config):
+    # modelo de diccionario (solo tablero) frente al predictor de n-gramas: memoria y latencia
+    rng = random.Random(6)
+    sequences = random_sequences(config['games'], rng)
+    markov = markovModel.MarkovAI(None, backend='memory')
+    for moves in sequences:
+        for state, move in moves:
+            markov.update_model(state, move)
+    markov.writer.close()
+    queries = []
+    for moves in random_sequences(config['queries'] // 3, rng):
+        for i, (state, _) in enumerate(moves):
+            queries.append((state, [m for _, m in moves[:i]], Board.from_code(state).empty_cells()))
+    results = {
+        'ngram.dict.bytes': metric(table_stats(markov.transition_counts)['approx_bytes'], 'bytes'),
+        'ngram.dict.predict': metric(per_call(markov.predict_next_move, [(s, a) for s, _, a in queries])),
+    }
+    for order in (1, 2, 3):
+        ngram = NgramPredictor(order)
+        for moves in sequences:
+            ngram.learn_game(moves)
+        predict_rng = random.Random(7)
+        results[f'ngram.order{order}.bytes'] = metric(ngram.stats()['approx_bytes'], 'bytes')
+        results[f'ngram.order{order}.predict'] = metric(
+            per_call(lambda state, previous, available: ngram.predict(state, previous, available, predict_rng), queries))
+    return results
+
+
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.extend(sys.argv[1:3])
+import {module}
+imported = time.perf_counter()
+ai = {module}.MarkovAI(sys.argv[3], backend='json', load=sys.argv[4]{extra})
+ready = time.perf_counter()
+ai.predict_next_move(0, [(0, 0), (1, 1)])
+moved = time.perf_counter()
+ai.writer.close()
+print(json.dumps({{'import': imported - start, 'ready': ready - start, 'first_move': moved - start,
+                  'gui': 'tkinter' in sys.modules}}))
+"""
+
+
+def cold_start(module, data_file, load, runs):
+    # cada medición en un intérprete nuevo: importaciones y carga del modelo desde cero
+    extra = ', verbose=False' if module == 'sesoIA' else ''
+    script = STARTUP_SCRIPT.format(module=module, extra=extra)
+    folder = 'IntegracionMinimaxMarkov' if module == 'sesoIA' else 'Markov'
+    best = None
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', script, ROOT, os.path.join(ROOT, folder), data_file, load],
+                                capture_output=True, text=True, check=True).stdout
+        timing = json.loads(output.splitlines()[-1])
+        if timing['gui']:
+            raise RuntimeError(f"importar {module} no debería cargar tkinter")
+        best = timing if best is None else {key: min(best[key], timing[key]) for key in best}
+    return best
+
+
+@benchmark('startup')
+def bench_startup(config):
+    # arranque en frío: importar el motor, construir MarkovAI (lo que espera la ventana) y la primera jugada,
+    # con la tabla de todos los estados legales en JSON cargada ya ('eager') o en un hilo ('background')
+    rng = random.Random(8)
+    tmp = tempfile.mkdtemp(prefix='ttt-bench-')
+    results = {}
+    try:
+        data_file = os.path.join(tmp, 'startup.json')
+        storage = JsonStorage(data_file)
+        storage.add(flatten(synthetic_table(legal_states(), rng)))
+        storage.close()
+        for module in ('markovModel', 'sesoIA'):
+            for load in ('eager', 'background'):
+                timing = cold_start(module, data_file, load, config['startup_runs'])
+                results[f'startup.{module}.import'] = metric(timing['import'])
+                results[f'startup.{module}.{load}.ready'] = metric(timing['ready'])
+                results[f'startup.{module}.{load}.first_move'] = metric(timing['first_move'])
+    finally:
+        shutil.rmtree(tmp)
+    return results
+
+
+@benchmark('snapshot')
+def bench_snapshot(config):
+    # tabla de todos los estados legales: dict cargado de SQLite frente a la instantánea mapeada
+    rng = random.Random(9)
+    states = legal_states()
+    markov = markovModel.MarkovAI(None, backend='memory')
+    table = markov.symmetry.fold(synthetic_table(states, rng))
+    markov.writer.close()
+    queries = [rng.choice(states) for _ in range(config['queries'])]
+    predict_calls = [(state, Board.from_code(state).empty_cells()) for state in queries]
+    canonical = [(markov.symmetry.canonical(state)[0],) for state in queries]
+    tmp = tempfile.mkdtemp(prefix='ttt-bench-')
+    results = {}
+    try:
+        db = os.path.join(tmp, 'model.db')
+        storage = SQLiteStorage(db)
+        storage.add(flatten(table))
+        storage.close()
+        snap = os.path.join(tmp, 'model.snap')
+        write_snapshot(snap, table)
+
+        def open_dict():
+            storage = SQLiteStorage(db)
+            storage.load()
+            storage.close()
+
+        results['snapshot.dict.load'] = metric(per_call(open_dict, [()] * 5))
+        results['snapshot.mmap.open'] = metric(per_call(lambda: Snapshot(snap).close(), [()] * 5))
+        results['snapshot.dict.bytes'] = metric(table_stats(table)['approx_bytes'], 'bytes')
+        results['snapshot.mmap.bytes'] = metric(os.path.getsize(snap), 'bytes')
+
+        mapped = SnapshotTable(Snapshot(snap))
+        results['snapshot.dict.get'] = metric(per_call(table.get, canonical))
+        results['snapshot.mmap.get'] = metric(per_call(mapped.get, canonical))
+        hybrid = sesoIA.MarkovAI(None, backend='memory', verbose=False)
+        hybrid.transition_counts = table
+        results['snapshot.dict.predict_next_move'] = metric(per_call(hybrid.predict_next_move, predict_calls))
+        hybrid.transition_counts = mapped
+        results['snapshot.mmap.predict_next_move'] = metric(per_call(hybrid.predict_next_move, predict_calls))
+        hybrid.writer.close()
+        mapped.close()
+    finally:
+        shutil.rmtree(tmp)
+    return results
+
+
+@benchmark('winner')
+def bench_winner(config):
+    rng = random.Random(3)
+    boards = [board for ply in range(4, 9) for board in random_positions(ply, config['positions'], rng)]
+    games = []
+    for board in boards:
+        game = TicTacToe()
+        cell = next(iter(board.empty_indices()))
+        game.board = board.copy()
+        game.make_move(*divmod(cell, 3), board.to_move())
+        games.append((game,))
+    return {
+        'winner.game.check_winner': metric(per_call(lambda game: game.check_winner(), games)),
+        'winner.utils.check_winner': metric(per_call(utils.check_winner, [(b, PLAYER) for b in boards])),
+        'winner.board.winner': metric(per_call(Board.winner, [(b,) for b in boards])),
+    }
+
+
+def _save_all(storage_class, path, deltas):
+    # escritura completa sobre un archivo nuevo
+    for leftover in (path, path + '-wal', path + '-shm', path + '.lock'):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    start = time.perf_counter()
+    storage = storage_class(path)
+    storage.add(deltas)
+    storage.close()
+    return time.perf_counter() - start
+
+
+def _load(storage_class, path):
+    start = time.perf_counter()
+    storage = storage_class(path)
+    storage.load()
+    storage.close()
+    return time.perf_counter() - start
+
+
+@benchmark('storage')
+def bench_storage(config):
+    rng = random.Random(4)
+    results = {}
+    tmp = tempfile.mkdtemp(prefix='ttt-bench-')
+    try:
+        for size in config['table_sizes']:
+            keys = set()
+            while len(keys) < size:
+                keys.add((rng.randrange(1 << 18), divmod(rng.randrange(9), 3)))
+            deltas = {key: rng.randint(1, 100) for key in keys}
+            touched = {key: 1 for key in rng.sample(sorted(keys), min(50, size))}
+            for name, storage_class, ext in (('json', JsonStorage, '.json'), ('sqlite', SQLiteStorage, '.db'),
+                                             ('binary', BinaryStorage, '.bin')):
+                path = os.path.join(tmp, f'{name}-{size}{ext}')
+                write = best_of(lambda: _save_all(storage_class, path, deltas))
+                load = best_of(lambda: _load(storage_class, path))
+                results[f'storage.{name}.save_all.{size}'] = metric(write, window=write)
+                results[f'storage.{name}.load.{size}'] = metric(load, window=load)
+                # actualización incremental típica de fin de partida (los conteos siguen sumando: da igual)
+                storage = storage_class(path)
+                storage.load()
+                results[f'storage.{name}.save_incremental.{size}'] = metric(per_call(storage.add, [(touched,)]))
+                storage.close()
+                results[f'storage.{name}.bytes.{size}'] = metric(os.path.getsize(path), 'bytes')
+    finally:
+        shutil.rmtree(tmp)
+    return results
+
+
+@benchmark('games')
+def bench_games(config):
+    rng = random.Random(5)
+    random.seed(5)
+    markov = markovModel.MarkovAI(None, backend='memory')
+    models = {'markov': markov}
+    results = {}
+    for x, o in (('random', 'minimax'), ('human', 'markov'), ('random', 'random')):
+        x_policy = selfPlay.make_policy(x, PLAYER, rng, models)
+        o_policy = selfPlay.make_policy(o, AI, rng, models)
+        stats = selfPlay.simulate(config['games'], x_policy, o_policy, markov, report_every=0)
+        results[f'games.{x}_vs_{o}'] = metric(stats['games_per_second'], 'games/s', 'higher')
+    markov.writer.close()
+    return results
+
+
+@benchmark('ingest')
+def bench_ingest(config):
+    # registro de partidas: costo de agregar una partida y partidas por segundo al reconstruir un modelo
+    rng = random.Random(9)
+    random.seed(9)
+    tmp = tempfile.mkdtemp(prefix='ttt-bench-')
+    results = {}
+    try:
+        for extension in ('glog', 'jsonl'):
+            path = os.path.join(tmp, f'games.{extension}')
+            log = GameLog(path)
+            x_policy = selfPlay.make_policy('human', PLAYER, rng, {})
+            o_policy = selfPlay.make_policy('random', AI, rng, {})
+            start = time.perf_counter()
+            selfPlay.simulate(config['games'], x_policy, o_policy, report_every=0, log=log)
+            log.close()
+            markov = markovModel.MarkovAI(None, backend='memory')
+            stats = ingest(markov, [path])
+            markov.writer.close()
+            results[f'ingest.{extension}.games_per_second'] = metric(stats['games'] / stats['seconds'], 'games/s', 'higher')
+            results[f'ingest.{extension}.bytes_per_game'] = metric(os.path.getsize(path) / config['games'], 'bytes')
+    finally:
+        shutil.rmtree(tmp)
+    return results
+
+
+def compare(results, baseline, tolerance, noise_floor=0.0):
+    # devuelve las métricas que empeoraron más que `tolerance` (1.5 = 50 % peor); las medidas en una
+    # ventana más corta que `noise_floor` segundos (de un lado o del otro) no se comparan
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None or current['unit'] == 'bytes' or not reference['value'] or not current['value']:
+            continue
+        if min(current.get('window', noise_floor), reference.get('window', noise_floor)) < noise_floor:
+            continue
+        if current['better'] == 'lower':
+            ratio = current['value'] / reference['value']
+        else:
+            ratio = reference['value'] / current['value']
+        if ratio > tolerance:
+            regressions.append((name, reference['value'], current['value'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de la IA, el aprendizaje y la persistencia")
+    parser.add_argument('--only', help="grupos separados por coma: " + ','.join(BENCHMARKS))
+    parser.add_argument('--quick', action='store_true', help="menos iteraciones (para CI)")
+    parser.add_argument('--full', action='store_true', help="incluye tablas de 1M de entradas")
+    parser.add_argument('--out', help="archivo JSON de resultados (por defecto se imprime)")
+    parser.add_argument('--baseline', help="por defecto baseline.json (baseline_quick.json con --quick, "
+                                            "baseline_full.json con --full)")
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    parser.add_argument('--noise-floor', type=float, default=0.005,
+                        help="segundos: las mediciones más cortas no cuentan como regresión")
+    args = parser.parse_args(argv)
+    mode = 'full' if args.full else 'quick' if args.quick else None
+    if args.baseline is None:
+        args.baseline = os.path.join(BENCH_DIR, f'baseline_{mode}.json' if mode else 'baseline.json')
+
+    config = {
+        'positions': 50 if args.quick else 200,
+        'queries': 500 if args.quick else 2000,
+        'games': 2000 if args.quick else 20000,
+        'table_sizes': [1000, 10000] if args.quick else [1000, 10000, 100000],
+        'startup_runs': 3 if args.quick else 7,
+    }
+    if args.full:
+        config['table_sizes'].append(1000000)
+
+    groups = args.only.split(',') if args.only else list(BENCHMARKS)
+    results = {}
+    for group in groups:
+        start = time.perf_counter()
+        results.update(BENCHMARKS[group](config))
+        print(f"[{group}] {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'quick': args.quick,
+            'full': args.full,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    stored = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        # quick, normal y full miden con otros tamaños: sus números no son comparables
+        stored_mode = tuple(stored['meta'].get(key, False) for key in ('quick', 'full'))
+        if stored_mode != (args.quick, args.full):
+            print(f"{args.baseline} se guardó con quick={stored_mode[0]} full={stored_mode[1]}; "
+                  f"esta corrida es quick={args.quick} full={args.full}. Usa otro --baseline.", file=sys.stderr)
+            return 2
+
+    if args.save_baseline:
+        baseline = stored['results'] if stored else {}
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'meta': report['meta'], 'results': baseline}, f, indent=2, sort_keys=True)
+        return 0
+
+    if stored is None:
+        print("Sin baseline para comparar (usa --save-baseline).", file=sys.stderr)
+        return 0
+    regressions = compare(results, stored['results'], args.tolerance, args.noise_floor)
+    for name, before, now, ratio in regressions:
+        print(f"REGRESIÓN {name}: {before:.3g} -> {now:.3g} ({ratio:.2f}x peor)", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
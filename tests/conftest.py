@@ -0,0 +1,7 @@
+import os
+import sys
+
+# los módulos se importan como en los scripts: la raíz (tttCore) y las carpetas de cada juego
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([ROOT] + [os.path.join(ROOT, folder) for folder in
+                          ('Markov', 'IntegracionMinimaxMarkov', 'Minimax', 'Entrenamiento', 'Servidor')])
@@ -0,0 +1,40 @@
+from tttCore.aiWorker import AIWorker
+
+
+def fail():
+    raise RuntimeError("sin jugada")
+
+
+def run_jobs(submit):
+    # sin ventana: `schedule` no programa nada y los resultados se entregan a mano con _poll
+    worker = AIWorker(lambda ms, fn: None)
+    delivered = []
+    submit(worker, delivered)
+    worker.close()  # espera a que terminen los trabajos encolados
+    worker._poll()
+    return delivered
+
+
+def test_result_goes_to_callback():
+    delivered = run_jobs(lambda worker, out: worker.submit(max, 2, 5, callback=out.append))
+    assert delivered == [5]
+
+
+def test_failed_job_goes_to_errback():
+    def submit(worker, out):
+        worker.submit(fail, callback=lambda result: out.append(('ok', result)),
+                      errback=lambda error: out.append(('error', error)))
+        worker.submit(max, 1, 3, callback=lambda result: out.append(('ok', result)))  # el hilo sigue vivo
+
+    delivered = run_jobs(submit)
+    assert [kind for kind, _ in delivered] == ['error', 'ok']
+    assert isinstance(delivered[0][1], RuntimeError)
+    assert delivered[1][1] == 3
+
+
+def test_cancel_drops_stale_errors():
+    def submit(worker, out):
+        worker.submit(fail, errback=out.append)
+        worker.cancel()
+
+    assert run_jobs(submit) == []
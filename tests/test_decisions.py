@@ -0,0 +1,47 @@
+from markovModel import MarkovAI
+from tttCore.decisionCache import DecisionCache
+
+
+def test_hit_after_put_and_lru_eviction():
+    cache = DecisionCache(max_entries=2)
+    cache.put(1, 0, ('win', (0, 0)))
+    cache.put(2, 0, ('block', (1, 1)))
+    assert cache.get(1, 0) == ('win', (0, 0))
+    assert cache.get(1, 3) is None  # otra transformación del mismo estado es otra decisión
+    cache.put(3, 0, ('predict',))  # el 2 es el menos reciente
+    assert cache.get(2, 0) is None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_invalidate_drops_only_that_state():
+    cache = DecisionCache()
+    cache.put(1, 0, ('predict',))
+    cache.put(2, 0, ('predict',))
+    cache.invalidate(1)
+    assert cache.get(1, 0) is None
+    assert cache.get(2, 0) == ('predict',)
+
+
+def test_stale_generation_is_not_stored():
+    # una decisión calculada mientras otro hilo aprendía no entra a la caché
+    cache = DecisionCache()
+    generation = cache.generation
+    cache.invalidate(7)
+    cache.put(1, 0, ('predict',), generation)
+    assert cache.get(1, 0) is None
+    cache.put(1, 0, ('predict',), cache.generation)
+    assert cache.get(1, 0) == ('predict',)
+
+
+def test_learning_invalidates_the_model_cache():
+    ai = MarkovAI(None, backend='memory')
+    state = 1 << 4  # X en el centro
+    canonical, t = ai.symmetry.canonical(state)
+    ai.decisions.put(canonical, t, ('markov', [(0, 0)], [1.0]))
+    ai.decisions.put(0, 0, ('predict',))
+    ai.update_model(state, (0, 0))
+    assert ai.decisions.get(canonical, t) is None
+    assert ai.decisions.get(0, 0) == ('predict',)
+    ai.update_model_bulk({(0, (1, 1)): 3})
+    assert ai.decisions.get(0, 0) is None
+    ai.close()
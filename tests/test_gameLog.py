@@ -0,0 +1,23 @@
+from tttCore.bitboard import AI, PLAYER
+from tttCore.gameLog import replay
+
+
+def test_replay_yields_pairs_of_the_requested_side():
+    # X: 4, 0 ; O: 8, 2 (sin terminar)
+    games = [(3, 3, [4, 8, 0, 2])]
+    assert list(replay(games, side=AI)) == [(1 << 4, (2, 2)), ((1 << 4 | 1) | (1 << 8) << 9, (0, 2))]
+    assert list(replay(games, side=PLAYER)) == [(0, (1, 1)), (1 << 4 | (1 << 8) << 9, (0, 0))]
+
+
+def test_replay_counts_skipped_and_invalid_games():
+    stats = {}
+    games = [
+        (3, 3, [4, 0]),
+        (4, 4, [5, 6]),  # otro tamaño
+        (3, 3, [4, 4]),  # casilla ocupada
+        (3, 3, [0, 3, 1, 4, 2, 5]),  # jugada después de que ganó X
+        (3, 7, [4, 0]),  # k imposible en 3x3: registro dañado
+    ]
+    pairs = list(replay(games, side=PLAYER, stats=stats))
+    assert pairs == [(0, (1, 1))]
+    assert stats == {'games': 1, 'pairs': 1, 'skipped': 1, 'invalid': 3}
@@ -0,0 +1,41 @@
+import asyncio
+import json
+
+import pytest
+
+from gameServer import GameServer
+
+
+async def play(server, messages):
+    # una conexión que envía `messages` y después se va (con quit o cortando)
+    listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for message in messages:
+        writer.write(json.dumps(message).encode() + b'\n')
+        await writer.drain()
+        if message['type'] != 'quit':
+            await reader.readline()
+    writer.close()
+    while server.sessions or not server.stats['connections']:
+        await asyncio.sleep(0.01)
+    listener.close()
+    await listener.wait_closed()
+
+
+@pytest.mark.parametrize('last', [[{'type': 'quit'}], []], ids=['quit', 'disconnect'])
+def test_game_left_midway_is_learned(tmp_path, last):
+    server = GameServer(str(tmp_path / 'markov_learning.json'), backend='memory')
+    asyncio.run(play(server, [{'type': 'new'}, {'type': 'move', 'row': 1, 'col': 1}] + last))
+    assert server.stats['games'] == 1
+    assert server.model(3).transition_counts  # el modelo compartido aprendió la jugada de la IA
+    server.close()
+
+
+def test_finished_game_is_learned_once(tmp_path):
+    server = GameServer(str(tmp_path / 'markov_learning.json'), backend='memory')
+    moves = [{'type': 'move', 'row': r, 'col': c} for r in range(3) for c in range(3)]
+    # el servidor rechaza las casillas ocupadas y la partida termina antes de acabar la lista
+    asyncio.run(play(server, [{'type': 'new'}] + moves + [{'type': 'new'}, {'type': 'quit'}]))
+    assert server.stats['games'] == 1
+    server.close()
@@ -0,0 +1,75 @@
+import os
+import random
+import sys
+import threading
+
+import pytest
+
+from markovModel import MarkovAI
+from sesoIA import MarkovAI as HybridAI
+from tttCore.storage import BACKENDS, storage_for_path
+
+THREADS = 8
+GAMES = 300
+MOVES = 3
+
+
+def random_pair(rng):
+    # una X en una casilla y la jugada en otra: estados válidos, muchos repetidos entre hilos
+    cell = rng.randrange(9)
+    return 1 << cell, divmod((cell + 1 + rng.randrange(8)) % 9, 3)
+
+
+def run_threads(play):
+    # muchos cambios de hilo para que los end_game se crucen de verdad
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=play, args=(seed,)) for seed in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def disk_total(data_file, backend):
+    storage = storage_for_path(os.path.splitext(data_file)[0] + BACKENDS[backend][0])
+    try:
+        return sum(count for moves in storage.load().values() for count in moves.values())
+    finally:
+        storage.close()
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'binary'])
+def test_hybrid_concurrent_end_game_keeps_every_count(tmp_path, backend):
+    data_file = str(tmp_path / 'markov_learning.json')
+    ai = HybridAI(data_file, backend=backend, verbose=False, flush_games=1, book=False)
+
+    def play(seed):
+        rng = random.Random(seed)
+        for _ in range(GAMES):
+            history = [random_pair(rng) for _ in range(MOVES)]  # una sesión del servidor
+            ai.end_game(history)
+
+    run_threads(play)
+    ai.close()
+    assert disk_total(data_file, backend) == THREADS * GAMES * MOVES
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'binary'])
+def test_markov_concurrent_end_game_keeps_every_count(tmp_path, backend):
+    data_file = str(tmp_path / 'markov_data.json')
+    ai = MarkovAI(data_file, backend=backend, flush_games=1)
+
+    def play(seed):
+        rng = random.Random(seed)
+        for _ in range(GAMES):
+            for _ in range(MOVES):
+                ai.update_model(*random_pair(rng))
+            ai.end_game()
+
+    run_threads(play)
+    ai.close()
+    assert disk_total(data_file, backend) == THREADS * GAMES * MOVES
@@ -0,0 +1,43 @@
+import random
+
+from sesoIA import MarkovAI
+from tttCore.bitboard import AI, PLAYER, Board, other
+from tttCore.locking import StripedLock
+from tttCore.mcts import _portable
+
+
+def trained_hybrid(games=300, seed=1):
+    # híbrido con MCTS de respaldo que aprendió las jugadas de O de partidas al azar
+    rng = random.Random(seed)
+    ai = MarkovAI(None, backend='memory', verbose=False, fallback='mcts', playouts=400, decision_cache=0, book=False)
+    ai.mcts.rng.seed(seed)
+    for _ in range(games):
+        board = Board()
+        player = PLAYER
+        while board.winner() is None and not board.is_full():
+            move = rng.choice(board.empty_cells())
+            if player == AI:
+                ai.update_model(board.encode(), move)
+            board.place(*move, player)
+            player = other(player)
+    return ai
+
+
+def test_hybrid_prior_guides_playouts():
+    # la tabla del híbrido guarda estados con O por mover: el prior tiene que encontrarlos
+    ai = trained_hybrid()
+    board = Board()
+    board.place(1, 1, PLAYER)
+    ai.get_minimax_move(board)
+    assert ai.mcts.playouts == 400
+    assert ai.mcts.prior_moves > 0
+    ai.close()
+
+
+def test_portable_copies_rows_under_locks():
+    table = {1: {(0, 0): 2}, 2: {(1, 1): 5}}
+    copy = _portable(table, StripedLock(4))
+    assert copy == table
+    table[1][(0, 0)] += 1
+    table[3] = {(2, 2): 1}
+    assert copy == {1: {(0, 0): 2}, 2: {(1, 1): 5}}
@@ -0,0 +1,41 @@
+from tttCore.ngramModel import NgramPredictor
+
+STATE = 1 << 4  # X en el centro
+MOVES = [(r, c) for r in range(3) for c in range(3) if (r, c) != (1, 1)]
+
+
+def trained():
+    model = NgramPredictor(order=1, min_count=2)
+    model.learn(STATE, [(0, 0)], (2, 2))
+    model.learn(STATE, [(0, 0)], (2, 2))
+    model.learn(STATE, [(0, 1)], (1, 0))
+    return model
+
+
+def test_long_context_wins_when_seen_enough():
+    assert trained().distribution(STATE, [(0, 0)], MOVES) == {(2, 2): 2}
+
+
+def test_backs_off_to_state_with_few_observations():
+    model = trained()
+    # (0, 1) se vio una sola vez (menos que min_count) y (2, 0) nunca: decide el estado solo
+    assert model.distribution(STATE, [(0, 1)], MOVES) == {(2, 2): 2, (1, 0): 1}
+    assert model.distribution(STATE, [(2, 0)], MOVES) == {(2, 2): 2, (1, 0): 1}
+
+
+def test_backs_off_when_long_context_moves_are_taken():
+    available = [move for move in MOVES if move != (2, 2)]
+    assert trained().distribution(STATE, [(0, 0)], available) == {(1, 0): 1}
+
+
+def test_unknown_state_has_no_prediction():
+    assert trained().distribution(1, [(0, 0)], MOVES) == {}
+
+
+def test_save_and_load_keep_the_trie(tmp_path):
+    path = str(tmp_path / 'ngram.bin')
+    model = trained()
+    model.save(path)
+    loaded = NgramPredictor.load(path)
+    for previous in ([(0, 0)], [(0, 1)], []):
+        assert loaded.distribution(STATE, previous, MOVES) == model.distribution(STATE, previous, MOVES)
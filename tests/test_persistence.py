@@ -0,0 +1,51 @@
+import pytest
+
+from tttCore.persistence import WriteBehindWriter
+
+
+class FlakyStorage:
+    # falla las primeras `failures` escrituras y después guarda normalmente
+    def __init__(self, failures):
+        self.failures = failures
+        self.counts = {}
+        self.closed = False
+
+    def add(self, deltas):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disco lleno")
+        for key, delta in deltas.items():
+            self.counts[key] = self.counts.get(key, 0) + delta
+
+    def close(self):
+        self.closed = True
+
+
+def test_failed_batch_is_kept_and_retried_on_next_flush():
+    storage = FlakyStorage(failures=1)
+    writer = WriteBehindWriter(storage, flush_games=100, flush_interval=60)
+    writer.submit({(1, (0, 0)): 2})
+    with pytest.raises(OSError):
+        writer.flush()
+    writer.submit({(1, (0, 0)): 1, (2, (1, 1)): 1})
+    writer.flush()
+    assert storage.counts == {(1, (0, 0)): 3, (2, (1, 1)): 1}
+    assert writer.error is None
+    writer.close()
+
+
+def test_close_retries_before_giving_up():
+    storage = FlakyStorage(failures=2)
+    writer = WriteBehindWriter(storage, flush_games=100, flush_interval=60)
+    writer.submit({(1, (0, 0)): 1})
+    writer.close()
+    assert storage.counts == {(1, (0, 0)): 1}
+
+
+def test_close_raises_when_storage_keeps_failing():
+    storage = FlakyStorage(failures=100)
+    writer = WriteBehindWriter(storage, flush_games=100, flush_interval=60)
+    writer.submit({(1, (0, 0)): 1})
+    with pytest.raises(OSError):
+        writer.close()
+    assert storage.closed
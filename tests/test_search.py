@@ -0,0 +1,52 @@
+import random
+
+from tttCore import solver
+from tttCore.bitboard import AI, PLAYER, Board, other
+from tttCore.search import SearchEngine
+
+
+def random_positions(count, seed=7, max_moves=5):
+    # posiciones alcanzables sin ganador, con O o X por mover
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = Board()
+        player = PLAYER
+        for _ in range(rng.randint(1, max_moves)):
+            board.place(*rng.choice(board.empty_cells()), player)
+            player = other(player)
+            if board.winner() is not None:
+                break
+        else:
+            positions.append((board, player))
+    return positions
+
+
+def test_alpha_beta_with_table_matches_plain_minimax():
+    fast = SearchEngine()
+    plain = SearchEngine(pruning=False, use_table=False, ordering=False)
+    for board, player in random_positions(40):
+        value, move, _ = fast.search(board, player)
+        assert value == plain.search(board, player)[0] == solver.position_value(board, player)
+        assert fast.nodes <= plain.nodes
+        # la jugada elegida conserva el valor: después de hacerla el rival no saca más que -value
+        child = board.copy()
+        child.place(*move, player)
+        assert -plain.search(child, other(player))[0] == value
+
+
+def test_full_table_drops_old_entries_and_keeps_values():
+    engine = SearchEngine(max_entries=64)
+    for board, player in random_positions(20, seed=3):
+        assert engine.search(board, player)[0] == solver.position_value(board, player)
+        assert len(engine.table) <= 64
+
+
+def test_time_limited_search_on_bigger_board():
+    engine = SearchEngine()
+    board = Board.empty(4)
+    board.place(1, 1, PLAYER)
+    value, move, _ = engine.search(board, AI, time_limit=0.2)
+    assert move in board.empty_cells()
+    assert engine.depth_reached >= 1
+    assert not engine.aborted
@@ -0,0 +1,63 @@
+import threading
+
+from tttCore.snapshot import Snapshot, SnapshotTable, write_snapshot
+
+
+def test_refresh_maps_the_new_snapshot_and_drops_the_overlay(tmp_path):
+    path = str(tmp_path / 'model.snap')
+    write_snapshot(path, {5: {(1, 1): 2}})
+    table = SnapshotTable(Snapshot(path))
+    table[5][(1, 1)] += 1  # copia al overlay
+    assert table.get(5) == {(1, 1): 3}
+    assert not table.refresh()
+
+    write_snapshot(path, {5: {(1, 1): 3}, 7: {(0, 0): 1}})
+    assert table.refresh()
+    assert table.overlay == {}
+    assert table.get(5) == {(1, 1): 3}
+    assert 7 in table
+    table.close()
+
+
+def test_refresh_keeps_the_old_mapping_alive_for_readers(tmp_path):
+    # un hilo que ya tomó la instantánea anterior (sin candado) la sigue pudiendo leer
+    path = str(tmp_path / 'model.snap')
+    write_snapshot(path, {5: {(1, 1): 2}})
+    table = SnapshotTable(Snapshot(path))
+    old = table.base
+    write_snapshot(path, {5: {(1, 1): 4}})
+    assert table.refresh()
+    assert old.moves(5) == {(1, 1): 2}
+    assert list(old) == [5]
+    table.close()
+
+
+def test_reads_during_refresh(tmp_path):
+    path = str(tmp_path / 'model.snap')
+    write_snapshot(path, {state: {(0, 0): 1} for state in range(1, 200)})
+    table = SnapshotTable(Snapshot(path))
+    errors = []
+    done = threading.Event()
+
+    def read():
+        try:
+            while not done.is_set():
+                for state in range(1, 200):
+                    assert table.get(state)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for n in range(2, 40):
+            write_snapshot(path, {state: {(0, 0): n} for state in range(1, 200)})
+            table.refresh()
+    finally:
+        done.set()
+        for thread in threads:
+            thread.join()
+    assert errors == []
+    assert table.get(1) == {(0, 0): 39}
+    table.close()
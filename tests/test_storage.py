@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from tttCore.countBudget import CountBudget
+from tttCore.storage import BACKENDS, JsonStorage, open_storage
+
+
+@pytest.mark.parametrize('backend', ['json', 'sqlite', 'binary'])
+def test_counts_round_trip(tmp_path, backend):
+    data_file = str(tmp_path / 'markov_data.json')
+    storage = open_storage(data_file, backend)
+    storage.add({(5, (1, 1)): 2, (5, (0, 2)): 1, (1 << 9 | 2, (2, 2)): 3})
+    storage.add({(5, (1, 1)): 4})
+    assert storage.load() == {5: {(1, 1): 6, (0, 2): 1}, 1 << 9 | 2: {(2, 2): 3}}
+    storage.close()
+    # otra apertura lee lo mismo del disco
+    storage = open_storage(data_file, backend)
+    assert storage.load() == {5: {(1, 1): 6, (0, 2): 1}, 1 << 9 | 2: {(2, 2): 3}}
+    storage.close()
+
+
+def test_bigger_board_round_trip(tmp_path):
+    data_file = str(tmp_path / 'markov_data.json')
+    storage = open_storage(data_file, 'binary', size=4, k=3)
+    assert storage.path.endswith('markov_data_4x4k3.bin')
+    storage.add({(1 << 15, (3, 3)): 1})
+    assert storage.load() == {1 << 15: {(3, 3): 1}}
+    storage.close()
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'binary'])
+def test_legacy_json_is_migrated_once(tmp_path, backend):
+    data_file = str(tmp_path / 'markov_data.json')
+    JsonStorage(data_file).add({(5, (1, 1)): 2, (7, (2, 0)): 1})
+    storage = open_storage(data_file, backend)
+    assert storage.path.endswith(BACKENDS[backend][0])
+    assert storage.load() == {5: {(1, 1): 2}, 7: {(2, 0): 1}}
+    storage.close()
+
+    # el archivo migrado ya existe: abrirlo de nuevo no vuelve a sumar el JSON
+    storage = open_storage(data_file, backend)
+    assert storage.load() == {5: {(1, 1): 2}, 7: {(2, 0): 1}}
+    storage.close()
+
+
+def test_corrupt_json_loads_empty(tmp_path):
+    path = tmp_path / 'markov_data.json'
+    path.write_text('{"5": ')
+    assert JsonStorage(str(path)).load() == {}
+    path.write_text(json.dumps({"5": {"1,1": 3}}))
+    assert JsonStorage(str(path)).load() == {5: {(1, 1): 3}}
+
+
+def test_budget_evicts_least_recent_state():
+    counts = {}
+    budget = CountBudget(max_states=2)
+    budget.learn(counts, 1, (0, 0))
+    budget.learn(counts, 2, (0, 0))
+    budget.read(counts, 1)  # el 2 queda como el menos reciente
+    budget.learn(counts, 3, (0, 0))
+    assert set(counts) == {1, 3}
+    assert budget.evictions == 1
+
+
+def test_budget_decays_old_counts():
+    counts = {}
+    budget = CountBudget(half_life=2)
+    budget.learn(counts, 1, (0, 0))
+    budget.learn(counts, 2, (0, 0))
+    assert budget.read(counts, 1) == {(0, 0): 0.5}  # dos jugadas aprendidas después: media vida
@@ -0,0 +1 @@
+# tttCore: núcleo compartido por las tres interfaces (Markov, Minimax e IntegracionMinimaxMarkov)
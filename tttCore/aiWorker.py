@@ -0,0 +1,100 @@
+# Hilo de trabajo para las interfaces Tk: la jugada de la IA, el aprendizaje y el guardado
+# se calculan fuera del bucle de eventos y el resultado vuelve por una cola que la interfaz
+# revisa con `after` (Tk no se puede tocar desde otro hilo). No importa tkinter: recibe la
+# función `schedule(ms, fn)` de la ventana (root.after).
+#
+# Pondering: mientras el humano piensa, la interfaz encola con ponder() las respuestas a sus
+# jugadas más probables; esos trabajos tienen la prioridad más baja y se descartan apenas
+# llega una jugada real. Si en ese momento se está calculando uno, se llama a `interrupt`
+# (por ejemplo SearchEngine.abort) para no hacer esperar a la jugada.
+#
+# Si un trabajo real falla, el error se imprime y, si se pasó `errback`, también vuelve a la
+# interfaz (para que no se quede esperando una jugada que no va a llegar).
+
+import itertools
+import queue
+import threading
+import traceback
+
+MOVE, PONDER = 0, 1  # prioridades: menor = antes
+_STOP = object()
+
+
+class AIWorker:
+    def __init__(self, schedule, interrupt=None, poll_ms=15):
+        self.schedule = schedule
+        self.interrupt = interrupt
+        self.poll_ms = poll_ms
+        self.jobs = queue.PriorityQueue()
+        self.results = queue.Queue()  # (época, callback o errback, resultado o excepción) para el hilo de Tk
+        self.order = itertools.count()  # desempate FIFO dentro de la misma prioridad
+        self.epoch = 0  # cancel() la incrementa: los resultados de antes ya no se entregan
+        self.turn = 0  # cada submit la incrementa: el pondering encolado antes queda obsoleto
+        self.pondering = False
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name='ai-worker', daemon=True)
+        self.thread.start()
+        self.schedule(self.poll_ms, self._poll)
+
+    def submit(self, fn, *args, callback=None, errback=None):
+        # trabajo real (jugada de la IA, aprendizaje, guardado); `callback(resultado)` corre en el hilo
+        # de Tk, o `errback(excepción)` si el trabajo falló
+        self.turn += 1
+        if self.pondering and self.interrupt is not None:
+            self.interrupt()
+        self.jobs.put((MOVE, next(self.order), self.epoch, self.turn, fn, args, (callback, errback)))
+
+    def ponder(self, fn, *args):
+        # trabajo especulativo: solo corre si no hay nada real pendiente y sigue siendo el mismo turno
+        self.jobs.put((PONDER, next(self.order), self.epoch, self.turn, fn, args, (None, None)))
+
+    def cancel(self):
+        # nueva partida: se descartan el pondering pendiente y los resultados que no llegaron
+        self.epoch += 1
+        self.turn += 1
+        if self.pondering and self.interrupt is not None:
+            self.interrupt()
+
+    def close(self):
+        # espera a que terminen los trabajos reales ya encolados (por ejemplo el último end_game)
+        if self.closed:
+            return
+        self.closed = True
+        self.turn += 1
+        if self.pondering and self.interrupt is not None:
+            self.interrupt()
+        self.jobs.put((MOVE, next(self.order), self.epoch, self.turn, _STOP, (), (None, None)))
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            priority, _, epoch, turn, fn, args, (callback, errback) = self.jobs.get()
+            if fn is _STOP:
+                return
+            if priority == PONDER:
+                if turn != self.turn or epoch != self.epoch:
+                    continue  # el humano ya jugó o empezó otra partida
+                self.pondering = True
+            try:
+                result = fn(*args)
+            except Exception as e:
+                traceback.print_exc()  # un error en un trabajo no debe matar al hilo
+                if errback is not None:
+                    self.results.put((epoch, errback, e))
+                continue
+            finally:
+                self.pondering = False
+            if callback is not None:
+                self.results.put((epoch, callback, result))
+
+    def _poll(self):
+        # en el hilo de Tk: entrega los resultados listos y se vuelve a programar
+        while True:
+            try:
+                epoch, callback, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if epoch == self.epoch:
+                callback(result)
+        if not self.closed:
+            self.schedule(self.poll_ms, self._poll)
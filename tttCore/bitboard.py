@@ -0,0 +1,255 @@
+# Representación compacta del tablero compartida por las tres interfaces.
+# Cada posición son dos enteros de N*N bits (uno por jugador); la casilla (fila, col)
+# es el bit fila * N + col. Las victorias (K en línea) se revisan con máscaras precalculadas
+# y el estado completo se codifica en un solo entero: x | (o << N*N).
+# El tablero por defecto es el 3x3 clásico con 3 en línea.
+
+
+PLAYER = 'X'
+AI = 'O'
+EMPTY = '_'
+
+
+def _line_masks(size, k):
+    # todas las líneas de k casillas: filas, columnas y las dos diagonales
+    masks = []
+    for row in range(size):
+        for col in range(size):
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_row, end_col = row + dr * (k - 1), col + dc * (k - 1)
+                if 0 <= end_row < size and 0 <= end_col < size:
+                    masks.append(sum(1 << ((row + dr * i) * size + col + dc * i) for i in range(k)))
+    return tuple(sorted(masks))
+
+
+class Geometry:
+    # forma del tablero (N x N, K en línea) y sus tablas precalculadas; una instancia por forma
+    _cache = {}
+
+    def __init__(self, size=3, k=None):
+        self.size = size
+        self.k = k or size
+        if not 1 <= self.k <= size:
+            raise ValueError(f"k debe estar entre 1 y {size}")
+        self.cells = size * size
+        self.full = (1 << self.cells) - 1
+        self.win_masks = _line_masks(size, self.k)
+        # líneas que pasan por cada casilla, para revisar solo las afectadas por la última jugada
+        self.cell_lines = tuple(tuple(m for m in self.win_masks if m >> i & 1) for i in range(self.cells))
+        if self.cells <= 9:
+            # 3x3 o menor: tabla con todas las máscaras posibles (512 entradas); desde 4x4 serían
+            # 65536 y construirlas cuesta más que recorrer las líneas
+            self.has_line_table = bytes(any(mask & m == m for m in self.win_masks) for mask in range(1 << self.cells))
+            self.cell_table = tuple(tuple(i for i in range(self.cells) if mask >> i & 1) for mask in range(1 << self.cells))
+            self.coord_table = tuple(tuple(divmod(i, size) for i in cells) for cells in self.cell_table)
+        else:
+            self.has_line_table = self.cell_table = self.coord_table = None
+
+    @classmethod
+    def get(cls, size=3, k=None):
+        key = (size, k or size)
+        geometry = cls._cache.get(key)
+        if geometry is None:
+            geometry = cls._cache[key] = cls(size, k)
+        return geometry
+
+    def __repr__(self):
+        return f"Geometry({self.size}x{self.size}, k={self.k})"
+
+    def has_line(self, bits):
+        if self.has_line_table is not None:
+            return bool(self.has_line_table[bits])
+        for mask in self.win_masks:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def indices(self, mask):
+        if self.cell_table is not None:
+            return self.cell_table[mask]
+        return tuple(iter_bits(mask))
+
+    def coords(self, mask):
+        if self.coord_table is not None:
+            return self.coord_table[mask]
+        return tuple(divmod(i, self.size) for i in iter_bits(mask))
+
+
+DEFAULT = Geometry.get(3)
+
+# alias del 3x3 usados por el solver, el modelo denso y los benchmarks
+FULL = DEFAULT.full
+LINES = tuple(tuple(i for i in range(9) if m >> i & 1) for m in DEFAULT.win_masks)
+WIN_MASKS = DEFAULT.win_masks
+CELL_LINES = DEFAULT.cell_lines
+HAS_LINE = DEFAULT.has_line_table
+CELLS = DEFAULT.cell_table
+COORDS = DEFAULT.coord_table
+POPCOUNT = bytes(len(cells) for cells in CELLS)
+
+
+def index(row, col, size=3):
+    return row * size + col
+
+
+def iter_bits(mask):
+    # recorre los índices de los bits encendidos quitando el bit más bajo cada vez
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def encode(x, o, geometry=DEFAULT):
+    return x | (o << geometry.cells)
+
+
+def decode(code, geometry=DEFAULT):
+    return code & geometry.full, code >> geometry.cells
+
+
+def other(player):
+    return AI if player == PLAYER else PLAYER
+
+
+def parse_state(text):
+    # claves del archivo de aprendizaje: "1234" (formato actual) o "('_', 'X', ...)" (formato antiguo)
+    if text.isdigit():
+        return int(text)
+    import ast  # solo para archivos viejos: no se paga al arrancar
+    return Board.from_cells(ast.literal_eval(text)).encode()
+
+
+class Board:
+    __slots__ = ('x', 'o', 'geometry')
+
+    def __init__(self, x=0, o=0, geometry=DEFAULT):
+        self.x = x
+        self.o = o
+        self.geometry = geometry
+
+    @classmethod
+    def empty(cls, size=3, k=None):
+        return cls(0, 0, Geometry.get(size, k))
+
+    @classmethod
+    def from_cells(cls, cells, k=None):
+        # acepta un tablero NxN (listas de filas) o una secuencia de N*N casillas con 'X' / 'O'
+        if cells and isinstance(cells[0], (list, tuple)):
+            size = len(cells)
+            cells = [cell for row in cells for cell in row]
+        else:
+            size = int(round(len(cells) ** 0.5))
+        x = o = 0
+        for i, cell in enumerate(cells):
+            if cell == PLAYER:
+                x |= 1 << i
+            elif cell == AI:
+                o |= 1 << i
+        return cls(x, o, Geometry.get(size, k))
+
+    @classmethod
+    def from_code(cls, code, geometry=DEFAULT):
+        return cls(code & geometry.full, code >> geometry.cells, geometry)
+
+    @property
+    def size(self):
+        return self.geometry.size
+
+    def reset(self):
+        self.x = 0
+        self.o = 0
+
+    def copy(self):
+        return Board(self.x, self.o, self.geometry)
+
+    def __eq__(self, other_board):
+        return (isinstance(other_board, Board) and self.x == other_board.x and self.o == other_board.o
+                and self.geometry is other_board.geometry)
+
+    def __hash__(self):
+        return self.encode()
+
+    def __repr__(self):
+        return f"Board({''.join(self.to_state())})"
+
+    def encode(self):
+        return self.x | (self.o << self.geometry.cells)
+
+    def bits(self, player):
+        return self.x if player == PLAYER else self.o
+
+    def occupied(self):
+        return self.x | self.o
+
+    def empty_mask(self):
+        return self.geometry.full & ~(self.x | self.o)
+
+    def get(self, row, col):
+        bit = 1 << (row * self.geometry.size + col)
+        if self.x & bit:
+            return PLAYER
+        if self.o & bit:
+            return AI
+        return ''
+
+    def is_empty(self, row, col):
+        return not (self.x | self.o) >> (row * self.geometry.size + col) & 1
+
+    def place(self, row, col, player):
+        bit = 1 << (row * self.geometry.size + col)
+        if (self.x | self.o) & bit:
+            return False
+        if player == PLAYER:
+            self.x |= bit
+        else:
+            self.o |= bit
+        return True
+
+    def make_move(self, cell, player):
+        # coloca la ficha sin validar; se deshace con undo_move(cell)
+        if player == PLAYER:
+            self.x |= 1 << cell
+        else:
+            self.o |= 1 << cell
+
+    def undo_move(self, cell):
+        mask = ~(1 << cell)
+        self.x &= mask
+        self.o &= mask
+
+    def wins_through(self, cell, player):
+        # revisión incremental: solo las líneas que pasan por `cell`
+        bits = self.x if player == PLAYER else self.o
+        for mask in self.geometry.cell_lines[cell]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def is_winner(self, player):
+        return self.geometry.has_line(self.x if player == PLAYER else self.o)
+
+    def winner(self):
+        if self.geometry.has_line(self.x):
+            return PLAYER
+        if self.geometry.has_line(self.o):
+            return AI
+        return None
+
+    def is_full(self):
+        return (self.x | self.o) == self.geometry.full
+
+    def empty_cells(self):
+        return list(self.geometry.coords(self.geometry.full & ~(self.x | self.o)))
+
+    def empty_indices(self):
+        return self.geometry.indices(self.geometry.full & ~(self.x | self.o))
+
+    def to_move(self):
+        # X siempre empieza: si hay igual cantidad de fichas le toca a X
+        return PLAYER if self.x.bit_count() <= self.o.bit_count() else AI
+
+    def to_state(self):
+        # tupla de N*N casillas del formato antiguo ('X', 'O' o '_')
+        return tuple(PLAYER if self.x >> i & 1 else AI if self.o >> i & 1 else EMPTY
+                     for i in range(self.geometry.cells))
@@ -0,0 +1,182 @@
+# Presupuesto de memoria para la tabla de transiciones de MarkovAI.
+# Limita la cantidad de estados en memoria y desaloja los menos usados (LRU: el que hace
+# más tiempo no se consulta; LFU: el que menos veces se consultó). Opcionalmente los conteos
+# decaen exponencialmente: cada estado guarda el reloj de su último ajuste y el factor
+# 0.5 ** (transcurrido / half_life) se aplica recién al leerlo, así no hay que recorrer la tabla.
+# El reloj cuenta jugadas aprendidas, de modo que los hábitos viejos pesan menos frente a
+# los nuevos sin importar cuánto tarde cada partida.
+#
+# El almacenamiento sigue recibiendo los incrementos sin decaer: el presupuesto solo
+# acota lo que vive en memoria. Sin presupuesto (None) los modelos no llaman nada de esto.
+
+import sys
+from collections import OrderedDict
+
+POLICIES = ('lru', 'lfu')
+
+
+def table_stats(counts):
+    # tamaño aproximado de la tabla {estado: {jugada: conteo}} en bytes (dicts, claves y valores)
+    size = sys.getsizeof(counts)
+    transitions = 0
+    for state, moves in counts.items():
+        size += sys.getsizeof(state) + sys.getsizeof(moves)
+        for move, count in moves.items():
+            size += sys.getsizeof(move) + sys.getsizeof(count)
+        transitions += len(moves)
+    return {'states': len(counts), 'transitions': transitions, 'approx_bytes': size}
+
+
+class CountBudget:
+    def __init__(self, max_states=None, policy='lru', half_life=None):
+        if policy not in POLICIES:
+            raise ValueError(f"política de desalojo desconocida: {policy} (usa {' o '.join(POLICIES)})")
+        if max_states is not None and max_states < 1:
+            raise ValueError("max_states debe ser al menos 1")
+        self.max_states = max_states
+        self.policy = policy
+        self.half_life = half_life  # jugadas aprendidas para que un conteo valga la mitad
+        self.clock = 0
+        self.stamps = {}  # estado -> reloj del último decaimiento aplicado
+        self.recent = OrderedDict()  # LRU: estados del menos al más reciente
+        self.freq = {}  # LFU: estado -> usos
+        self.buckets = {}  # LFU: usos -> estados con esa frecuencia, en orden de llegada
+        self.min_freq = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- uso y desalojo ---
+
+    def _register(self, state):
+        if self.policy == 'lru':
+            self.recent[state] = None
+        else:
+            self.freq[state] = 1
+            self.buckets.setdefault(1, OrderedDict())[state] = None
+            self.min_freq = 1
+        self.stamps[state] = self.clock
+
+    def _touch(self, state):
+        if self.policy == 'lru':
+            self.recent.move_to_end(state)
+            return
+        f = self.freq[state]
+        bucket = self.buckets[f]
+        del bucket[state]
+        if not bucket:
+            del self.buckets[f]
+            if self.min_freq == f:
+                self.min_freq = f + 1
+        self.freq[state] = f + 1
+        self.buckets.setdefault(f + 1, OrderedDict())[state] = None
+
+    def _forget(self, state):
+        self.stamps.pop(state, None)
+        if self.policy == 'lru':
+            self.recent.pop(state, None)
+            return
+        f = self.freq.pop(state, None)
+        if f is not None:
+            bucket = self.buckets[f]
+            del bucket[state]
+            if not bucket:
+                del self.buckets[f]
+
+    def _victim(self):
+        if self.policy == 'lru':
+            return next(iter(self.recent))
+        if self.min_freq not in self.buckets:
+            self.min_freq = min(self.buckets)
+        return next(iter(self.buckets[self.min_freq]))
+
+    def _evict(self, counts, keep):
+        while len(counts) > self.max_states:
+            if len(self.stamps) <= 1:
+                break  # solo queda el estado nuevo: lo demás entró a la tabla sin pasar por aquí
+            state = self._victim()
+            if state == keep:
+                # el estado recién agregado nunca es la víctima: se toma el siguiente
+                self._touch(state)
+                continue
+            self._forget(state)
+            counts.pop(state, None)
+            self.evictions += 1
+
+    def _decay(self, counts, state):
+        stamp = self.stamps.get(state, self.clock)
+        if self.half_life and stamp != self.clock:
+            factor = 0.5 ** ((self.clock - stamp) / self.half_life)
+            moves = counts[state]
+            for move in moves:
+                moves[move] *= factor
+        self.stamps[state] = self.clock
+
+    def _ensure(self, counts, state):
+        # estados que llegaron a la tabla por fuera del presupuesto (asignación directa, merge viejo)
+        if state not in self.stamps:
+            self._register(state)
+            return False
+        return True
+
+    # --- interfaz para MarkovAI ---
+
+    def read(self, counts, state):
+        # consulta de predicción: aplica el decaimiento pendiente y marca el uso
+        if state not in counts:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self._ensure(counts, state):
+            self._touch(state)
+        self._decay(counts, state)
+        return counts[state]
+
+    def learn(self, counts, state, move, delta=1):
+        # suma `delta` al conteo (después de decaer lo anterior) y avanza el reloj
+        moves = counts.get(state)
+        if moves is None:
+            moves = counts[state] = {}
+            self._register(state)
+            if self.max_states is not None:
+                self._evict(counts, state)
+        else:
+            if self._ensure(counts, state):
+                self._touch(state)
+            self._decay(counts, state)
+        moves[move] = moves.get(move, 0) + delta
+        self.clock += delta
+
+    def learn_bulk(self, counts, deltas):
+        for (state, move), delta in deltas.items():
+            self.learn(counts, state, move, delta)
+
+    def fit(self, counts):
+        # al cargar: se conservan los estados con más jugadas registradas hasta llenar el presupuesto
+        self.stamps.clear()
+        self.recent.clear()
+        self.freq.clear()
+        self.buckets.clear()
+        states = sorted(counts, key=lambda s: sum(counts[s].values()), reverse=True)
+        if self.max_states is not None and len(states) > self.max_states:
+            for state in states[self.max_states:]:
+                del counts[state]
+            self.evictions += len(states) - self.max_states
+            states = states[:self.max_states]
+        for state in reversed(states):  # los más usados quedan como los más recientes
+            self._register(state)
+        return counts
+
+    def stats(self, counts):
+        stats = table_stats(counts)
+        stats.update({
+            'max_states': self.max_states,
+            'policy': self.policy,
+            'half_life': self.half_life,
+            'clock': self.clock,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+            'evictions': self.evictions,
+        })
+        return stats
@@ -0,0 +1,196 @@
+# Caché de decisiones y libro de aperturas delante de la elección de jugada de la IA.
+#
+# DecisionCache guarda, por estado canónico y transformación (ver tttCore.symmetry), lo que
+# ya se calculó para esa posición: la jugada ganadora o de bloqueo del escaneo táctico, la
+# distribución de Markov ya filtrada y normalizada, o la jugada de la búsqueda de respaldo.
+# Es acotada (LRU con `max_entries` estados) y cuenta aciertos y fallos. Regla de invalidación:
+# cuando el modelo aprende algo de un estado (update_model / update_model_bulk) se descarta
+# la entrada de ese estado, y cuando la tabla entera cambia (carga, instantánea nueva) se vacía.
+# La elección sigue siendo al azar entre las jugadas de Markov: solo se evita recalcularlas.
+# Es segura entre hilos (un candado propio; el modelo la usa desde varios hilos a la vez). Cada
+# invalidación avanza `generation`: una decisión calculada mientras otro hilo aprendía se
+# descarta en put si la generación ya no es la que se leyó antes de calcularla.
+#
+# OpeningBook es la parte precalculada: la jugada de la búsqueda para todas las posiciones de
+# las primeras `plies` fichas, armada una vez fuera de línea (Entrenamiento/buildBook.py) y
+# guardada en JSON. En tableros NxN esas son justo las búsquedas más caras (tablero vacío).
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from tttCore.bitboard import AI, PLAYER, Board, Geometry
+from tttCore.storage import board_suffix
+from tttCore.symmetry import Symmetry
+
+
+class DecisionCache:
+    def __init__(self, max_entries=4096):
+        if max_entries < 1:
+            raise ValueError("max_entries debe ser al menos 1")
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # estado canónico -> {transformación: decisión}, del menos al más reciente
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, canonical, t):
+        with self.lock:
+            variants = self.entries.get(canonical)
+            if variants is not None:
+                decision = variants.get(t)
+                if decision is not None:
+                    self.hits += 1
+                    self.entries.move_to_end(canonical)
+                    return decision
+            self.misses += 1
+            return None
+
+    def put(self, canonical, t, decision, generation=None):
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return  # el modelo aprendió algo mientras se calculaba: puede estar vieja
+            variants = self.entries.get(canonical)
+            if variants is None:
+                variants = self.entries[canonical] = {}
+                if len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self.entries.move_to_end(canonical)
+            variants[t] = decision
+
+    def invalidate(self, canonical):
+        # el modelo aprendió algo de este estado: lo guardado ya no vale
+        with self.lock:
+            self.generation += 1
+            if self.entries.pop(canonical, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_many(self, states):
+        # para lotes grandes (update_model_bulk) vaciar es más barato que recorrerlos
+        with self.lock:
+            self.generation += 1
+            if len(states) >= len(self.entries):
+                self.invalidations += len(self.entries)
+                self.entries.clear()
+                return
+            for canonical in states:
+                if self.entries.pop(canonical, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'invalidations': self.invalidations,
+            'evictions': self.evictions,
+        }
+
+
+class OpeningBook:
+    def __init__(self, moves=None, size=3, k=None, plies=0):
+        self.moves = moves or {}  # estado canónico -> casilla en el marco canónico
+        self.size = size
+        self.k = k or size
+        self.plies = plies
+        self.symmetry = Symmetry.get(size)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.moves)
+
+    def get(self, canonical, t):
+        # jugada (fila, col) en el tablero real o None si la posición no está en el libro
+        cell = self.moves.get(canonical)
+        if cell is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.symmetry.from_canonical(divmod(cell, self.size), t)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'positions': len(self.moves), 'plies': self.plies, 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0}
+
+    def save(self, path):
+        data = {'size': self.size, 'k': self.k, 'plies': self.plies,
+                'moves': {str(state): cell for state, cell in sorted(self.moves.items())}}
+        with open(path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        moves = {int(state): cell for state, cell in data['moves'].items()}
+        return cls(moves, data['size'], data['k'], data['plies'])
+
+
+def book_path(data_file, size=3, k=None):
+    # markov_learning.json -> markov_learning_book.json (markov_learning_book_4x4k3.json en 4x4 con k=3)
+    base, _ = os.path.splitext(data_file)
+    return f'{base}_book{board_suffix(size, k)}.json'
+
+
+def opening_positions(size=3, k=None, plies=3, player=AI):
+    # posiciones canónicas sin terminar con menos de `plies` fichas en las que mueve `player` (X empieza)
+    geometry = Geometry.get(size, k)
+    symmetry = Symmetry.get(size)
+    level = {0}
+    positions = []
+    for stones in range(plies):
+        mover = PLAYER if stones % 2 == 0 else AI
+        if mover == player:
+            positions.extend(sorted(level))
+        following = set()
+        for code in level:
+            board = Board.from_code(code, geometry)
+            for cell in board.empty_indices():
+                board.make_move(cell, mover)
+                if not board.wins_through(cell, mover) and not board.is_full():
+                    following.add(symmetry.canonical(board.encode())[0])
+                board.undo_move(cell)
+        level = following
+    return positions
+
+
+def build_book(search, size=3, k=None, plies=3, player=AI, progress=None):
+    # `search(board, player)` devuelve la jugada (fila, col); se la llama sobre el tablero canónico,
+    # así la jugada ya queda en el marco canónico
+    geometry = Geometry.get(size, k)
+    moves = {}
+    positions = opening_positions(size, k, plies, player)
+    for i, code in enumerate(positions, 1):
+        row, col = search(Board.from_code(code, geometry), player)
+        moves[code] = row * size + col
+        if progress is not None:
+            progress(i, len(positions))
+    return OpeningBook(moves, size, k, plies)
+
+
+def open_book(path):
+    # libro del archivo si existe; si no, None (los modelos siguen sin libro)
+    if path and os.path.exists(path):
+        return OpeningBook.load(path)
+    return None
+
@@ -0,0 +1,138 @@
+# Representación densa del modelo de Markov con NumPy (dependencia opcional).
+# Los conteos viven en un arreglo (3**9, 9): la fila es el estado en base 3
+# (casilla vacía = 0, X = 1, O = 2) y la columna la casilla jugada. Predecir es normalizar
+# la fila enmascarada por las casillas libres y muestrear; aprender una partida completa
+# es un solo np.add.at. También permite predecir para muchos tableros a la vez.
+# selfPlay y evaluateModel la usan con --dense (ver también el grupo 'dense' de los benchmarks).
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional: el resto del proyecto funciona sin él
+    np = None
+
+from tttCore.bitboard import CELLS, FULL
+
+NUM_STATES = 3 ** 9
+
+# TERNARY[mask] = valor en base 3 de una máscara de 9 bits con dígitos 1
+TERNARY = tuple(sum(3 ** i for i in cells) for cells in CELLS)
+
+
+def state_index(code):
+    # código del bitboard (x | o << 9) -> fila del arreglo
+    return TERNARY[code & FULL] + 2 * TERNARY[code >> 9]
+
+
+class DenseMarkovModel:
+    def __init__(self, seed=None):
+        if np is None:
+            raise ImportError("DenseMarkovModel necesita numpy (pip install numpy)")
+        self.counts = np.zeros((NUM_STATES, 9), dtype=np.int64)
+        self.rng = np.random.default_rng(seed)
+        self._ternary = np.array(TERNARY, dtype=np.int64)
+        self._bits = np.arange(9, dtype=np.int64)
+
+    @classmethod
+    def from_transition_counts(cls, transition_counts, seed=None):
+        # convierte la tabla {estado: {(i, j): conteo}} de MarkovAI
+        model = cls(seed)
+        model.update_counts({
+            (state, move): count for state, moves in transition_counts.items() for move, count in moves.items()
+        })
+        return model
+
+    def to_transition_counts(self):
+        rows, cells = np.nonzero(self.counts)
+        if not len(rows):
+            return {}
+        codes = self._codes(rows)
+        table = {}
+        for code, cell, count in zip(codes.tolist(), cells.tolist(), self.counts[rows, cells].tolist()):
+            table.setdefault(code, {})[divmod(cell, 3)] = count
+        return table
+
+    def _codes(self, rows):
+        # fila en base 3 -> código del bitboard (inverso de indices)
+        digits = (rows[:, None] // 3 ** self._bits) % 3
+        weights = 1 << self._bits
+        return (digits == 1) @ weights | ((digits == 2) @ weights) << 9
+
+    def indices(self, codes):
+        codes = np.asarray(codes, dtype=np.int64)
+        return self._ternary[codes & FULL] + 2 * self._ternary[codes >> 9]
+
+    def availability(self, codes):
+        # máscara booleana (n, 9) de casillas libres para cada código
+        codes = np.asarray(codes, dtype=np.int64)
+        empty = ~(codes & FULL | codes >> 9) & FULL
+        return (empty[:, None] >> self._bits) & 1 == 1
+
+    def update_model(self, state, move):
+        self.counts[state_index(state), move[0] * 3 + move[1]] += 1
+
+    def update_game(self, history):
+        # toda la historia [(estado, (i, j)), ...] de una o varias partidas en una sola operación
+        if not history:
+            return
+        states, moves = zip(*history)
+        cells = [i * 3 + j for i, j in moves]
+        np.add.at(self.counts, (self.indices(states), cells), 1)
+
+    def update_counts(self, counts):
+        # conteos agregados {(estado, (i, j)): n}, como los que acumula el simulador
+        if not counts:
+            return
+        keys = list(counts)
+        states = [state for state, _ in keys]
+        cells = [i * 3 + j for _, (i, j) in keys]
+        np.add.at(self.counts, (self.indices(states), cells), list(counts.values()))
+
+    def probabilities(self, codes, available=None):
+        # filas normalizadas sobre las casillas disponibles; sin datos, reparto uniforme
+        codes = np.asarray(codes, dtype=np.int64)
+        mask = self.availability(codes) if available is None else available
+        weights = self.counts[self.indices(codes)] * mask
+        totals = weights.sum(axis=1, keepdims=True)
+        empty_rows = totals[:, 0] == 0
+        if empty_rows.any():
+            weights[empty_rows] = mask[empty_rows]
+            totals[empty_rows] = mask[empty_rows].sum(axis=1, keepdims=True)
+        return weights / np.maximum(totals, 1)
+
+    def predict_batch(self, codes):
+        # una casilla (0..8) muestreada por tablero; -1 si el tablero está lleno
+        probs = self.probabilities(codes)
+        cumulative = probs.cumsum(axis=1)
+        draws = self.rng.random(len(probs))[:, None] * cumulative[:, -1:]
+        cells = (cumulative <= draws).sum(axis=1)
+        cells = np.minimum(cells, 8)
+        cells[cumulative[:, -1] == 0] = -1
+        return cells
+
+    def ranks(self, codes, cells):
+        # posición de cada casilla en el orden de su fila (0 = la más jugada; empates por casilla),
+        # -1 si la casilla nunca se jugó desde ese estado; y si la fila tiene algún conteo
+        rows = self.counts[self.indices(codes)]
+        cells = np.asarray(cells, dtype=np.int64)
+        chosen = rows[np.arange(len(cells)), cells][:, None]
+        ahead = (rows > chosen) | ((rows == chosen) & (self._bits < cells[:, None]))
+        ranks = ahead.sum(axis=1)
+        ranks[chosen[:, 0] == 0] = -1
+        return ranks, rows.any(axis=1)
+
+    def predict_next_move(self, state, available_moves):
+        # misma interfaz que MarkovAI.predict_next_move (None si no hay jugadas posibles)
+        if not available_moves:
+            return None
+        # un solo tablero: se lee la fila y se muestrea en Python, sin armar arreglos de (1, 9)
+        row = self.counts[state_index(state)].tolist()
+        weights = [row[i * 3 + j] for i, j in available_moves]
+        total = sum(weights)
+        if not total:  # sin datos, reparto uniforme
+            return available_moves[int(self.rng.random() * len(available_moves))]
+        draw = self.rng.random() * total
+        for move, weight in zip(available_moves, weights):
+            draw -= weight
+            if draw < 0:
+                return move
+        return move
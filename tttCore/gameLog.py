@@ -0,0 +1,191 @@
+# Registro de partidas de solo agregado, para reentrenar fuera de línea.
+# Cada partida es la secuencia completa de casillas (fila * N + col) en el orden en que se
+# jugaron, empezando por X. Dos formatos según la extensión:
+#
+#   .jsonl   una partida por línea: {"size": 3, "k": 3, "moves": [4, 0, 8, ...]}
+#   otro     binario (por convención .glog): MAGIC y luego por partida
+#            tamaño u8 | k u8 | cantidad u8 | casillas u8[cantidad]   (3 + jugadas bytes)
+#
+# Las sesiones en vivo (MarkovAI con game_log) agregan un registro por partida con una sola
+# escritura, sin tocar el modelo. read_games y replay son generadores: un archivo de millones de
+# partidas se recorre en memoria constante, y ingest suma los pares (estado, jugada) al modelo
+# con update_model_bulk en lotes grandes (ver Entrenamiento/ingestLogs.py).
+
+import json
+import os
+import time
+
+from tttCore.bitboard import AI, PLAYER, Geometry, iter_bits
+from tttCore.storage import board_suffix
+
+MAGIC = b'TTGL\x01'
+CHUNK = 1 << 20  # bytes por lectura del formato binario
+
+
+def log_path(data_file, size=3, k=None):
+    # markov_learning.json -> markov_learning.glog (markov_learning_4x4.glog en 4x4, markov_learning_4x4k3.glog con k=3)
+    if not data_file:
+        raise ValueError("el registro de partidas necesita un archivo de datos")
+    base, _ = os.path.splitext(data_file)
+    return f'{base}{board_suffix(size, k)}.glog'
+
+
+def game_cells(pairs, final=None, size=3):
+    # secuencia completa de casillas a partir de las jugadas (estado, (fila, col)) de un solo lado:
+    # entre dos jugadas propias, la casilla nueva del estado es la del rival. Con el código del
+    # tablero final también se recupera la última jugada del rival. None si no cuadra (faltan jugadas).
+    cells = size * size
+    full = (1 << cells) - 1
+    sequence = []
+    occupied = 0
+    for state, move in pairs:
+        added = (state | state >> cells) & full & ~occupied
+        if added.bit_count() > 1:
+            return None
+        sequence.extend(iter_bits(added))
+        cell = move[0] * size + move[1]
+        sequence.append(cell)
+        occupied |= added | (1 << cell)
+    if final is not None:
+        added = (final | final >> cells) & full & ~occupied
+        if added.bit_count() > 1:
+            return None
+        sequence.extend(iter_bits(added))
+    return sequence
+
+
+class GameLog:
+    def __init__(self, path):
+        self.path = path
+        self.binary = not path.endswith('.jsonl')
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if self.binary and not new:
+            with open(path, 'rb') as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise ValueError(f"{path} no es un registro de partidas válido")
+        self.file = open(path, 'ab')
+        if self.binary and new:
+            self.file.write(MAGIC)
+            self.file.flush()
+        self.games = 0  # partidas agregadas desde que se abrió
+
+    def append(self, cells, size=3, k=None):
+        # una partida = una sola escritura (un registro cortado solo puede quedar al final del archivo)
+        cells = list(cells)
+        if self.binary:
+            record = bytes((size, k or size, len(cells))) + bytes(cells)
+        else:
+            record = json.dumps({'size': size, 'k': k or size, 'moves': cells}, separators=(',', ':')).encode() + b'\n'
+        self.file.write(record)
+        self.file.flush()
+        self.games += 1
+
+    def append_pairs(self, pairs, final=None, size=3, k=None):
+        # para los modelos, que solo conocen las jugadas del lado que aprenden (ver game_cells)
+        if not pairs:
+            return False
+        cells = game_cells(pairs, final, size)
+        if cells is None:
+            return False
+        self.append(cells, size, k)
+        return True
+
+    def close(self):
+        self.file.close()
+
+
+def read_games(path):
+    # genera (tamaño, k, casillas) por partida; ignora líneas corruptas y un registro final incompleto
+    if path.endswith('.jsonl'):
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    game = json.loads(line)
+                    yield game['size'], game.get('k') or game['size'], game['moves']
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} no es un registro de partidas válido")
+        rest = b''
+        while True:
+            chunk = f.read(CHUNK)
+            if not chunk:
+                return
+            data = rest + chunk
+            pos, end = 0, len(data)
+            while pos + 3 <= end:
+                stop = pos + 3 + data[pos + 2]
+                if stop > end:
+                    break
+                yield data[pos], data[pos + 1], data[pos + 3:stop]
+                pos = stop
+            rest = data[pos:]
+
+
+def replay(games, side=PLAYER, size=3, stats=None, k=None):
+    # reproduce cada partida sobre el tablero y genera los pares (estado, (fila, col)) de `side`.
+    # Las partidas de otro tamaño (o de otro k, si se pide uno) se saltean y las inválidas (casilla ocupada o fuera del tablero,
+    # jugadas después de una victoria, k imposible para el tamaño) no aportan nada; `stats` cuenta unas y otras.
+    stats = {} if stats is None else stats
+    for key in ('games', 'pairs', 'skipped', 'invalid'):
+        stats.setdefault(key, 0)
+    cells_count = size * size
+    for game_size, game_k, cells in games:
+        if game_size != size or (k is not None and game_k != k):
+            stats['skipped'] += 1
+            continue
+        try:
+            lines = Geometry.get(size, game_k).cell_lines
+        except ValueError:  # k fuera de 1..size: registro dañado
+            stats['invalid'] += 1
+            continue
+        x = o = 0
+        player = PLAYER
+        pairs = []
+        finished = False
+        for cell in cells:
+            if finished or not 0 <= cell < cells_count or (x | o) >> cell & 1:
+                pairs = None
+                break
+            if player == side:
+                pairs.append((x | (o << cells_count), divmod(cell, size)))
+            if player == PLAYER:
+                x |= 1 << cell
+                bits = x
+                player = AI
+            else:
+                o |= 1 << cell
+                bits = o
+                player = PLAYER
+            for mask in lines[cell]:
+                if bits & mask == mask:
+                    finished = True
+                    break
+        if pairs is None:
+            stats['invalid'] += 1
+            continue
+        stats['games'] += 1
+        stats['pairs'] += len(pairs)
+        yield from pairs
+
+
+def ingest(model, paths, side=PLAYER, batch=100000, k=None):
+    # suma al modelo (cualquiera de los dos MarkovAI) las jugadas de `side` de todos los registros
+    # (con `k`, solo las partidas de ese k); los conteos se entregan con update_model_bulk cada vez
+    # que juntan `batch` pares distintos
+    stats = {}
+    size = model.symmetry.size
+    start = time.perf_counter()
+    counts = {}
+    for path in paths:
+        for pair in replay(read_games(path), side, size, stats, k):
+            counts[pair] = counts.get(pair, 0) + 1
+            if len(counts) >= batch:
+                model.update_model_bulk(counts)
+                counts = {}
+    if counts:
+        model.update_model_bulk(counts)
+    stats['seconds'] = time.perf_counter() - start
+    return stats
@@ -0,0 +1,104 @@
+# Candados para compartir un modelo de Markov entre hilos y entre procesos.
+#
+# StripedLock reparte los estados en `stripes` franjas, cada una con su candado: update_model
+# solo bloquea la franja del estado que aprende, así muchos hilos aprenden a la vez sin pisarse,
+# y una lectura copia los conteos del estado bajo el mismo candado (una foto consistente aunque
+# haya escrituras en curso). Las operaciones sobre toda la tabla (cargar, sumar un lote, vaciar lo
+# pendiente para guardarlo) toman todas las franjas, siempre en el mismo orden.
+#
+# FileLock es un candado exclusivo entre procesos sobre un archivo auxiliar (ruta + '.lock'),
+# con flock en POSIX y msvcrt en Windows. Los almacenamientos lo toman para leer-sumar-escribir,
+# así dos procesos con el mismo archivo combinan sus conteos en lugar de sobrescribirse. El
+# archivo auxiliar guarda además un número de versión que cada escritor incrementa (bump): quien
+# encuentra la misma versión que dejó al escribir sabe que nadie más tocó el archivo y puede
+# seguir usando lo que tiene en memoria; si cambió, vuelve a leer del disco antes de sumar.
+
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class StripedLock:
+    def __init__(self, stripes=64):
+        if stripes < 1:
+            raise ValueError("stripes debe ser al menos 1")
+        self.locks = [threading.Lock() for _ in range(stripes)]
+
+    def __len__(self):
+        return len(self.locks)
+
+    def for_state(self, state):
+        return self.locks[state % len(self.locks)]
+
+    @contextmanager
+    def all(self):
+        for lock in self.locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self.locks):
+                lock.release()
+
+
+class FileLock:
+    VERSION = struct.Struct('<Q')
+
+    def __init__(self, path):
+        self.path = path + '.lock'
+        self.local = threading.Lock()  # flock no excluye a dos hilos que comparten el descriptor
+        self.file = None
+        self.version = 0  # versión del archivo al tomar el candado
+
+    def __enter__(self):
+        self.local.acquire()
+        try:
+            self.file = os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT), 'r+b')
+            if fcntl is not None:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+            else:
+                self.file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)  # reintenta por ~10 s
+                        break
+                    except OSError:
+                        time.sleep(0.05)
+            self.file.seek(0)
+            data = self.file.read(self.VERSION.size)
+            self.version = self.VERSION.unpack(data)[0] if len(data) == self.VERSION.size else 0
+        except BaseException:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.local.release()
+            raise
+        return self
+
+    def bump(self):
+        # con el candado tomado: marca que el archivo cambió y devuelve la versión nueva
+        self.version += 1
+        self.file.seek(0)
+        self.file.write(self.VERSION.pack(self.version))
+        self.file.flush()
+        return self.version
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+            else:
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self.file.close()
+            self.file = None
+            self.local.release()
@@ -0,0 +1,348 @@
+# Búsqueda por árbol de Monte Carlo (MCTS con selección UCT) como alternativa a la búsqueda
+# alfa-beta de tttCore.search. En lugar de recorrer el árbol completo juega partidas al azar
+# (playouts) desde la posición y elige la jugada más visitada, así que la calidad depende del
+# presupuesto: `playouts` partidas o `time_limit` segundos por jugada (lo que se agote antes).
+# Sirve igual en 3x3 que en NxN, donde la búsqueda exhaustiva no llega.
+#
+# - Reutilización del árbol: la raíz de la búsqueda anterior se guarda y, si el tablero nuevo
+#   está dos jugadas más abajo (la de la IA y la respuesta del humano), se sigue desde ese nodo
+#   con las visitas ya acumuladas.
+# - Paralelismo en la raíz: con workers > 1 cada proceso del pool arma su propio árbol desde
+#   la misma posición con otra semilla y al final se suman las visitas de las jugadas de la raíz.
+# - Prior de Markov: con `prior` (la tabla {estado canónico: {jugada: conteo}} de MarkovAI) las
+#   jugadas de `prior_player` dentro de los playouts se sortean según lo aprendido, en lugar de
+#   al azar, así las simulaciones se parecen a cómo se juega de verdad. `prior_player` tiene que
+#   ser el lado cuyas jugadas guarda la tabla (la del híbrido guarda las de O): con el otro lado
+#   ningún estado coincide. prior_moves cuenta las jugadas que salieron del prior.
+# - Playouts tácticos: si quien mueve puede ganar en una, gana; si no, bloquea la victoria
+#   inmediata del rival. Sin esto el azar ignora amenazas obvias y los promedios engañan.
+
+import math
+import random
+import time
+from contextlib import nullcontext
+
+from tttCore.bitboard import AI, PLAYER, Board, Geometry, other
+from tttCore.search import move_order
+from tttCore.symmetry import Symmetry
+
+DRAW = 'draw'
+CHECK_EVERY = 16  # playouts entre revisiones del reloj y de abort()
+
+
+class Node:
+    __slots__ = ('cell', 'parent', 'player', 'code', 'children', 'untried', 'visits', 'wins', 'result')
+
+    def __init__(self, cell, parent, player, board, result, order):
+        self.cell = cell  # casilla de la jugada que llevó a este nodo (None en la raíz)
+        self.parent = parent
+        self.player = player  # quien hizo esa jugada; `wins` se cuenta desde su punto de vista
+        self.code = board.encode()
+        self.children = {}  # casilla -> Node
+        self.result = result  # None, el ganador o DRAW si la posición es terminal
+        empty = board.empty_mask()
+        # se expanden primero las casillas con más líneas (pop toma del final)
+        self.untried = [] if result is not None else [i for i in reversed(order) if empty >> i & 1]
+        self.visits = 0
+        self.wins = 0.0  # victorias + medio punto por empate
+
+
+def _finishing(bits, empties, cell_lines):
+    # casilla vacía que completa una línea para `bits`, o None
+    for cell in empties:
+        filled = bits | (1 << cell)
+        for mask in cell_lines[cell]:
+            if filled & mask == mask:
+                return cell
+    return None
+
+
+class MCTSEngine:
+    def __init__(self, playouts=2000, time_limit=None, exploration=1.4, tactical=True, prior_player=PLAYER,
+                 prior_rate=0.8, workers=1, reuse=True, seed=None):
+        self.budget = playouts  # playouts por jugada (None = solo tiempo)
+        self.time_limit = time_limit  # segundos por jugada (None = solo playouts)
+        self.exploration = exploration  # constante c de UCT
+        self.tactical = tactical
+        self.prior_player = prior_player
+        self.prior_rate = prior_rate  # probabilidad de usar el prior (el resto, azar) en cada jugada
+        self.workers = workers
+        self.reuse = reuse
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.root = None
+        self.geometry = None  # forma del tablero del árbol guardado
+        self.executor = None  # pool de procesos, se crea en la primera búsqueda paralela
+        self.playouts = 0  # playouts de la última búsqueda (sumando todos los procesos)
+        self.prior_moves = 0  # jugadas de los playouts sorteadas con el prior en la última búsqueda (este proceso)
+        self.reused = 0  # visitas heredadas del árbol anterior en la última búsqueda
+        self.aborted = False
+        self._abort = False
+        self._prior = None
+        self._prior_cache = {}  # código -> (casillas, pesos) o None, durante una búsqueda
+
+    def abort(self):
+        # desde otro hilo: la búsqueda en curso termina en la próxima revisión y usa lo que tenga
+        self._abort = True
+
+    def clear(self):
+        self.root = None
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def search(self, board, player=AI, time_limit=None, playouts=None, prior=None, prior_locks=None):
+        # devuelve (tasa de victoria estimada 0..1, mejor jugada (fila, col) o None, visitas de esa jugada);
+        # la jugada va en la misma posición que en SearchEngine.search. `prior_locks` (el StripedLock
+        # del modelo dueño del prior) se toma para copiar la tabla que viaja a los procesos
+        board = board.copy() if isinstance(board, Board) else Board.from_cells(board)
+        geometry = board.geometry
+        self.playouts = self.reused = self.prior_moves = 0
+        self.aborted = self._abort = False
+        winner = board.winner()
+        if winner is not None or board.is_full():
+            return (1.0 if winner == player else 0.0 if winner else 0.5), None, 0
+        playouts = self.budget if playouts is None and time_limit is None else playouts
+        time_limit = self.time_limit if time_limit is None else time_limit
+        if playouts is None and time_limit is None:
+            raise ValueError("MCTS necesita un presupuesto de playouts o de tiempo")
+
+        # ganar en una no necesita simulaciones
+        if self.tactical:
+            cell = _finishing(board.bits(player), board.empty_indices(), geometry.cell_lines)
+            if cell is not None:
+                return 1.0, divmod(cell, geometry.size), 0
+
+        if self.workers > 1:
+            stats = self._search_parallel(board, player, playouts, time_limit, prior, prior_locks)
+        else:
+            root = self._run(board, player, playouts, time_limit, prior)
+            stats = {cell: (child.visits, child.wins) for cell, child in root.children.items()}
+        cell, (visits, wins) = max(stats.items(), key=lambda item: (item[1][0], item[1][1]))
+        return wins / visits, divmod(cell, geometry.size), visits
+
+    # --- árbol ---
+
+    def _run(self, board, player, playouts, time_limit, prior):
+        # arma (o continúa) el árbol desde `board` hasta agotar el presupuesto; devuelve la raíz
+        self._set_prior(prior, board.geometry)
+        order = move_order(board.geometry)
+        root = self._reuse(board, player)
+        if root is None:
+            root = Node(None, None, other(player), board, None, order)
+        else:
+            self.reused = root.visits
+        self.root = root if self.reuse else None
+        self.geometry = board.geometry
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        done = 0
+        try:
+            while playouts is None or done < playouts:
+                if not done % CHECK_EVERY and done and (
+                        self._abort or (deadline is not None and time.perf_counter() > deadline)):
+                    self.aborted = self._abort
+                    break
+                self._iterate(root, board, order)
+                done += 1
+        finally:
+            self._prior_cache = {}
+        self.playouts += done
+        return root
+
+    def _reuse(self, board, player):
+        # busca el tablero actual en la raíz anterior o hasta dos jugadas por debajo
+        root = self.root
+        if not self.reuse or root is None:
+            return None
+        code = board.encode()
+        if board.geometry is not self.geometry or (root.code & code) != root.code:
+            return None  # otra forma de tablero u otra partida
+        frontier = [root]
+        for _ in range(3):
+            for node in frontier:
+                if node.code == code and other(node.player) == player:
+                    node.parent = None  # el resto del árbol anterior se libera
+                    node.cell = None
+                    return node
+            frontier = [child for node in frontier for child in node.children.values()]
+        return None
+
+    def _iterate(self, root, board, order):
+        node = root
+        path = []
+        # selección: se baja por UCT mientras el nodo esté completamente expandido
+        while not node.untried and node.children:
+            node = self._select(node)
+            board.make_move(node.cell, node.player)
+            path.append(node.cell)
+        # expansión: una jugada nueva por iteración
+        if node.untried:
+            cell = node.untried.pop()
+            player = other(node.player)
+            board.make_move(cell, player)
+            path.append(cell)
+            if board.wins_through(cell, player):
+                result = player
+            elif board.is_full():
+                result = DRAW
+            else:
+                result = None
+            child = node.children[cell] = Node(cell, node, player, board, result, order)
+            node = child
+        # simulación
+        winner = node.result if node.result is not None else self._playout(board, other(node.player))
+        for cell in reversed(path):
+            board.undo_move(cell)
+        # retropropagación: cada nodo suma desde el punto de vista de quien jugó para llegar a él
+        while node is not None:
+            node.visits += 1
+            if winner == node.player:
+                node.wins += 1.0
+            elif winner == DRAW:
+                node.wins += 0.5
+            node = node.parent
+
+    def _select(self, node):
+        log_visits = math.log(node.visits)
+        c = self.exploration
+        best, best_value = None, -1.0
+        for child in node.children.values():
+            value = child.wins / child.visits + c * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+    def _playout(self, board, player):
+        # partida rápida hasta el final; devuelve el ganador o DRAW y deja el tablero como estaba
+        rng = self.rng
+        cell_lines = board.geometry.cell_lines
+        empties = list(board.empty_indices())
+        played = []
+        winner = DRAW
+        while empties:
+            cell = None
+            if self.tactical:
+                mine, theirs = (board.x, board.o) if player == PLAYER else (board.o, board.x)
+                cell = _finishing(mine, empties, cell_lines)
+                if cell is None:
+                    cell = _finishing(theirs, empties, cell_lines)
+            if cell is None and self._prior is not None and player == self.prior_player \
+                    and rng.random() < self.prior_rate:
+                cell = self._prior_move(board, empties)
+                if cell is not None:
+                    self.prior_moves += 1
+            if cell is None:
+                cell = empties[rng.randrange(len(empties))]
+            empties.remove(cell)
+            board.make_move(cell, player)
+            played.append(cell)
+            if board.wins_through(cell, player):
+                winner = player
+                break
+            player = other(player)
+        for cell in played:
+            board.undo_move(cell)
+        return winner
+
+    # --- prior de Markov ---
+
+    def _set_prior(self, prior, geometry):
+        self._prior = prior if prior else None
+        self._prior_cache = {}
+        self._symmetry = Symmetry.get(geometry.size) if prior else None
+
+    def _prior_move(self, board, empties):
+        # jugada sorteada según los conteos aprendidos para este estado, o None si no hay datos
+        code = board.encode()
+        entry = self._prior_cache.get(code, False)
+        if entry is False:
+            entry = None
+            canonical, t = self._symmetry.canonical(code)
+            counts = self._prior.get(canonical)
+            if counts:
+                size = board.geometry.size
+                cells, weights = [], []
+                # list() copia la fila de una vez: otro hilo puede estar aprendiendo de este estado
+                for move, count in list(counts.items()):
+                    row, col = self._symmetry.from_canonical(move, t)
+                    cells.append(row * size + col)
+                    weights.append(count)
+                entry = (cells, weights)
+            self._prior_cache[code] = entry
+        if entry is None:
+            return None
+        cells, weights = entry
+        cell = self.rng.choices(cells, weights)[0]
+        return cell if cell in empties else None
+
+    # --- paralelismo en la raíz ---
+
+    def _search_parallel(self, board, player, playouts, time_limit, prior, prior_locks=None):
+        # workers - 1 árboles en el pool y uno en este proceso (que conserva la reutilización)
+        if self.executor is None:
+            from concurrent.futures import ProcessPoolExecutor  # ~20 ms de importación: solo si se usa
+            self.executor = ProcessPoolExecutor(max_workers=self.workers - 1)
+        share = None if playouts is None else max(1, playouts // self.workers)
+        geometry = board.geometry
+        portable = _portable(prior, prior_locks)
+        futures = [
+            self.executor.submit(_worker_search, board.encode(), geometry.size, geometry.k, player, share,
+                                 time_limit, portable, self._settings(), self.rng.getrandbits(32))
+            for _ in range(self.workers - 1)
+        ]
+        root = self._run(board, player, share, time_limit, prior)
+        stats = {cell: [child.visits, child.wins] for cell, child in root.children.items()}
+        for future in futures:
+            child_stats, done = future.result()
+            self.playouts += done
+            for cell, (visits, wins) in child_stats.items():
+                total = stats.setdefault(cell, [0, 0.0])
+                total[0] += visits
+                total[1] += wins
+        return stats
+
+    def _settings(self):
+        return {'exploration': self.exploration, 'tactical': self.tactical, 'prior_player': self.prior_player,
+                'prior_rate': self.prior_rate}
+
+
+def _portable(prior, locks=None):
+    # lo que se manda a los procesos: un dict se copia (con sus filas, bajo todas las franjas de
+    # `locks`, para no serializar una tabla que otro hilo está cambiando); una instantánea
+    # (tttCore.snapshot) viaja como su ruta y cada proceso la mapea (sin el overlay de lo aprendido)
+    if not prior:
+        return None
+    base = getattr(prior, 'base', None)
+    if base is not None:
+        return ('snapshot', base.path)
+    with locks.all() if locks is not None else nullcontext():
+        return {state: dict(moves) for state, moves in prior.items()}
+
+
+_worker = {'engine': None, 'snapshots': {}}  # estado por proceso trabajador
+
+
+def _worker_search(code, size, k, player, playouts, time_limit, prior, settings, seed):
+    # corre en el pool: cada proceso mantiene su motor (y su árbol) entre jugadas
+    engine = _worker['engine']
+    if engine is None:
+        engine = _worker['engine'] = MCTSEngine(**settings)
+    engine.__dict__.update(settings)
+    engine.rng.seed(seed)
+    engine.playouts = engine.prior_moves = 0
+    if isinstance(prior, tuple):
+        from tttCore.snapshot import Snapshot, SnapshotTable
+        table = _worker['snapshots'].get(prior[1])
+        if table is None:
+            table = _worker['snapshots'][prior[1]] = SnapshotTable(Snapshot(prior[1]))
+        table.refresh()
+        prior = table
+    board = Board.from_code(code, Geometry.get(size, k))
+    root = engine._run(board, player, playouts, time_limit, prior)
+    return {cell: (child.visits, child.wins) for cell, child in root.children.items()}, engine.playouts
+
+
+def best_move(board, player=AI, engine=None, playouts=2000, time_limit=None, prior=None):
+    return (engine or MCTSEngine(playouts)).search(board, player, time_limit, playouts, prior)[1]
@@ -0,0 +1,208 @@
+# Métricas livianas para los caminos críticos de la IA:
+# - contadores: aciertos/fallos de Markov y de la caché de decisiones, jugadas por origen,
+#   nodos de búsqueda, partidas
+# - tiempos: búsqueda por jugada, guardado y carga del modelo
+# - valores actuales: bytes del archivo del modelo
+# Vienen apagadas. Los llamadores preguntan `if metrics.enabled:` antes de medir, así que
+# apagadas cuestan una lectura de atributo por decisión.
+#
+# Exportación: texto de Prometheus (serve_prometheus levanta un /metrics local en un hilo)
+# o JSON (to_json / write_json). Con capture_slow(umbral) las jugadas medidas con `call` se
+# corren bajo cProfile y las que tardan al menos `umbral` segundos se guardan como .prof
+# (se leen con `python -m pstats archivo.prof`).
+#
+# Sin tocar el código se activan con variables de entorno (ver configure_from_env):
+#   TTT_METRICS=metricas.json   JSON al salir del programa
+#   TTT_METRICS_PORT=9100       endpoint Prometheus en 127.0.0.1:9100/metrics
+#   TTT_PROFILE_SLOW=0.5        guarda el perfil de las jugadas de 0.5 s o más (en TTT_PROFILE_DIR)
+
+import atexit
+import json
+import os
+import re
+import threading
+import time
+
+PREFIX = 'ttt_'
+
+
+def file_bytes(path):
+    # tamaño del archivo del modelo; 0 para los backends en memoria o si todavía no existe
+    if not path or path == ':memory:' or not os.path.exists(path):
+        return 0
+    return os.path.getsize(path)
+
+
+def _metric_name(name):
+    # 'markov.hits' -> 'ttt_markov_hits'
+    return PREFIX + re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()  # el hilo escritor y el del endpoint también las tocan
+        self.reset()
+        self.slow_threshold = None  # segundos; None = sin captura de perfiles
+        self.slow_dir = None
+        self.slow_limit = 100  # cuántos perfiles lentos se guardan como máximo
+        self.server = None
+
+    def reset(self):
+        with self.lock:
+            self.started = time.perf_counter()
+            self.counters = {}  # nombre -> cantidad
+            self.timings = {}  # nombre -> [llamadas, segundos totales, máximo]
+            self.gauges = {}  # nombre -> último valor
+            self.slow_moves = []  # [{'name', 'seconds', 'profile'}, ...]
+
+    def enable(self):
+        self.enabled = True
+        return self
+
+    def disable(self):
+        self.enabled = False
+
+    # --- registro ---
+
+    def inc(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, seconds):
+        with self.lock:
+            timing = self.timings.get(name)
+            if timing is None:
+                self.timings[name] = [1, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                if seconds > timing[2]:
+                    timing[2] = seconds
+
+    def set(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+
+    def call(self, name, fn, *args):
+        # mide fn(*args) como `name`; en modo captura la corre bajo cProfile y guarda las lentas
+        if self.slow_threshold is None:
+            start = time.perf_counter()
+            result = fn(*args)
+            self.observe(name, time.perf_counter() - start)
+            return result
+        import cProfile  # solo en modo captura
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        result = profiler.runcall(fn, *args)
+        elapsed = time.perf_counter() - start
+        self.observe(name, elapsed)
+        if elapsed >= self.slow_threshold and len(self.slow_moves) < self.slow_limit:
+            self._keep_profile(name, elapsed, profiler)
+        return result
+
+    # --- captura de jugadas lentas ---
+
+    def capture_slow(self, threshold, directory='slow-moves', limit=100):
+        self.slow_threshold = threshold
+        self.slow_dir = directory
+        self.slow_limit = limit
+        return self
+
+    def _keep_profile(self, name, elapsed, profiler):
+        os.makedirs(self.slow_dir, exist_ok=True)
+        path = os.path.join(self.slow_dir, f'{name}-{len(self.slow_moves) + 1:03d}-{elapsed * 1000:.0f}ms.prof')
+        profiler.dump_stats(path)
+        with self.lock:
+            self.slow_moves.append({'name': name, 'seconds': elapsed, 'profile': path})
+
+    # --- exportación ---
+
+    def snapshot(self):
+        with self.lock:
+            elapsed = time.perf_counter() - self.started
+            counters = dict(self.counters)
+            timings = {name: {'count': count, 'total': total, 'mean': total / count, 'max': worst}
+                       for name, (count, total, worst) in self.timings.items()}
+            gauges = dict(self.gauges)
+            slow_moves = list(self.slow_moves)
+        hits, misses = counters.get('markov.hits', 0), counters.get('markov.misses', 0)
+        cache_hits, cache_misses = counters.get('cache.hits', 0), counters.get('cache.misses', 0)
+        derived = {
+            'uptime': elapsed,
+            'games_per_second': counters.get('games', 0) / elapsed if elapsed else 0.0,
+            'markov_hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+            'decision_cache_hit_rate': cache_hits / (cache_hits + cache_misses) if cache_hits + cache_misses else 0.0,
+        }
+        return {'counters': counters, 'timings': timings, 'gauges': gauges, 'derived': derived,
+                'slow_moves': slow_moves}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            f.write(self.to_json())
+
+    def to_prometheus(self):
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot['counters'].items()):
+            metric = _metric_name(name) + '_total'
+            lines += [f'# TYPE {metric} counter', f'{metric} {value}']
+        for name, timing in sorted(snapshot['timings'].items()):
+            metric = _metric_name(name) + '_seconds'
+            lines += [f'# TYPE {metric} summary', f'{metric}_count {timing["count"]}',
+                      f'{metric}_sum {timing["total"]:.9f}', f'# TYPE {metric}_max gauge',
+                      f'{metric}_max {timing["max"]:.9f}']
+        for name, value in sorted({**snapshot['gauges'], **snapshot['derived']}.items()):
+            metric = _metric_name(name)
+            lines += [f'# TYPE {metric} gauge', f'{metric} {value}']
+        return '\n'.join(lines) + '\n'
+
+    def serve_prometheus(self, port=9100, host='127.0.0.1'):
+        # endpoint local GET /metrics en un hilo aparte; devuelve el puerto real (útil con port=0)
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # pesa ~25 ms: solo si se usa
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # sin una línea en la consola por cada consulta
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True).start()
+        return self.server.server_address[1]
+
+
+metrics = Metrics()  # instancia compartida por todo el proceso
+
+
+def configure_from_env(environ=os.environ):
+    # activa las métricas según TTT_METRICS / TTT_METRICS_PORT / TTT_PROFILE_SLOW (ver arriba)
+    path = environ.get('TTT_METRICS')
+    port = environ.get('TTT_METRICS_PORT')
+    slow = environ.get('TTT_PROFILE_SLOW')
+    if not (path or port or slow):
+        return metrics
+    metrics.enable()
+    if slow:
+        metrics.capture_slow(float(slow), environ.get('TTT_PROFILE_DIR', 'slow-moves'))
+    if port:
+        metrics.serve_prometheus(int(port))
+    if path:
+        atexit.register(metrics.write_json, path)
+    return metrics
+
+
+configure_from_env()
@@ -0,0 +1,159 @@
+# Predictor de orden variable (n-gramas) para MarkovAI.
+# Además del tablero, condiciona en las últimas `order` jugadas del mismo lado en la partida:
+# el contexto de orden 0 es solo el estado (como el modelo de diccionario), el de orden 1
+# agrega la jugada anterior, el de orden 2 las dos anteriores, etc.
+#
+# Los contextos forman un trie: la raíz de cada estado canónico es el nodo de orden 0 y cada
+# hijo agrega una jugada previa (la más reciente primero). Los nodos viven en arreglos planos
+# (array('I')): `cells` contadores por nodo más su total, y los hijos en un solo dict de
+# enteros nodo * cells + casilla -> hijo. Al predecir se usa el contexto más largo con al
+# menos `min_count` observaciones y se retrocede a órdenes menores cuando hay pocos datos.
+
+import os
+import struct
+import sys
+from array import array
+
+from tttCore.storage import board_suffix, write_atomic
+from tttCore.symmetry import Symmetry
+
+MAGIC = b'TTNG\x01'
+HEADER = struct.Struct('<BBIIII')  # orden, tamaño, nodos, raíces, hijos, min_count
+
+
+def _native(values):
+    # los arreglos se guardan little-endian sin importar la máquina
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+class NgramPredictor:
+    def __init__(self, order=2, size=3, min_count=2):
+        self.order = order
+        self.size = size
+        self.cells = size * size
+        self.min_count = min_count
+        self.symmetry = Symmetry.get(size)
+        self.roots = {}  # estado canónico -> nodo de orden 0
+        self.children = {}  # nodo * cells + casilla previa -> nodo hijo
+        self.totals = array('I')  # observaciones por nodo
+        self.counts = array('I')  # cells contadores por nodo, uno detrás de otro
+        self._zeros = array('I', bytes(4 * self.cells))
+
+    def _new_node(self):
+        node = len(self.totals)
+        self.totals.append(0)
+        self.counts.extend(self._zeros)
+        return node
+
+    def _cell(self, move, t):
+        return self.symmetry.inverse[t][move[0] * self.size + move[1]]
+
+    def learn(self, state, previous, move):
+        # una observación: en `state`, tras las jugadas `previous` (de la más vieja a la más nueva), se jugó `move`
+        canonical, t = self.symmetry.canonical(state)
+        cell = self._cell(move, t)
+        node = self.roots.get(canonical)
+        if node is None:
+            node = self.roots[canonical] = self._new_node()
+        self.totals[node] += 1
+        self.counts[node * self.cells + cell] += 1
+        for prev in reversed(previous[-self.order:] if self.order else ()):
+            key = node * self.cells + self._cell(prev, t)
+            child = self.children.get(key)
+            if child is None:
+                child = self.children[key] = self._new_node()
+            node = child
+            self.totals[node] += 1
+            self.counts[node * self.cells + cell] += 1
+
+    def learn_game(self, moves):
+        # jugadas [(estado, jugada), ...] de un lado en una partida, en orden
+        for i, (state, move) in enumerate(moves):
+            self.learn(state, [m for _, m in moves[max(0, i - self.order):i]], move)
+
+    def distribution(self, state, previous, available_moves):
+        # {jugada: conteo} del contexto más largo con datos suficientes que tenga jugadas disponibles
+        canonical, t = self.symmetry.canonical(state)
+        node = self.roots.get(canonical)
+        if node is None:
+            return {}
+        path = [node]
+        for prev in reversed(previous[-self.order:] if self.order else ()):
+            node = self.children.get(node * self.cells + self._cell(prev, t))
+            if node is None:
+                break
+            path.append(node)
+        available = {self._cell(move, t): move for move in available_moves}
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            if depth and self.totals[node] < self.min_count:
+                continue  # poco visto: se retrocede a un contexto más corto
+            base = node * self.cells
+            weights = {move: self.counts[base + cell] for cell, move in available.items() if self.counts[base + cell]}
+            if weights:
+                return weights
+        return {}
+
+    def predict(self, state, previous, available_moves, rng):
+        weights = self.distribution(state, previous, available_moves)
+        if not weights:
+            return None
+        return rng.choices(list(weights), weights=list(weights.values()), k=1)[0]
+
+    def stats(self):
+        approx_bytes = (sys.getsizeof(self.roots) + sys.getsizeof(self.children)
+                        + sys.getsizeof(self.totals) + sys.getsizeof(self.counts)
+                        + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in self.roots.items())
+                        + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in self.children.items()))
+        return {'order': self.order, 'states': len(self.roots), 'nodes': len(self.totals), 'approx_bytes': approx_bytes}
+
+    def save(self, path):
+        roots = array('Q', [value for item in self.roots.items() for value in item])
+        children = array('Q', [value for item in self.children.items() for value in item])
+        header = HEADER.pack(self.order, self.size, len(self.totals), len(self.roots), len(self.children),
+                             self.min_count)
+        parts = [MAGIC, header]
+        for values in (roots, children, array('I', self.totals), array('I', self.counts)):
+            parts.append(_native(values).tobytes())
+        write_atomic(path, b''.join(parts))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            raise ValueError(f"{path} no es un archivo de n-gramas válido")
+        order, size, nodes, roots, children, min_count = HEADER.unpack_from(data, len(MAGIC))
+        model = cls(order, size, min_count)
+        offset = len(MAGIC) + HEADER.size
+        arrays = []
+        for typecode, length in (('Q', 2 * roots), ('Q', 2 * children), ('I', nodes), ('I', nodes * model.cells)):
+            values = array(typecode)
+            end = offset + length * values.itemsize
+            values.frombytes(data[offset:end])
+            arrays.append(_native(values))
+            offset = end
+        model.roots = dict(zip(arrays[0][::2], arrays[0][1::2]))
+        model.children = dict(zip(arrays[1][::2], arrays[1][1::2]))
+        model.totals, model.counts = arrays[2], arrays[3]
+        return model
+
+
+def ngram_path(data_file, order, size=3, k=None):
+    # markov_data.json -> markov_data_ngram2.bin (markov_data_ngram2_4x4.bin en 4x4, _4x4k3 con k=3); None = solo en memoria
+    if data_file is None:
+        return None
+    base, _ = os.path.splitext(data_file)
+    return f'{base}_ngram{order}{board_suffix(size, k)}.bin'
+
+
+def open_ngram(path, order, size=3, min_count=2):
+    # carga el trie guardado si coincide con el orden y el tamaño pedidos; si no, empieza vacío
+    if path and os.path.exists(path):
+        model = NgramPredictor.load(path)
+        if model.order == order and model.size == size:
+            model.min_count = min_count
+            return model
+    return NgramPredictor(order, size, min_count)
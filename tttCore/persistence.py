@@ -0,0 +1,109 @@
+# Persistencia diferida (write-behind) para la tabla de transiciones.
+# El fin de partida solo encola los incrementos; un hilo en segundo plano los acumula de
+# varias partidas y los escribe al backend cada `flush_games` partidas o cada
+# `flush_interval` segundos, y vacía la cola al cerrar el programa.
+# Si el backend falla, el lote no se pierde: queda pendiente y se reintenta en el próximo
+# intervalo o flush, y el error se levanta en flush() y close() mientras no se haya escrito.
+
+import atexit
+import queue
+import threading
+import time
+
+from tttCore.metrics import file_bytes, metrics
+
+_STOP = object()
+CLOSE_RETRIES = 3  # intentos extra al cerrar, antes de rendirse y levantar el error
+RETRY_DELAY = 0.1
+
+
+class WriteBehindWriter:
+    def __init__(self, storage, flush_games=10, flush_interval=5.0):
+        self.storage = storage
+        self.flush_games = flush_games
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.closed = False
+        self.error = None  # excepción del último intento de escritura; None si se escribió todo
+        self.thread = threading.Thread(target=self._run, name='markov-writer', daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def submit(self, deltas):
+        # llamado al terminar cada partida: solo encola, nunca toca el disco
+        if deltas and not self.closed:
+            self.queue.put(deltas)
+
+    def flush(self):
+        # bloquea hasta que todo lo encolado antes de esta llamada esté escrito; si no se pudo, levanta el error
+        if self.closed:
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait()
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(_STOP)
+        self.thread.join()
+        self.storage.close()
+        if self.error is not None:
+            raise self.error  # lo que quedaba pendiente no llegó al disco
+
+    def _write(self, pending, retries=0):
+        # True si el lote quedó escrito; si no, queda el error en self.error
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(RETRY_DELAY)
+            try:
+                start = time.perf_counter()
+                self.storage.add(pending)
+            except Exception as e:  # el hilo no debe morir por un error de disco
+                self.error = e
+                if metrics.enabled:
+                    metrics.inc('storage.errors')
+                continue
+            self.error = None
+            if metrics.enabled:
+                # cada lote escrito: duración, contadores tocados y tamaño del archivo después
+                metrics.observe('storage.save', time.perf_counter() - start)
+                metrics.inc('storage.saved_entries', len(pending))
+                metrics.set('storage.bytes', file_bytes(getattr(self.storage, 'path', None)))
+            return True
+        return False
+
+    def _run(self):
+        pending = {}
+        games = 0
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None  # venció el intervalo de tiempo
+
+            if isinstance(item, dict):
+                # se combinan los incrementos de varias partidas en un solo lote
+                for key, delta in item.items():
+                    pending[key] = pending.get(key, 0) + delta
+                games += 1
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if games < self.flush_games and time.monotonic() < deadline:
+                    continue
+
+            if pending and self._write(pending, CLOSE_RETRIES if item is _STOP else 0):
+                pending = {}
+            games = 0
+            # si la escritura falló, el lote sigue pendiente y se reintenta en el próximo intervalo
+            deadline = time.monotonic() + self.flush_interval if pending else None
+
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
@@ -0,0 +1,166 @@
+# Modelos de Markov por jugador sobre un prior global compartido.
+# Cada jugador tiene su propia tabla {estado canónico: {jugada: conteo}} guardada en una
+# base SQLite común (una fila por jugador, estado y casilla). Las tablas se cargan recién
+# cuando el jugador aparece, viven en un caché LRU de tamaño fijo y sus cambios se escriben
+# (por el mismo hilo write-behind del modelo global) cuando el jugador sale del caché o al
+# llamar a flush/close.
+#
+# La predicción mezcla lo propio del jugador con el modelo global: cada jugada pesa
+# conteo_del_jugador + prior_weight * probabilidad_global, así un jugador nuevo juega
+# contra el modelo global y uno con muchas partidas, contra sus propios hábitos.
+
+import os
+import random
+import sqlite3
+from collections import OrderedDict
+
+from tttCore.persistence import WriteBehindWriter
+from tttCore.storage import board_suffix, cell_to_move, check_size, move_to_cell
+
+
+def profile_path(data_file, size=3, k=None):
+    # markov_learning.json -> markov_learning_profiles.db (markov_learning_profiles_4x4.db en 4x4, _4x4k3 con k=3)
+    if data_file is None:
+        return ':memory:'
+    base, _ = os.path.splitext(data_file)
+    return f'{base}_profiles{board_suffix(size, k)}.db'
+
+
+class ProfileStore:
+    # mismo formato que SQLiteStorage con la columna del jugador; add recibe {(jugador, estado, jugada): n}
+    def __init__(self, path, size=3):
+        check_size(size)
+        self.path = path
+        self.size = size
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS profiles ('
+            'player TEXT NOT NULL, state INTEGER NOT NULL, move INTEGER NOT NULL, count INTEGER NOT NULL, '
+            'PRIMARY KEY (player, state, move)) WITHOUT ROWID'
+        )
+        self.conn.commit()
+
+    def load(self, player):
+        counts = {}
+        for state, cell, count in self.conn.execute(
+                'SELECT state, move, count FROM profiles WHERE player = ?', (player,)):
+            counts.setdefault(state, {})[cell_to_move(cell, self.size)] = count
+        return counts
+
+    def add(self, deltas):
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO profiles (player, state, move, count) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (player, state, move) DO UPDATE SET count = count + excluded.count',
+                [(player, state, move_to_cell(move, self.size), delta)
+                 for (player, state, move), delta in deltas.items()],
+            )
+
+    def players(self):
+        return [row[0] for row in self.conn.execute('SELECT DISTINCT player FROM profiles')]
+
+    def close(self):
+        self.conn.close()
+
+
+class PlayerProfile:
+    __slots__ = ('player', 'counts', 'pending')
+
+    def __init__(self, player, counts):
+        self.player = player
+        self.counts = counts
+        self.pending = {}  # (estado, jugada) -> incremento todavía sin escribir
+
+
+class PlayerModels:
+    def __init__(self, prior, store, capacity=1000, prior_weight=5.0, flush_games=10, flush_interval=5.0):
+        self.prior = prior  # MarkovAI compartido: su transition_counts es el prior global
+        self.symmetry = prior.symmetry
+        self.store = store
+        self.writer = WriteBehindWriter(store, flush_games, flush_interval)
+        self.capacity = capacity
+        self.prior_weight = prior_weight  # cuántas partidas "vale" el modelo global frente al del jugador
+        self.cache = OrderedDict()  # jugador -> PlayerProfile, del menos al más reciente
+        self.unflushed = set()  # desalojados cuyos cambios pueden seguir en la cola del escritor
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def profile(self, player):
+        profile = self.cache.get(player)
+        if profile is not None:
+            self.cache.move_to_end(player)
+            self.hits += 1
+            return profile
+        self.misses += 1
+        if player in self.unflushed:
+            # volvió antes de que se escribiera lo suyo: se espera al escritor para no perderlo
+            self.writer.flush()
+            self.unflushed.clear()
+        profile = self.cache[player] = PlayerProfile(player, self.store.load(player))
+        while len(self.cache) > self.capacity:
+            _, evicted = self.cache.popitem(last=False)
+            self._write_back(evicted)
+            self.evictions += 1
+        return profile
+
+    def _write_back(self, profile):
+        if profile.pending:
+            self.writer.submit({(profile.player, state, move): n for (state, move), n in profile.pending.items()})
+            profile.pending = {}
+            self.unflushed.add(profile.player)
+
+    def learn(self, player, history):
+        # suma las jugadas [(estado, jugada), ...] de una partida al modelo del jugador
+        profile = self.profile(player)
+        for state, move in history:
+            state, move = self.symmetry.canonical_pair(state, move)
+            moves = profile.counts.setdefault(state, {})
+            moves[move] = moves.get(move, 0) + 1
+            key = (state, move)
+            profile.pending[key] = profile.pending.get(key, 0) + 1
+
+    def distribution(self, player, state, available_moves):
+        # {jugada (coordenadas reales): peso} combinando al jugador con el prior global
+        canonical_state, t = self.symmetry.canonical(state)
+        available = {self.symmetry.to_canonical(move, t): move for move in available_moves}
+        own = self.profile(player).counts.get(canonical_state, {})
+        prior = self.prior.read_counts(canonical_state) or {}  # copia consistente aunque otros hilos aprendan
+        prior_total = sum(count for move, count in prior.items() if move in available)
+        weights = {}
+        for canonical_move, move in available.items():
+            weight = own.get(canonical_move, 0)
+            if prior_total:
+                weight += self.prior_weight * prior.get(canonical_move, 0) / prior_total
+            if weight > 0:
+                weights[move] = weight
+        return weights
+
+    def predict_next_move(self, player, state, available_moves):
+        # None si ni el jugador ni el modelo global conocen el estado (el llamador decide el respaldo)
+        weights = self.distribution(player, state, available_moves)
+        if not weights:
+            return None
+        return random.choices(list(weights), weights=list(weights.values()), k=1)[0]
+
+    def flush(self):
+        for profile in self.cache.values():
+            self._write_back(profile)
+        self.writer.flush()
+        self.unflushed.clear()
+
+    def close(self):
+        for profile in self.cache.values():
+            self._write_back(profile)
+        self.writer.close()  # escribe lo encolado; si el backend sigue fallando, levanta el error
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'cached_players': len(self.cache),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,262 @@
+# Motor de búsqueda minimax con poda alfa-beta, tabla de transposición (hash de Zobrist)
+# y orden de jugadas (primero las casillas por donde pasan más líneas: en 3x3 centro,
+# esquinas y lados). Los puntajes dependen de la profundidad para preferir ganar rápido y
+# perder lento, pero su signo es el mismo valor (-1, 0, 1) que da el minimax exhaustivo.
+# Cuenta los nodos visitados para los benchmarks.
+#
+# En tableros NxN más grandes la búsqueda completa no es viable: con `time_limit` se usa
+# profundización iterativa con una evaluación heurística en las hojas, y se devuelve la
+# mejor jugada de la última profundidad terminada dentro del tiempo.
+#
+# La tabla de transposición tiene un tope de entradas (max_entries): los motores viven todo el
+# proceso (servidor, juego de minimax) y en 4x4 o más crecerían sin límite. Al llenarse se
+# descarta la mitad más vieja (los dict conservan el orden de inserción).
+
+import random
+import time
+from itertools import islice
+
+from tttCore.bitboard import AI, DEFAULT, PLAYER, Board, other
+
+WIN_SCORE = 100000
+MATE = WIN_SCORE - 1000  # |puntaje| >= MATE significa victoria o derrota forzada
+HEURISTIC_LIMIT = MATE // 2
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def move_order(geometry):
+    # casillas con más líneas primero; a igualdad, las más cercanas al centro
+    center = (geometry.size - 1) / 2
+    return tuple(sorted(
+        range(geometry.cells),
+        key=lambda i: (-len(geometry.cell_lines[i]),
+                       abs(i // geometry.size - center) + abs(i % geometry.size - center), i),
+    ))
+
+
+def _score_value(score):
+    # puntaje -> valor -1 / 0 / 1 (las heurísticas sin victoria forzada cuentan como 0)
+    if score >= MATE:
+        return 1
+    if score <= -MATE:
+        return -1
+    return 0
+
+
+class SearchEngine:
+    def __init__(self, pruning=True, use_table=True, ordering=True, seed=2024, geometry=DEFAULT, max_entries=1 << 18):
+        # sin poda, sin tabla y sin orden equivale al minimax exhaustivo original
+        self.pruning = pruning
+        self.use_table = use_table
+        self.ordering = ordering
+        self.seed = seed
+        self.table = {}  # hash -> (profundidad, cota, puntaje relativo al nodo, mejor casilla)
+        self.max_entries = max_entries
+        self.nodes = 0
+        self.depth_reached = 0
+        self.aborted = False  # la última búsqueda la cortó abort() (no el tiempo)
+        self._abort = False
+        self._deadline = None
+        self._set_geometry(geometry)
+
+    def _set_geometry(self, geometry):
+        self.geometry = geometry
+        rng = random.Random(self.seed)
+        self.zobrist = {player: [rng.getrandbits(64) for _ in range(geometry.cells)] for player in (PLAYER, AI)}
+        self.side = rng.getrandbits(64)  # se alterna en cada jugada: la misma posición con otro turno es otra entrada
+        self.order = move_order(geometry) if self.ordering else tuple(range(geometry.cells))
+        # pesos de la heurística: una línea con n fichas propias (y ninguna rival) vale 8**n
+        self.weights = [0] + [8 ** n for n in range(1, geometry.k + 1)]
+        self.table.clear()
+
+    def clear(self):
+        self.table.clear()
+
+    def _shrink(self):
+        # tabla llena: se van las entradas más viejas (las primeras insertadas)
+        for key in list(islice(self.table, len(self.table) // 2 or 1)):
+            del self.table[key]
+
+    def begin(self):
+        # comienzo de un trabajo que puede hacer una búsqueda o ninguna (una jugada pensada por
+        # adelantado que sale del libro o de Markov): aborted queda en False hasta que abort() corte algo
+        self.aborted = self._abort = False
+
+    def abort(self):
+        # desde otro hilo: la búsqueda con límite de tiempo en curso termina en el próximo chequeo
+        # del reloj y devuelve la última profundidad completa (ver aborted)
+        self._abort = True
+
+    def hash(self, board, player=PLAYER):
+        h = self.side if player == AI else 0
+        for cell in range(self.geometry.cells):
+            if board.x >> cell & 1:
+                h ^= self.zobrist[PLAYER][cell]
+            elif board.o >> cell & 1:
+                h ^= self.zobrist[AI][cell]
+        return h
+
+    def evaluate(self, board, player):
+        # heurística para quien mueve: líneas abiertas propias menos las del rival
+        mine, theirs = (board.x, board.o) if player == PLAYER else (board.o, board.x)
+        weights = self.weights
+        score = 0
+        for mask in self.geometry.win_masks:
+            a = mine & mask
+            b = theirs & mask
+            if a and not b:
+                score += weights[a.bit_count()]
+            elif b and not a:
+                score -= weights[b.bit_count()]
+        return max(-HEURISTIC_LIMIT, min(HEURISTIC_LIMIT, score))
+
+    def search(self, board, player=AI, time_limit=None, max_depth=None):
+        # devuelve (valor -1/0/1, mejor jugada (fila, col) o None, puntaje ajustado por profundidad).
+        # Sin límites se busca hasta el final; con `time_limit` (segundos) o `max_depth` se
+        # profundiza de a un nivel y se usa la última iteración completa.
+        board = board.copy() if isinstance(board, Board) else Board.from_cells(board)
+        if board.geometry is not self.geometry:
+            self._set_geometry(board.geometry)
+        self.nodes = 0
+        self.depth_reached = 0
+        self.begin()
+        winner = board.winner()
+        if winner is not None:
+            return (1 if winner == player else -1), None, (WIN_SCORE if winner == player else -WIN_SCORE)
+        empties = self.geometry.cells - (board.x | board.o).bit_count()
+        if not empties:
+            return 0, None, 0
+
+        if time_limit is None and max_depth is None:
+            score, cell = self._root(board, player, empties, None)
+            self.depth_reached = empties
+            return _score_value(score), divmod(cell, self.geometry.size), score
+
+        self._deadline = None if time_limit is None else time.perf_counter() + time_limit
+        limit = min(empties, max_depth or empties)
+        best_score, best_cell = None, None
+        try:
+            for depth in range(1, limit + 1):
+                # la profundidad 1 siempre termina, así siempre hay una jugada para devolver
+                score, cell = self._root(board, player, depth, best_cell, timed=depth > 1)
+                best_score, best_cell = score, cell
+                self.depth_reached = depth
+                if abs(score) >= MATE:
+                    break  # resultado forzado: más profundidad no cambia la jugada
+        except SearchTimeout:
+            self.aborted = self._abort
+        finally:
+            self._deadline = None
+        return _score_value(best_score), divmod(best_cell, self.geometry.size), best_score
+
+    def _ordered(self, empty, first):
+        if first is not None and empty >> first & 1:
+            yield first
+        for cell in self.order:
+            if cell != first and empty >> cell & 1:
+                yield cell
+
+    def _root(self, board, player, depth, first, timed=False):
+        best_score = -WIN_SCORE - 1
+        best_cell = None
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        h = self.hash(board, player)
+        deadline = self._deadline if timed else None
+        for cell in self._ordered(board.empty_mask(), first):
+            board.make_move(cell, player)
+            try:
+                score = -self._negamax(board, other(player), cell, 1, depth - 1, -beta, -alpha,
+                                       h ^ self.zobrist[player][cell] ^ self.side, deadline)
+            finally:
+                board.undo_move(cell)
+            if score > best_score:
+                best_score, best_cell = score, cell
+            if self.pruning:
+                alpha = max(alpha, score)
+        return best_score, best_cell
+
+    def _negamax(self, board, player, last, ply, depth, alpha, beta, h, deadline):
+        # `last` es la casilla de la jugada anterior: solo se revisan las líneas que pasan por ella
+        self.nodes += 1
+        if deadline is not None and not self.nodes & 1023 and (self._abort or time.perf_counter() > deadline):
+            raise SearchTimeout()
+        if board.wins_through(last, other(player)):
+            return ply - WIN_SCORE  # perdió quien mueve; más tarde = menos malo
+        empty = board.empty_mask()
+        if not empty:
+            return 0
+        if depth <= 0:
+            return self.evaluate(board, player)
+
+        alpha_start = alpha
+        best_cell = None
+        if self.use_table:
+            entry = self.table.get(h)
+            if entry is not None:
+                stored_depth, bound, stored, best_cell = entry
+                if stored_depth >= depth:
+                    score = self._from_table(stored, ply)
+                    if bound == EXACT:
+                        return score
+                    if bound == LOWER:
+                        alpha = max(alpha, score)
+                    elif bound == UPPER:
+                        beta = min(beta, score)
+                    if alpha >= beta:
+                        return score
+
+        best = -WIN_SCORE - 1
+        keys = self.zobrist[player]
+        side = self.side
+        opponent = other(player)
+        for cell in self._ordered(empty, best_cell):
+            board.make_move(cell, player)
+            try:
+                score = -self._negamax(board, opponent, cell, ply + 1, depth - 1, -beta, -alpha,
+                                       h ^ keys[cell] ^ side, deadline)
+            finally:
+                board.undo_move(cell)
+            if score > best:
+                best, best_cell = score, cell
+            if self.pruning:
+                alpha = max(alpha, score)
+                if alpha >= beta:
+                    break
+
+        if self.use_table:
+            if best <= alpha_start:
+                bound = UPPER
+            elif self.pruning and best >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            if len(self.table) >= self.max_entries and h not in self.table:
+                self._shrink()
+            self.table[h] = (depth, bound, self._to_table(best, ply), best_cell)
+        return best
+
+    @staticmethod
+    def _to_table(score, ply):
+        # los puntajes de victoria/derrota se guardan relativos al nodo para que sirvan en otra profundidad
+        if score >= MATE:
+            return score + ply
+        if score <= -MATE:
+            return score - ply
+        return score
+
+    @staticmethod
+    def _from_table(score, ply):
+        if score >= MATE:
+            return score - ply
+        if score <= -MATE:
+            return score + ply
+        return score
+
+
+def best_move(board, player=AI, engine=None, time_limit=None):
+    return (engine or SearchEngine()).search(board, player, time_limit)[1]
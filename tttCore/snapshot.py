@@ -0,0 +1,207 @@
+# Instantáneas de solo lectura del modelo para compartir entre procesos.
+# El archivo es un índice ordenado de estados canónicos de ancho fijo (uint64) seguido de una
+# fila de `cells` contadores uint32 por estado, todo little-endian:
+#
+#   MAGIC | cabecera (tamaño, estados) | relleno hasta 16 | estados[n] | conteos[n * cells]
+#
+# Se abre con mmap y se consulta con búsqueda binaria sobre el índice: no hay que
+# deserializar nada y varios procesos que abren el mismo archivo comparten las páginas de la
+# caché del sistema en lugar de tener cada uno su dict de transition_counts.
+#
+# SnapshotTable se comporta como el dict {estado: {jugada: conteo}} que usa MarkovAI: las
+# lecturas (get, in) van directo al archivo y lo aprendido en vivo se guarda en un overlay
+# chico por proceso (copia de la fila al primer incremento). Los incrementos también siguen
+# llegando al almacenamiento normal, así que una instantánea nueva (build_snapshot) los
+# incluye; al volver a mapear (refresh) el overlay se descarta.
+
+import bisect
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from tttCore.countBudget import table_stats
+from tttCore.storage import board_suffix, cell_to_move, check_size, move_to_cell, write_atomic
+
+MAGIC = b'TTSS\x01'
+HEADER = struct.Struct('<BQ')  # tamaño del tablero, cantidad de estados
+DATA_OFFSET = 16  # los arreglos empiezan alineados a 8 bytes
+
+
+def write_snapshot(path, counts, size=3):
+    # escribe la tabla {estado canónico: {jugada: conteo}} (reemplazo atómico: los lectores que
+    # ya la tienen mapeada siguen viendo la versión anterior hasta que llamen a refresh)
+    check_size(size)
+    cells = size * size
+    states = array('Q', sorted(state for state, moves in counts.items() if moves))
+    rows = array('I', bytes(4 * cells * len(states)))
+    for i, state in enumerate(states):
+        base = i * cells
+        for move, count in counts[state].items():
+            rows[base + move_to_cell(move, size)] = min(int(count), 0xFFFFFFFF)
+    if sys.byteorder == 'big':
+        states.byteswap()
+        rows.byteswap()
+    header = MAGIC + HEADER.pack(size, len(states))
+    write_atomic(path, header.ljust(DATA_OFFSET, b'\0') + states.tobytes() + rows.tobytes())
+
+
+def build_snapshot(storage, path, size=3, symmetry=None):
+    # instantánea nueva a partir de lo que hay en el almacenamiento (sqlite, binario o json)
+    counts = storage.load()
+    if symmetry is not None:
+        counts = symmetry.fold(counts)
+    write_snapshot(path, counts, size)
+    return len(counts)
+
+
+def snapshot_path(data_file, size=3, k=None):
+    # markov_learning.json -> markov_learning.snap (markov_learning_4x4.snap en 4x4, _4x4k3 con k=3)
+    base, _ = os.path.splitext(data_file)
+    return f'{base}{board_suffix(size, k)}.snap'
+
+
+class Snapshot:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.map.close()
+            raise ValueError(f"{path} no es una instantánea válida")
+        self.size, self.count = HEADER.unpack_from(self.map, len(MAGIC))
+        self.cells = self.size * self.size
+        self.cell_moves = [cell_to_move(cell, self.size) for cell in range(self.cells)]
+        end = DATA_OFFSET + 8 * self.count
+        self.view = memoryview(self.map)
+        if sys.byteorder == 'big':
+            # sin compartir páginas: se copia y se invierte el orden de bytes una vez
+            self.states = array('Q', self.view[DATA_OFFSET:end].tobytes())
+            self.counts = array('I', self.view[end:end + 4 * self.cells * self.count].tobytes())
+            self.states.byteswap()
+            self.counts.byteswap()
+        else:
+            self.states = self.view[DATA_OFFSET:end].cast('Q')
+            self.counts = self.view[end:end + 4 * self.cells * self.count].cast('I')
+
+    def __len__(self):
+        return self.count
+
+    def find(self, state):
+        # posición del estado en el índice o -1
+        i = bisect.bisect_left(self.states, state)
+        if i < self.count and self.states[i] == state:
+            return i
+        return -1
+
+    def __contains__(self, state):
+        return self.find(state) >= 0
+
+    def moves(self, state):
+        # {jugada: conteo} del estado o None si no está
+        i = self.find(state)
+        if i < 0:
+            return None
+        base = i * self.cells
+        return {move: count for move, count in zip(self.cell_moves, self.counts[base:base + self.cells]) if count}
+
+    def __iter__(self):
+        return iter(self.states)
+
+    def changed(self):
+        # True si el archivo en disco ya no es el que está mapeado (se escribió una instantánea nueva)
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size) != self.identity
+
+    def close(self):
+        if isinstance(self.states, memoryview):
+            self.states.release()
+            self.counts.release()
+        self.view.release()
+        self.map.close()
+
+
+class SnapshotTable:
+    # vista tipo dict de una instantánea más el overlay de lo aprendido en este proceso
+    def __init__(self, snapshot):
+        self.base = snapshot
+        self.overlay = {}  # estado -> {jugada: conteo} (fila de la instantánea + incrementos)
+
+    def get(self, state, default=None):
+        moves = self.overlay.get(state)
+        if moves is not None:
+            return moves
+        moves = self.base.moves(state)
+        return default if moves is None else moves
+
+    def __contains__(self, state):
+        return state in self.overlay or state in self.base
+
+    def __getitem__(self, state):
+        # acceso para modificar: la fila se copia al overlay (copy-on-write)
+        moves = self.overlay.get(state)
+        if moves is None:
+            moves = self.base.moves(state)
+            if moves is None:
+                raise KeyError(state)
+            self.overlay[state] = moves
+        return moves
+
+    def __setitem__(self, state, moves):
+        self.overlay[state] = moves
+
+    def setdefault(self, state, default=None):
+        if state in self:
+            return self[state]
+        self.overlay[state] = default
+        return default
+
+    def __len__(self):
+        return self.base.count + sum(1 for state in self.overlay if state not in self.base)
+
+    def __iter__(self):
+        yield from self.base
+        for state in self.overlay:
+            if state not in self.base:
+                yield state
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        for state in self:
+            yield state, self.get(state)
+
+    def values(self):
+        for state in self:
+            yield self.get(state)
+
+    def refresh(self):
+        # vuelve a mapear si hay una instantánea nueva; lo del overlay ya está en el almacenamiento
+        # (y en la instantánea nueva si se escribió antes de armarla), así que se descarta.
+        # La anterior no se cierra acá: un hilo que la esté leyendo sin candado (el prior del MCTS,
+        # ponder) tiene su propia referencia, y el mapeo se libera cuando se suelta la última
+        if not self.base.changed():
+            return False
+        self.base = Snapshot(self.base.path)
+        self.overlay = {}
+        return True
+
+    def stats(self):
+        overlay = table_stats(self.overlay)
+        return {
+            'states': len(self),
+            'snapshot_states': self.base.count,
+            'overlay_states': overlay['states'],
+            'mapped_bytes': len(self.base.map),
+            'approx_bytes': overlay['approx_bytes'],  # memoria propia del proceso (sin las páginas compartidas)
+        }
+
+    def close(self):
+        self.base.close()
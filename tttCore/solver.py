@@ -0,0 +1,112 @@
+# Tabla de solución del tic-tac-toe.
+# El juego se resuelve recorriendo solo las posiciones canónicas (reducidas por las 8
+# simetrías del tablero). Para cada una se guarda su valor y las mejores jugadas, así que
+# pedir la jugada de minimax es una simple consulta. La tabla se llena a medida que se
+# consulta (la primera jugada resuelve casi todo el árbol en unos milisegundos) para que
+# importar el módulo no retrase el arranque; solve() la completa de una vez.
+
+from tttCore.bitboard import AI, DEFAULT, FULL, HAS_LINE, PLAYER, POPCOUNT, Board
+from tttCore.symmetry import Symmetry
+
+WIN_SCORE = 10  # puntaje de una derrota inmediata; cada jugada de distancia lo acerca a 0
+
+
+# SYMMETRIES[t][i] = índice del tablero original que queda en la posición i tras aplicar t
+# PERMUTED_BITS[t][mask] = máscara de 9 bits transformada por la simetría t
+SYMMETRIES = Symmetry.get(3).perms
+PERMUTED_BITS = Symmetry.get(3).permuted_bits
+
+# puntaje y mejores jugadas (en el marco canónico) de cada posición canónica, por código x | o << 9.
+# El puntaje se ajusta por la distancia al final: ganar antes vale más y
+# perder después vale menos; su signo es el valor -1 / 0 / 1 del minimax.
+TABLE = {}
+
+
+def to_board(board):
+    # acepta un Board, un tablero 3x3 (listas) o una secuencia de 9 casillas
+    if not isinstance(board, Board):
+        board = Board.from_cells(board)
+    if board.geometry is not DEFAULT:
+        # la tabla solo existe para el 3x3; otros tableros usan tttCore.search con límite de tiempo
+        raise ValueError(f"el solver solo resuelve el 3x3 clásico, no {board.geometry}")
+    return board
+
+
+def canonical(x, o):
+    # devuelve el código canónico (el menor entre las 8 simetrías) y la permutación usada
+    best = None
+    best_t = 0
+    for t, table in enumerate(PERMUTED_BITS):
+        code = table[x] | (table[o] << 9)
+        if best is None or code < best:
+            best = code
+            best_t = t
+    return best, SYMMETRIES[best_t]
+
+
+def _solve(code):
+    # negamax con memoria sobre posiciones canónicas; el puntaje es para quien mueve
+    entry = TABLE.get(code)
+    if entry is not None:
+        return entry[0]
+
+    x, o = code & FULL, code >> 9
+    if HAS_LINE[x] or HAS_LINE[o]:
+        # la última jugada ganó, así que quien mueve ya perdió
+        TABLE[code] = (-WIN_SCORE, ())
+        return -WIN_SCORE
+    empty = FULL & ~(x | o)
+    if not empty:
+        TABLE[code] = (0, ())
+        return 0
+
+    x_moves = POPCOUNT[x] <= POPCOUNT[o]
+    best = -WIN_SCORE - 1
+    moves = []
+    for i in range(9):
+        bit = 1 << i
+        if not empty & bit:
+            continue
+        child, _ = canonical(x | bit, o) if x_moves else canonical(x, o | bit)
+        score = -_solve(child)
+        score -= (score > 0) - (score < 0)  # cada jugada de distancia acerca el puntaje a 0
+        if score > best:
+            best = score
+            moves = [i]
+        elif score == best:
+            moves.append(i)
+
+    TABLE[code] = (best, tuple(moves))
+    return best
+
+
+def solve():
+    # resuelve todas las posiciones alcanzables desde el tablero vacío
+    _solve(0)
+    return len(TABLE)
+
+
+def lookup(board, player=AI):
+    # devuelve (valor -1/0/1, mejores_jugadas) para `player`, con las jugadas como índices 0..8
+    board = to_board(board)
+    x, o = board.x, board.o
+    if HAS_LINE[x] or HAS_LINE[o]:
+        return (1 if board.winner() == player else -1), []
+    if player != board.to_move():
+        # partida donde empezó O: se intercambian los colores para usar la misma tabla
+        x, o = o, x
+    code, perm = canonical(x, o)
+    score = _solve(code)
+    return (score > 0) - (score < 0), sorted(perm[m] for m in TABLE[code][1])
+
+
+def position_value(board, player=AI):
+    return lookup(board, player)[0]
+
+
+def best_move(board, player=AI):
+    # entre las jugadas óptimas (la victoria más rápida o la derrota más lenta), la primera por filas
+    moves = lookup(board, player)[1]
+    if not moves:
+        return None
+    return divmod(moves[0], 3)
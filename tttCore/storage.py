@@ -0,0 +1,283 @@
+# Backends de almacenamiento para la tabla de transiciones de MarkovAI.
+# Todos exponen la misma interfaz:
+#   load()       -> {estado (int): {movimiento (i, j): conteo}}
+#   add(deltas)  -> suma {(estado, movimiento): incremento} solo en los contadores tocados
+#   close()
+# SQLite y el binario de registros fijos actualizan en el lugar; el JSON se conserva como
+# formato de lectura para migrar los archivos existentes.
+# Varios procesos pueden compartir el mismo archivo: add suma sobre lo que haya en el disco en ese
+# momento (SQLite con su upsert; el binario y el JSON bajo un tttCore.locking.FileLock), así que
+# los conteos de cada uno se combinan en lugar de pisarse.
+# Las jugadas se guardan como casilla fila * N + col; SQLite y el binario guardan el estado
+# en 64 bits, así que admiten tableros de hasta 5x5.
+
+import json
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+
+from tttCore.bitboard import parse_state
+from tttCore.locking import FileLock
+
+
+MAX_SIZE = 5  # 2 * 5 * 5 = 50 bits de estado
+
+
+def move_to_cell(move, size=3):
+    return move[0] * size + move[1]
+
+
+def cell_to_move(cell, size=3):
+    return divmod(cell, size)
+
+
+def check_size(size):
+    if not 1 <= size <= MAX_SIZE:
+        raise ValueError(f"el almacenamiento admite tableros de hasta {MAX_SIZE}x{MAX_SIZE}")
+
+
+def add_counts(counts, deltas):
+    # aplica los incrementos sobre una tabla en memoria
+    for (state, move), delta in deltas.items():
+        moves = counts.setdefault(state, {})
+        moves[move] = moves.get(move, 0) + delta
+
+
+def write_atomic(path, data):
+    # se escribe a un temporal en el mismo directorio y se renombra: nunca queda un archivo a medias
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def flatten(counts):
+    return {(state, move): count for state, moves in counts.items() for move, count in moves.items()}
+
+
+class JsonStorage:
+    def __init__(self, path, size=3):
+        self.path = path
+        self.size = size  # las claves ya son "fila,col": el tamaño no cambia el formato
+        self.lock = FileLock(path)
+
+    def load(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            return {
+                parse_state(state): {tuple(map(int, k.split(','))): v for k, v in moves.items()}
+                for state, moves in data.items()
+            }
+        except (json.JSONDecodeError, SyntaxError, ValueError):
+            print("Archivo JSON corrupto o mal formado, iniciando con datos vacíos.")
+            return {}
+
+    def add(self, deltas):
+        # JSON no permite actualizar en el lugar: se relee, se suma y se reescribe compacto
+        # (con el candado, para que otro proceso no reescriba entre la lectura y la escritura)
+        with self.lock:
+            counts = self.load()
+            add_counts(counts, deltas)
+            data = {
+                str(state): {f"{k[0]},{k[1]}": v for k, v in moves.items()}
+                for state, moves in counts.items()
+            }
+            write_atomic(self.path, json.dumps(data, separators=(',', ':')).encode())
+
+    def close(self):
+        pass
+
+
+class SQLiteStorage:
+    def __init__(self, path, size=3):
+        check_size(size)
+        self.path = path
+        self.size = size
+        # la conexión se crea aquí pero las escrituras pueden venir del hilo de persistencia
+        # (el candado la serializa entre hilos; entre procesos espera hasta `timeout` a que se libere)
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+        self.lock = threading.Lock()
+        # WAL: una carga lee una foto consistente mientras otro proceso escribe
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS transitions ('
+            'state INTEGER NOT NULL, move INTEGER NOT NULL, count INTEGER NOT NULL, '
+            'PRIMARY KEY (state, move)) WITHOUT ROWID'
+        )
+        self.conn.commit()
+
+    def load(self):
+        counts = {}
+        with self.lock:
+            rows = self.conn.execute('SELECT state, move, count FROM transitions').fetchall()
+        for state, cell, count in rows:
+            counts.setdefault(state, {})[cell_to_move(cell, self.size)] = count
+        return counts
+
+    def add(self, deltas):
+        # upsert: solo se tocan las filas de los contadores que cambiaron, y cada una suma sobre
+        # el valor del disco (lo que hayan escrito otros procesos se conserva)
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'INSERT INTO transitions (state, move, count) VALUES (?, ?, ?) '
+                'ON CONFLICT (state, move) DO UPDATE SET count = count + excluded.count',
+                [(state, move_to_cell(move, self.size), delta) for (state, move), delta in deltas.items()],
+            )
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class BinaryStorage:
+    # archivo de registros fijos: cabecera MAGIC y luego (estado u64, casilla u8, conteo u32)
+    MAGIC = b'TTTM\x01'
+    RECORD = struct.Struct('<QBI')
+    COUNT = struct.Struct('<I')
+    COUNT_OFFSET = 9  # bytes del estado y la casilla antes del conteo
+
+    def __init__(self, path, size=3):
+        check_size(size)
+        self.path = path
+        self.size = size
+        self.index = {}  # (estado, casilla) -> [posición del registro, conteo]
+        self.end = len(self.MAGIC)  # hasta dónde está indexado el archivo
+        self.lock = FileLock(path)
+        self.version = None  # versión del archivo (ver tttCore.locking) que refleja el índice
+        with self.lock:
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                with open(path, 'wb') as f:
+                    f.write(self.MAGIC)
+        self.file = open(path, 'r+b')
+        if self.file.read(len(self.MAGIC)) != self.MAGIC:
+            self.file.close()
+            raise ValueError(f"{path} no es un archivo de transiciones válido")
+
+    def _read(self):
+        # vuelve a indexar el archivo entero (con el candado tomado); se lee con otro descriptor para
+        # no ver el búfer de lectura viejo si otro proceso lo cambió. Se ignora un registro
+        # incompleto al final (escritura interrumpida)
+        with open(self.path, 'rb') as f:
+            f.seek(len(self.MAGIC))
+            data = f.read()
+        size = self.RECORD.size
+        records = list(self.RECORD.iter_unpack(memoryview(data)[:len(data) // size * size]))
+        self.index = {}
+        offset = len(self.MAGIC)
+        for state, cell, count in records:
+            self.index[(state, cell)] = [offset, count]
+            offset += size
+        self.end = offset
+        self.version = self.lock.version
+        return records
+
+    def load(self):
+        counts = {}
+        with self.lock:
+            records = self._read()
+        for state, cell, count in records:
+            counts.setdefault(state, {})[cell_to_move(cell, self.size)] = count
+        return counts
+
+    def add(self, deltas):
+        f = self.file
+        with self.lock:
+            if self.version != self.lock.version:
+                self._read()  # otro proceso escribió desde la última vez: se suma sobre lo del disco
+            appended = bytearray()
+            for (state, move), delta in deltas.items():
+                key = (state, move_to_cell(move, self.size))
+                entry = self.index.get(key)
+                if entry is None:
+                    # contador nuevo: se agrega un registro al final (todos juntos, en una escritura)
+                    self.index[key] = [self.end + len(appended), delta]
+                    appended += self.RECORD.pack(state, key[1], delta)
+                else:
+                    # contador existente: se reescriben solo sus 4 bytes
+                    entry[1] += delta
+                    f.seek(entry[0] + self.COUNT_OFFSET)
+                    f.write(self.COUNT.pack(entry[1]))
+            if appended:
+                f.seek(self.end)
+                f.write(appended)
+                self.end += len(appended)
+            f.flush()
+            self.version = self.lock.bump()
+
+    def close(self):
+        self.file.close()
+
+
+class MemoryStorage:
+    # sin archivo: para modelos temporales (trabajadores del simulador, pruebas)
+    def __init__(self, path=None, size=3):
+        self.path = path
+        self.size = size
+
+    def load(self):
+        return {}
+
+    def add(self, deltas):
+        pass
+
+    def close(self):
+        pass
+
+
+BACKENDS = {
+    'json': ('.json', JsonStorage),
+    'sqlite': ('.db', SQLiteStorage),
+    'binary': ('.bin', BinaryStorage),
+    'memory': (None, MemoryStorage),
+}
+
+
+def board_suffix(size=3, k=None):
+    # sufijo de los archivos derivados de cada tablero: nada en el 3x3 de siempre, _4x4 con 4 en
+    # línea y _4x4k3 con 3 en línea (mismo tamaño con otro k son juegos distintos)
+    k = k or size
+    if size == 3 and k == 3:
+        return ''
+    return f'_{size}x{size}' + ('' if k == size else f'k{k}')
+
+
+def storage_for_path(path, size=3):
+    # abre un archivo existente según su extensión, sin migrar ni crear archivos nuevos
+    extension = os.path.splitext(path)[1]
+    for ext, storage_class in BACKENDS.values():
+        if ext == extension:
+            return storage_class(path, size)
+    raise ValueError(f"extensión desconocida: {path}")
+
+
+def open_storage(data_file, backend='sqlite', size=3, k=None):
+    # el archivo del backend se deriva del nombre original (markov_data.json -> markov_data.db);
+    # si todavía no existe y hay un JSON anterior, se migra en la primera carga.
+    # Otros tableros usan su propio archivo (markov_data_4x4.db, markov_data_4x4k3.db).
+    extension, storage_class = BACKENDS[backend]
+    if extension is None:
+        return storage_class(data_file, size)
+    base = os.path.splitext(data_file)[0] + board_suffix(size, k)
+    path = base + extension
+    legacy = base + '.json'
+    migrate = backend != 'json' and not os.path.exists(path) and os.path.exists(legacy)
+
+    storage = storage_class(path, size)
+    if migrate:
+        counts = JsonStorage(legacy, size).load()
+        if counts:
+            print(f"Migrando {legacy} a {path}")
+            storage.add(flatten(counts))
+    return storage
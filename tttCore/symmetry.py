@@ -0,0 +1,114 @@
+# Simetrías del tablero (grupo diédrico: 4 giros x reflexión = 8 transformaciones).
+# Las 8 variantes de una posición son el mismo juego, así que el modelo de Markov guarda
+# solo la forma canónica (el menor código entre las 8) y traduce las jugadas de ida y vuelta.
+# En caso de empate se prefiere la identidad, así canonizar dos veces no cambia nada.
+
+
+def _compose(p, q):
+    return tuple(p[q[i]] for i in range(len(q)))
+
+
+def _permutations(size):
+    identity = tuple(range(size * size))
+    rotation = tuple((size - 1 - c) * size + r for r in range(size) for c in range(size))  # giro de 90 grados
+    reflection = tuple(r * size + (size - 1 - c) for r in range(size) for c in range(size))  # espejo horizontal
+    perms = []
+    for base in (identity, reflection):
+        perm = base
+        for _ in range(4):
+            perms.append(perm)
+            perm = _compose(perm, rotation)
+    return tuple(perms)
+
+
+class Symmetry:
+    # tablas de las 8 transformaciones para un tamaño de tablero; una instancia por tamaño
+    _cache = {}
+
+    def __init__(self, size=3):
+        self.size = size
+        self.cells = size * size
+        # perms[t][i] = casilla del tablero original que queda en la posición i tras aplicar t
+        self.perms = _permutations(size)
+        # inverse[t][i] = posición a la que va la casilla original i
+        self.inverse = tuple(tuple(perm.index(i) for i in range(self.cells)) for perm in self.perms)
+        if self.cells <= 9:
+            # permuted_bits[t][mask] = máscara transformada (512 entradas por transformación en 3x3)
+            self.permuted_bits = tuple(
+                tuple(self._permute(mask, perm) for mask in range(1 << self.cells)) for perm in self.perms
+            )
+            self._memo = {}  # código -> (canónico, t); como mucho 3**9 posiciones
+        else:
+            self.permuted_bits = None
+            self._memo = None
+
+    @classmethod
+    def get(cls, size=3):
+        symmetry = cls._cache.get(size)
+        if symmetry is None:
+            symmetry = cls._cache[size] = cls(size)
+        return symmetry
+
+    @staticmethod
+    def _permute(mask, perm):
+        return sum(1 << i for i, source in enumerate(perm) if mask >> source & 1)
+
+    def transform(self, code, t):
+        x, o = code & ((1 << self.cells) - 1), code >> self.cells
+        if self.permuted_bits is not None:
+            table = self.permuted_bits[t]
+            return table[x] | (table[o] << self.cells)
+        perm = self.perms[t]
+        return self._permute(x, perm) | (self._permute(o, perm) << self.cells)
+
+    def canonical(self, code):
+        # devuelve (código canónico, índice t de la transformación usada)
+        if self._memo is not None:
+            entry = self._memo.get(code)
+            if entry is not None:
+                return entry
+        best, best_t = code, 0
+        for t in range(1, 8):
+            transformed = self.transform(code, t)
+            if transformed < best:
+                best, best_t = transformed, t
+        if self._memo is not None:
+            self._memo[code] = (best, best_t)
+        return best, best_t
+
+    def to_canonical(self, move, t):
+        # jugada (fila, col) del tablero original -> marco canónico
+        return divmod(self.inverse[t][move[0] * self.size + move[1]], self.size)
+
+    def from_canonical(self, move, t):
+        # jugada del marco canónico -> tablero original
+        return divmod(self.perms[t][move[0] * self.size + move[1]], self.size)
+
+    def canonical_pair(self, state, move):
+        state, t = self.canonical(state)
+        return state, self.to_canonical(move, t)
+
+    def fold_deltas(self, deltas):
+        # {(estado, jugada): n} -> mismos conteos sobre claves canónicas (se suman las variantes)
+        folded = {}
+        for (state, move), count in deltas.items():
+            key = self.canonical_pair(state, move)
+            folded[key] = folded.get(key, 0) + count
+        return folded
+
+    def fold(self, counts):
+        # {estado: {jugada: n}} -> tabla canónica
+        folded = {}
+        for state, moves in counts.items():
+            canonical_state, t = self.canonical(state)
+            target = folded.setdefault(canonical_state, {})
+            for move, count in moves.items():
+                move = self.to_canonical(move, t)
+                target[move] = target.get(move, 0) + count
+        return folded
+
+
+def is_canonical(counts, size=3):
+    # en un estado canónico la transformación es la identidad, así que basta revisar los estados
+    symmetry = Symmetry.get(size)
+    return all(symmetry.canonical(state)[0] == state for state in counts)